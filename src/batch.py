@@ -0,0 +1,101 @@
+import numpy as np
+from problem import ProblemIndex
+from compact import CompactSchedule
+from typing import List, Tuple
+
+class BatchEvaluator:
+    # scores many compact schedules at once with array operations.
+    # every schedule in a batch must use the problem's assignment layout
+    problem: ProblemIndex
+    num_slots: int
+    num_rooms: int
+    num_courses: int
+    assignment_courses: np.ndarray
+    assignment_weights: np.ndarray
+    canonical_slots: np.ndarray
+    attendee_incidence: np.ndarray  # (students + lecturers) x courses
+    attendance_total: float
+    capacity_cost: np.ndarray | None  # courses x rooms, the problem's capacity penalty
+    max_batch_cells: int
+
+    def __init__(self, problem: ProblemIndex, max_batch_cells: int = 1 << 24) -> None:
+        self.problem = problem
+        self.num_slots = len(problem.time_slots)
+        self.num_rooms = len(problem.rooms)
+        self.num_courses = len(problem.courses)
+        self.assignment_courses = np.asarray(problem.assignment_courses, dtype=np.int64)
+        self.assignment_weights = np.asarray(problem.course_clash_weight, dtype=np.float64)[self.assignment_courses]
+
+        # two slot positions with the same hour are the same slot for the clash counts
+        self.canonical_slots = np.array([problem.slot_ids[hour_idx] for hour_idx in problem.slot_hours], dtype=np.int64)
+
+        attendee_courses: List[List[int]] = problem.student_courses + problem.lecturer_courses
+        self.attendee_incidence = np.zeros((len(attendee_courses), self.num_courses), dtype=np.float64)
+        for attendee_idx, course_list in enumerate(attendee_courses):
+            for course_idx in course_list:
+                self.attendee_incidence[attendee_idx, course_idx] += 1
+
+        # every assignment of a course adds one class to each of its attendees, wherever it is placed
+        course_credits: np.ndarray = np.bincount(self.assignment_courses, minlength=self.num_courses).astype(np.float64)
+        self.attendance_total = float((self.attendee_incidence @ course_credits).sum())
+
+        self.capacity_cost = None
+        if problem.capacity_cost is not None:
+            self.capacity_cost = np.asarray(problem.capacity_cost, dtype=np.float64)
+
+        # bounds the attendees x slots count tensor built per chunk of schedules
+        self.max_batch_cells = max_batch_cells
+
+    def objectives(self, slots: np.ndarray, rooms: np.ndarray) -> np.ndarray:
+        # slots and rooms are (schedules x assignments) matrices of indices
+        cells_per_schedule: int = max(1, self.attendee_incidence.shape[0] * self.num_slots)
+        chunk: int = max(1, self.max_batch_cells // cells_per_schedule)
+
+        results: List[np.ndarray] = []
+        for start in range(0, slots.shape[0], chunk):
+            results.append(self._objectives(slots[start:start + chunk], rooms[start:start + chunk]))
+
+        if not results:
+            return np.zeros(0, dtype=np.float64)
+        return np.concatenate(results)
+
+    def _objectives(self, slots: np.ndarray, rooms: np.ndarray) -> np.ndarray:
+        batch_size: int = slots.shape[0]
+        slots = self.canonical_slots[slots]
+        row_offsets: np.ndarray = np.arange(batch_size, dtype=np.int64)[:, None]
+
+        # how many assignments every course has in every slot, per schedule
+        course_slot: np.ndarray = self.assignment_courses[None, :] * self.num_slots + slots
+        course_slot_keys: np.ndarray = (course_slot + row_offsets * (self.num_courses * self.num_slots)).ravel()
+        course_slot_count: np.ndarray = np.bincount(course_slot_keys, minlength=batch_size * self.num_courses * self.num_slots)
+        course_slot_count = course_slot_count.reshape(batch_size, self.num_courses, self.num_slots).astype(np.float64)
+
+        # a student or lecturer with k classes in one slot gets k - 1 penalty, so over all slots
+        # the penalty is the number of classes they attend minus the number of slots they use
+        attendee_slot_count: np.ndarray = np.matmul(self.attendee_incidence, course_slot_count)
+        occupied: np.ndarray = np.count_nonzero(attendee_slot_count, axis=(1, 2))
+        penalty: np.ndarray = self.attendance_total - occupied.astype(np.float64)
+
+        # every assignment sharing a room and slot with another one is penalized by its course weight
+        room_slot: np.ndarray = rooms * self.num_slots + slots
+        room_slot_keys: np.ndarray = (room_slot + row_offsets * (self.num_rooms * self.num_slots)).ravel()
+        size: int = batch_size * self.num_rooms * self.num_slots
+        room_slot_count: np.ndarray = np.bincount(room_slot_keys, minlength=size)
+        room_slot_weight: np.ndarray = np.bincount(room_slot_keys, weights=np.tile(self.assignment_weights, batch_size), minlength=size)
+        clashing_weight: np.ndarray = np.where(room_slot_count >= 2, room_slot_weight, 0.0).reshape(batch_size, -1)
+        penalty += clashing_weight.sum(axis=1)
+
+        if self.capacity_cost is not None:
+            penalty += self.capacity_cost[self.assignment_courses[None, :], rooms].sum(axis=1)
+
+        return -penalty
+
+    def evaluate_population(self, population: List[CompactSchedule]) -> List[Tuple[CompactSchedule, float]]:
+        if not population:
+            return []
+
+        genes: np.ndarray = np.array([np.frombuffer(compact.genes, dtype=np.intc) for compact in population], dtype=np.int64)
+        size: int = population[0].size
+        scores: np.ndarray = self.objectives(genes[:, :size], genes[:, size:])
+
+        return [(compact, float(score)) for compact, score in zip(population, scores)]
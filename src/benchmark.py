@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+from models import *
+from problem import ProblemIndex
+from metrics import Observer, MetricsRecorder
+from scheduler import generate_initial_schedule, indexed_objective
+from instance_cache import CompiledInstance, load_instance
+from test_generator import generate_test_data, generate_time_slots
+from hill_climbing import (
+    steepest_ascent_hill_climbing_sampling,
+    steepest_ascent_hill_climbing_full,
+    stochastic_hill_climbing,
+    hill_climbing_with_sideways_moves_sampling,
+    hill_climbing_with_sideways_moves_full,
+    random_restart_hill_climbing
+)
+from tabu_search import tabu_search
+from genetic import genetic_algorithm, island_genetic_algorithm
+from simulated_annealing import simulated_annealing, adaptive_simulated_annealing, parallel_tempering
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+DEFAULT_INSTANCES: List[str] = ['input.json', 'semi_large_test.json', 'large_test.json']
+DEFAULT_GENERATED: List[str] = ['60,15,600,40']
+
+class TargetRecorder(MetricsRecorder):
+    # also remembers when the best objective first reached the target
+    target: float
+    target_time: float | None
+
+    def __init__(self, target: float) -> None:
+        super().__init__()
+        self.target = target
+        self.target_time = None
+
+    def progress(self, iteration: int, objective: float) -> None:
+        super().progress(iteration, objective)
+        if self.target_time is None and objective >= self.target:
+            self.target_time = time.perf_counter() - self.start_time
+
+# the parameters are the runners.py defaults
+def _steepest_ascent(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return steepest_ascent_hill_climbing_sampling(problem, max_iterations=1000, neighbors_to_check=50, observer=observer)[0]
+
+def _steepest_ascent_full(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return steepest_ascent_hill_climbing_full(problem, max_iterations=1000, observer=observer)[0]
+
+def _stochastic(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return stochastic_hill_climbing(problem, max_iterations=2000, max_stuck_iterations=100, observer=observer)[0]
+
+def _sideways_moves(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return hill_climbing_with_sideways_moves_sampling(problem, max_iterations=1000, max_sideways_moves=100, observer=observer)[0]
+
+def _sideways_moves_full(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return hill_climbing_with_sideways_moves_full(problem, max_iterations=1000, max_sideways_moves=100, observer=observer)[0]
+
+def _random_restart(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return random_restart_hill_climbing(problem, num_restarts=20, max_iter_per_restart=500, seed=seed, observer=observer)[0]
+
+def _tabu_search(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return tabu_search(problem, max_iterations=2000, neighbors_to_check=100, tenure=15, max_stuck_iterations=300, observer=observer)[0]
+
+def _genetic_algorithm(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return genetic_algorithm(problem, population_size=100, generations=100, observer=observer)[0]
+
+def _island_genetic_algorithm(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    return island_genetic_algorithm(problem, population_size=100, generations=100, islands=4, seed=seed, observer=observer)[0]
+
+def _simulated_annealing(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    initial_schedule: Schedule = generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots, problem.domains)
+    return simulated_annealing(initial_schedule, problem, initial_temp=1000, cooling_rate=0.95, min_temp=1, observer=observer)[0]
+
+def _adaptive_simulated_annealing(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    initial_schedule: Schedule = generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots, problem.domains)
+    return adaptive_simulated_annealing(initial_schedule, problem, observer=observer)[0]
+
+def _parallel_tempering(problem: ProblemIndex, seed: int, observer: Observer) -> Schedule:
+    initial_schedule: Schedule = generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots, problem.domains)
+    return parallel_tempering(initial_schedule, problem, replicas=4, sweep_length=100, exchanges=50, seed=seed, observer=observer)[0]
+
+ALGORITHMS: Dict[str, Callable[[ProblemIndex, int, Observer], Schedule]] = {
+    'steepest_ascent': _steepest_ascent,
+    'steepest_ascent_full': _steepest_ascent_full,
+    'stochastic': _stochastic,
+    'sideways_moves': _sideways_moves,
+    'sideways_moves_full': _sideways_moves_full,
+    'random_restart': _random_restart,
+    'tabu_search': _tabu_search,
+    'genetic_algorithm': _genetic_algorithm,
+    'island_genetic_algorithm': _island_genetic_algorithm,
+    'simulated_annealing': _simulated_annealing,
+    'adaptive_simulated_annealing': _adaptive_simulated_annealing,
+    'parallel_tempering': _parallel_tempering
+}
+
+def load_problem(path: str) -> ProblemIndex:
+    instance: CompiledInstance | None = load_instance(path)
+    if instance is None:
+        raise ValueError(f"could not load instance {path}")
+    return instance.problem(generate_time_slots(['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'], list(range(8, 17))))
+
+def generated_problem(spec: str) -> ProblemIndex:
+    # spec is "courses,rooms,students,lecturers"; the instance is always generated with seed 0
+    num_courses, num_rooms, num_students, num_lecturers = (int(value) for value in spec.split(','))
+    random.seed(0)
+    courses, rooms, students, lecturers = generate_test_data(num_courses, num_rooms, num_students, num_lecturers)
+    time_slots: List[TimeSlot] = generate_time_slots(['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'], list(range(8, 17)))
+    return ProblemIndex(courses, rooms, time_slots, students, lecturers)
+
+def run_benchmark(instances: Dict[str, ProblemIndex], algorithms: List[str], seeds: List[int], target: float) -> List[Dict[str, Any]]:
+    runs: List[Dict[str, Any]] = []
+
+    for instance_name, problem in instances.items():
+        for algorithm in algorithms:
+            for seed in seeds:
+                random.seed(seed)
+                recorder: TargetRecorder = TargetRecorder(target)
+                start_time: float = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    schedule: Schedule = ALGORITHMS[algorithm](problem, seed, recorder)
+                wall_time: float = time.perf_counter() - start_time
+                evaluations: int = recorder.counters.get('evaluations', 0)
+                final_objective: float = indexed_objective(schedule, problem)
+
+                run: Dict[str, Any] = {
+                    'instance': instance_name,
+                    'algorithm': algorithm,
+                    'seed': seed,
+                    'wall_time': wall_time,
+                    'evaluations': evaluations,
+                    'evaluations_per_second': evaluations / wall_time if wall_time > 0 else None,
+                    # a schedule that starts at the target never reports progress
+                    'time_to_target': recorder.target_time if recorder.target_time is not None or final_objective < target else 0.0,
+                    'final_objective': final_objective,
+                    'counters': dict(recorder.counters)
+                }
+                runs.append(run)
+                print(f"{instance_name:>24} {algorithm:>26} seed={seed:<4} {wall_time:9.3f}s  objective={run['final_objective']:.2f}")
+
+    return runs
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for run in runs:
+        grouped.setdefault(f"{run['instance']}/{run['algorithm']}", []).append(run)
+
+    summary: Dict[str, Dict[str, float]] = {}
+    for key, group in grouped.items():
+        summary[key] = {
+            'mean_wall_time': statistics.mean(run['wall_time'] for run in group),
+            'mean_evaluations_per_second': statistics.mean(run['evaluations_per_second'] or 0.0 for run in group),
+            'mean_final_objective': statistics.mean(run['final_objective'] for run in group),
+            'target_reached': sum(run['time_to_target'] is not None for run in group) / len(group)
+        }
+    return summary
+
+def compare(current: Dict[str, Dict[str, float]], previous: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    # prints the change of every shared entry; returns False if anything got slower than the tolerance
+    ok: bool = True
+    print(f"\n{'instance/algorithm':>52} {'wall time':>22} {'objective':>22}")
+    for key in sorted(current):
+        if key not in previous:
+            continue
+        old_time: float = previous[key]['mean_wall_time']
+        new_time: float = current[key]['mean_wall_time']
+        ratio: float = new_time / old_time if old_time > 0 else 1.0
+        flag: str = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            ok = False
+        print(f"{key:>52} {old_time:9.3f}s -> {new_time:7.3f}s "
+              f"{previous[key]['mean_final_objective']:9.2f} -> {current[key]['mean_final_objective']:9.2f}{flag}")
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every search algorithm over the data instances.")
+    parser.add_argument('--instances', nargs='*', default=DEFAULT_INSTANCES, help="instance files, relative to the data folder")
+    parser.add_argument('--generated', nargs='*', default=DEFAULT_GENERATED, help="generated instances as courses,rooms,students,lecturers")
+    parser.add_argument('--algorithms', nargs='*', default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument('--seeds', type=int, default=3, help="number of seeds, 0 .. seeds - 1")
+    parser.add_argument('--target', type=float, default=0.0, help="objective value for time-to-target")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', default=None, help="previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed relative wall time increase in compare mode")
+    args = parser.parse_args()
+
+    instances: Dict[str, ProblemIndex] = {}
+    for name in args.instances:
+        instances[name] = load_problem(os.path.join(DATA_DIR, name))
+    for spec in args.generated:
+        instances[f"generated_{spec.replace(',', 'x')}"] = generated_problem(spec)
+
+    runs: List[Dict[str, Any]] = run_benchmark(instances, args.algorithms, list(range(args.seeds)), args.target)
+    results: Dict[str, Any] = {
+        'target': args.target,
+        'runs': runs,
+        'summary': summarize(runs)
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"-> Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous: Dict[str, Any] = json.load(f)
+        if not compare(results['summary'], previous['summary'], args.tolerance):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
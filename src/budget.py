@@ -0,0 +1,60 @@
+import time
+
+class CancellationToken:
+    # set from anywhere (a signal handler, another thread) to stop a running search;
+    # the search then returns the best schedule it has found so far
+    cancelled: bool
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+class SearchBudget:
+    # how long a search may run: an optional wall-clock deadline on the monotonic
+    # clock and an optional cancellation token. the algorithms check expired() once
+    # per iteration, sweep or generation, so they overshoot by at most one of those
+    start: float
+    deadline: float | None
+    token: CancellationToken | None
+
+    def __init__(self, time_budget: float | None = None, deadline: float | None = None, token: CancellationToken | None = None) -> None:
+        # time_budget is in seconds from now; deadline is a time.monotonic() value
+        self.start = time.monotonic()
+        self.deadline = deadline
+        if time_budget is not None:
+            budget_deadline: float = self.start + time_budget
+            self.deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        self.token = token
+
+    def expired(self) -> bool:
+        if self.token is not None and self.token.cancelled:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def timed(self) -> bool:
+        return self.deadline is not None
+
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def fraction_used(self) -> float:
+        # share of the time budget already spent, 0 without a deadline
+        if self.deadline is None:
+            return 0.0
+        total: float = self.deadline - self.start
+        if total <= 0:
+            return 1.0
+        return min(1.0, (time.monotonic() - self.start) / total)
+
+    def for_worker(self) -> 'SearchBudget':
+        # the monotonic clock is shared by the processes of one machine, so the deadline
+        # carries over to pool workers; a token does not, it is only seen by the caller
+        budget: SearchBudget = SearchBudget(deadline=self.deadline)
+        budget.start = self.start
+        return budget
+
+UNLIMITED: SearchBudget = SearchBudget()
@@ -0,0 +1,73 @@
+import random
+from array import array
+from models import *
+from problem import ProblemIndex
+from scheduler import placement_objective
+from typing import List, Tuple
+
+class CompactSchedule:
+    # a schedule stored as plain integers: position i teaches course courses[i] in
+    # time slot genes[i] and room genes[size + i] (indices into the problem index lists).
+    # the course layout never changes, so copies share it and only duplicate genes
+    courses: array
+    genes: array
+    size: int
+
+    def __init__(self, courses: array, genes: array) -> None:
+        self.courses = courses
+        self.genes = genes
+        self.size = len(courses)
+
+    def copy(self) -> 'CompactSchedule':
+        return CompactSchedule(self.courses, array('i', self.genes))
+
+    def slots(self) -> array:
+        return self.genes[:self.size]
+
+    def rooms(self) -> array:
+        return self.genes[self.size:]
+
+def generate_initial_compact_schedule(problem: ProblemIndex) -> CompactSchedule:
+    # draws the same random numbers as generate_initial_schedule, rooms from the room domains
+    size: int = len(problem.assignment_courses)
+    genes: array = array('i', [0]) * (2 * size)
+
+    for i in range(size):
+        genes[size + i] = random.choice(problem.room_domains[problem.assignment_courses[i]])
+        genes[i] = random.randrange(len(problem.time_slots))
+
+    return CompactSchedule(problem.assignment_courses, genes)
+
+def to_compact_schedule(schedule: Schedule, problem: ProblemIndex) -> CompactSchedule:
+    courses: array = array('i', [problem.course_ids[a.course.course_id] for a in schedule.assignments])
+    if courses == problem.assignment_courses:
+        courses = problem.assignment_courses
+
+    genes: array = array('i', [problem.slot_ids[a.time_slot.hour_index()] for a in schedule.assignments])
+    genes.extend(problem.room_ids[a.room.room_id] for a in schedule.assignments)
+
+    return CompactSchedule(courses, genes)
+
+def to_schedule(compact: CompactSchedule, problem: ProblemIndex) -> Schedule:
+    assignments: List[Assignment] = []
+
+    for i in range(compact.size):
+        course: Course = problem.courses[compact.courses[i]]
+        time_slot: TimeSlot = problem.time_slots[compact.genes[i]]
+        room: Room = problem.rooms[compact.genes[compact.size + i]]
+        assignments.append(Assignment(course, time_slot, room))
+
+    return Schedule(assignments)
+
+def compact_objective(compact: CompactSchedule, problem: ProblemIndex) -> float:
+    slot_hours: List[int] = problem.slot_hours
+    assignment_hours: List[int] = [slot_hours[slot] for slot in compact.slots()]
+    return placement_objective(compact.courses, assignment_hours, compact.rooms(), problem)
+
+def evaluate_compact_population(population: List[CompactSchedule], problem: ProblemIndex) -> List[Tuple[CompactSchedule, float]]:
+    population_objective: List[Tuple[CompactSchedule, float]] = []
+
+    for compact in population:
+        population_objective.append((compact, compact_objective(compact, problem)))
+
+    return population_objective
@@ -0,0 +1,104 @@
+import random
+from array import array
+from models import *
+from problem import ProblemIndex
+from scheduler import generate_initial_schedule
+from compact import CompactSchedule, generate_initial_compact_schedule, to_schedule
+from typing import List, Tuple
+
+def course_order(problem: ProblemIndex) -> List[int]:
+    # courses by decreasing conflict degree, the number of (attendee, other course)
+    # pairs they share a student or lecturer through, then by decreasing credits.
+    # equal courses come in random order
+    degrees: List[int] = [0] * len(problem.courses)
+    for attendee_courses in (problem.student_courses, problem.lecturer_courses):
+        for course_list in attendee_courses:
+            for course_idx in course_list:
+                degrees[course_idx] += len(course_list) - 1
+
+    order: List[int] = list(range(len(problem.courses)))
+    random.shuffle(order)
+    order.sort(key=lambda course_idx: (-degrees[course_idx], -problem.courses[course_idx].credits))
+    return order
+
+def greedy_compact_schedule(problem: ProblemIndex) -> CompactSchedule:
+    # graph colouring style construction: the courses are placed in course_order, every
+    # credit hour at the (time slot, room) that adds the least penalty to what is already
+    # placed, a random one among the cheapest. the occupancy lists are indexed by time
+    # slot position and shared by all courses of a student or lecturer, like DeltaEvaluator's.
+    # only the rooms of a course's domain are tried, and the capacity penalty counts as a cost
+    num_rooms: int = len(problem.rooms)
+    num_slots: int = len(problem.time_slots)
+    course_attendees: List[List[List[int]]] = [[] for _ in problem.courses]
+    for attendee_courses in (problem.student_courses, problem.lecturer_courses):
+        for course_list in attendee_courses:
+            occupancy: List[int] = [0] * num_slots
+            for course_idx in course_list:
+                course_attendees[course_idx].append(occupancy)
+    room_count: List[int] = [0] * (num_slots * num_rooms)  # slot * rooms + room -> number of assignments
+    room_weight: List[float] = [0.0] * (num_slots * num_rooms)
+
+    # the assignment positions of every course
+    course_positions: List[List[int]] = [[] for _ in problem.courses]
+    for index, course_idx in enumerate(problem.assignment_courses):
+        course_positions[course_idx].append(index)
+
+    size: int = len(problem.assignment_courses)
+    genes: array = array('i', [0]) * (2 * size)
+    for course_idx in course_order(problem):
+        attendees: List[List[int]] = course_attendees[course_idx]
+        weight: float = problem.course_clash_weight[course_idx]
+        domain: List[int] = problem.room_domains[course_idx]
+        capacity_cost: List[float] | None = problem.capacity_cost[course_idx] if problem.capacity_cost is not None else None
+        for index in course_positions[course_idx]:
+            best_cost: float = float('inf')
+            best_places: List[Tuple[int, int]] = []
+            for slot_idx in range(num_slots):
+                attendee_cost: float = 0.0
+                for occupancy in attendees:
+                    if occupancy[slot_idx] > 0:
+                        attendee_cost += 1
+                if attendee_cost > best_cost:
+                    continue
+
+                for room_idx in domain:
+                    place: int = slot_idx * num_rooms + room_idx
+                    count: int = room_count[place]
+                    cost: float = attendee_cost
+                    if capacity_cost is not None:
+                        cost += capacity_cost[room_idx]
+                    if count == 1:
+                        # the course already there becomes clashing too
+                        cost += weight + room_weight[place]
+                    elif count >= 2:
+                        cost += weight
+                    if cost < best_cost:
+                        best_cost = cost
+                        best_places = [(slot_idx, room_idx)]
+                    elif cost == best_cost:
+                        best_places.append((slot_idx, room_idx))
+
+            slot_idx, room_idx = random.choice(best_places)
+            for occupancy in attendees:
+                occupancy[slot_idx] += 1
+            room_count[slot_idx * num_rooms + room_idx] += 1
+            room_weight[slot_idx * num_rooms + room_idx] += weight
+            genes[index] = slot_idx
+            genes[size + index] = room_idx
+
+    return CompactSchedule(problem.assignment_courses, genes)
+
+def greedy_initial_schedule(problem: ProblemIndex) -> Schedule:
+    return to_schedule(greedy_compact_schedule(problem), problem)
+
+def starting_schedule(problem: ProblemIndex, warm_start: bool = False) -> Schedule:
+    # the starting schedule of a search: the greedy construction with warm_start,
+    # otherwise generate_initial_schedule's uniformly random one
+    if warm_start:
+        return greedy_initial_schedule(problem)
+    return generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots, problem.domains)
+
+def starting_compact_schedule(problem: ProblemIndex, warm_start: bool = False) -> CompactSchedule:
+    if warm_start:
+        return greedy_compact_schedule(problem)
+    return generate_initial_compact_schedule(problem)
@@ -0,0 +1,216 @@
+import contextlib
+import io
+import random
+from array import array
+from concurrent.futures import Future
+from models import *
+from problem import ProblemIndex
+from moves import Move
+from scheduler import assignment_moves
+from evaluator import DeltaEvaluator
+from compact import CompactSchedule, to_compact_schedule, to_schedule
+from parallel import create_worker_pool, derive_seed
+from metrics import Observer, NULL_OBSERVER, WorkerMetrics, worker_recorder, export_metrics, merge_metrics
+from budget import SearchBudget, UNLIMITED
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+# a runner from runners.py: problem and keyword parameters in, (schedule, statistics) out
+ComponentSolver = Callable[..., Tuple[Schedule, Dict[str, Any]]]
+
+def find(parents: List[int], item: int) -> int:
+    # union-find root with path halving
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+def union(parents: List[int], item1: int, item2: int) -> None:
+    root1: int = find(parents, item1)
+    root2: int = find(parents, item2)
+    if root1 != root2:
+        parents[max(root1, root2)] = min(root1, root2)
+
+def course_components(problem: ProblemIndex, join_rooms: bool = False) -> List[List[int]]:
+    # the courses split into groups that share no student and no lecturer, as sorted course
+    # positions, largest group first. two groups then only interact through the rooms;
+    # with join_rooms the groups whose room domains overlap are joined too, so the groups
+    # are fully independent (without capacity domains that is a single group)
+    parents: List[int] = list(range(len(problem.courses)))
+    for attendee_courses in (problem.student_courses, problem.lecturer_courses):
+        for course_list in attendee_courses:
+            for course_idx in course_list[1:]:
+                union(parents, course_list[0], course_idx)
+
+    if join_rooms:
+        room_course: Dict[int, int] = {}  # room -> the first course that may use it
+        for course_idx, domain in enumerate(problem.room_domains):
+            for room_idx in domain:
+                if room_idx in room_course:
+                    union(parents, room_course[room_idx], course_idx)
+                else:
+                    room_course[room_idx] = course_idx
+
+    groups: Dict[int, List[int]] = {}
+    for course_idx in range(len(problem.courses)):
+        groups.setdefault(find(parents, course_idx), []).append(course_idx)
+    return sorted(groups.values(), key=lambda group: (-len(group), group[0]))
+
+def merge_small_components(problem: ProblemIndex, components: List[List[int]]) -> List[List[int]]:
+    # the searches draw two different assignments for their moves, so a component with
+    # fewer than two assignments cannot be searched on its own. those are pooled into one
+    # group, and a group still that small joins the smallest other component. the result
+    # is sorted like course_components
+    def assignments(component: List[int]) -> int:
+        return sum(problem.courses[course_idx].credits for course_idx in component)
+
+    large: List[List[int]] = [component for component in components if assignments(component) >= 2]
+    small: List[int] = sorted(course_idx for component in components if assignments(component) < 2 for course_idx in component)
+    if not small:
+        return components
+    if assignments(small) < 2 and large:
+        smallest: List[int] = min(large, key=lambda component: (assignments(component), len(component)))
+        large.remove(smallest)
+        small = sorted(smallest + small)
+    return sorted(large + [small], key=lambda group: (-len(group), group[0]))
+
+def split_rooms(problem: ProblemIndex, components: List[List[int]]) -> List[List[int]] | None:
+    # deals the rooms out among the components in proportion to their credit hours: the
+    # largest rooms first, each to the component with the fewest rooms per credit hour so
+    # far, so every component gets large and small rooms. None when a component would get
+    # fewer room hours than credit hours, or no room of the domain of one of its courses
+    credits: List[int] = [max(1, sum(problem.courses[course_idx].credits for course_idx in component)) for component in components]
+    shares: List[List[int]] = [[] for _ in components]
+    for room_idx in sorted(range(len(problem.rooms)), key=lambda room_idx: -problem.rooms[room_idx].capacity):
+        k: int = min(range(len(components)), key=lambda k: len(shares[k]) / credits[k])
+        shares[k].append(room_idx)
+
+    for component, share, component_credits in zip(components, shares, credits):
+        if len(share) * len(problem.time_slots) < component_credits:
+            return None
+        allowed: Set[int] = set(share)
+        if any(allowed.isdisjoint(problem.room_domains[course_idx]) for course_idx in component):
+            return None
+        share.sort()
+    return shares
+
+def component_problem(problem: ProblemIndex, component: List[int], rooms: List[int]) -> ProblemIndex:
+    # the problem restricted to the courses of one component, the students and lecturers
+    # attending them and the given room positions, with the same time slots and capacity
+    # settings. a component holds every course of its attendees, so their clash weights stay the same
+    members: Set[int] = set(component)
+    students: List[Student] = [problem.students[i] for i, course_list in enumerate(problem.student_courses) if course_list and course_list[0] in members]
+    lecturers: List[Lecturer] = [problem.lecturers[i] for i, course_list in enumerate(problem.lecturer_courses) if course_list and course_list[0] in members]
+    return ProblemIndex([problem.courses[course_idx] for course_idx in component], [problem.rooms[room_idx] for room_idx in rooms],
+                        problem.time_slots, students, lecturers, capacity_domains=problem.capacity_domains, capacity_penalty=problem.capacity_penalty)
+
+def share_budget(budget: SearchBudget, share: float) -> SearchBudget:
+    # share of the time left in budget, for a search that other ones run after
+    remaining: float | None = budget.remaining()
+    if remaining is None or share >= 1:
+        return budget
+    return SearchBudget(time_budget=remaining * share, deadline=budget.deadline, token=budget.token)
+
+def solve_component(problem: ProblemIndex, solver: ComponentSolver, parameters: Dict[str, Any], seed: int, observed: bool,
+                    budget: SearchBudget, share: float) -> Tuple[bytes, float, WorkerMetrics]:
+    # one component on its own seed and its share of the time left when it starts, quietly;
+    # the schedule travels back as its compact genes
+    random.seed(seed)
+    recorder: Observer = worker_recorder(observed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, statistics = solver(problem, visualize=False, show_plots=False, observer=recorder, budget=share_budget(budget, share), **parameters)
+    return to_compact_schedule(schedule, problem).genes.tobytes(), statistics['objective'], export_metrics(recorder)
+
+def stitch(problem: ProblemIndex, components: List[List[int]], component_rooms: List[List[int]], component_genes: List[bytes]) -> CompactSchedule:
+    # the component schedules put back into one compact schedule. a component problem keeps
+    # its courses in the original order, so its assignment positions are the original ones
+    # of its courses, in order; its slot indices are the original ones and its room indices
+    # positions in its component_rooms
+    size: int = len(problem.assignment_courses)
+    genes: array = array('i', [0]) * (2 * size)
+    component_of: List[int] = [0] * len(problem.courses)
+    for k, component in enumerate(components):
+        for course_idx in component:
+            component_of[course_idx] = k
+
+    positions: List[List[int]] = [[] for _ in components]
+    for index, course_idx in enumerate(problem.assignment_courses):
+        positions[component_of[course_idx]].append(index)
+
+    for component_positions, rooms, genes_bytes in zip(positions, component_rooms, component_genes):
+        sub_genes: array = array('i')
+        sub_genes.frombytes(genes_bytes)
+        sub_size: int = len(component_positions)
+        for k, index in enumerate(component_positions):
+            genes[index] = sub_genes[k]
+            genes[size + index] = rooms[sub_genes[sub_size + k]]
+    return CompactSchedule(problem.assignment_courses, genes)
+
+def repair_room_clashes(schedule: Schedule, problem: ProblemIndex, budget: SearchBudget = UNLIMITED) -> int:
+    # stitched components can only clash with each other through a shared room, so only
+    # the assignments in a room clash are looked at, between components or left by the
+    # solver: each takes its best improving swap or relocation until none of them has one.
+    # works on the schedule in place, returns the number of moves
+    evaluator: DeltaEvaluator = DeltaEvaluator(schedule, problem)
+    moves: int = 0
+    improved: bool = True
+    while improved and not budget.expired():
+        improved = False
+        for index in range(len(evaluator.assignment_hours)):
+            if evaluator.room_count[evaluator.assignment_rooms[index] * HOURS_PER_WEEK + evaluator.assignment_hours[index]] < 2:
+                continue
+            move: Move | None
+            delta: float
+            move, delta = evaluator.best_move(assignment_moves(schedule, problem.rooms, problem.time_slots, index, problem.domains))
+            if move is not None and delta > 0:
+                evaluator.apply_move(move)
+                moves += 1
+                improved = True
+    return moves
+
+def decomposed_search(problem: ProblemIndex, solver: ComponentSolver, parameters: Dict[str, Any] | None = None, workers: int = 1,
+                      seed: int | None = None, join_rooms: bool = False, room_split: bool = True, repair: bool = True,
+                      observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED) -> Tuple[Schedule, Dict[str, Any]]:
+    # solves every component of course_components separately with solver and parameters,
+    # on a process pool with workers > 1, stitches the schedules together and repairs the
+    # room clashes between them. components of a single assignment are merged first, see
+    # merge_small_components. with room_split the components get the rooms of
+    # split_rooms, when it finds a split, and cannot clash; otherwise every component may
+    # use every room. with a time budget every component gets a share of the time in
+    # proportion to its credit hours. every component has its own derived seed, so a seeded
+    # run does not depend on workers
+    parameters = parameters or {}
+    master_seed: int = seed if seed is not None else random.getrandbits(64)
+    components: List[List[int]] = merge_small_components(problem, course_components(problem, join_rooms))
+    component_rooms: List[List[int]] | None = split_rooms(problem, components) if room_split and len(components) > 1 else None
+    if component_rooms is None:
+        component_rooms = [list(range(len(problem.rooms))) for _ in components]
+    problems: List[ProblemIndex] = [component_problem(problem, component, rooms) for component, rooms in zip(components, component_rooms)]
+    seeds: List[int] = [derive_seed(master_seed, k) for k in range(len(components))]
+    credits: List[int] = [len(component_problem.assignment_courses) for component_problem in problems]
+    observed: bool = observer is not NULL_OBSERVER
+
+    results: List[Tuple[bytes, float, WorkerMetrics]]
+    if workers > 1 and len(components) > 1:
+        workers = min(workers, len(components))
+        worker_budget: SearchBudget = budget.for_worker()
+        with create_worker_pool(workers) as pool:
+            # the largest components are submitted first so they start first
+            futures: List[Future] = [pool.submit(solve_component, problems[k], solver, parameters, seeds[k], observed, worker_budget,
+                                                 workers * credits[k] / sum(credits[k:])) for k in range(len(components))]
+            results = [future.result() for future in futures]
+    else:
+        random_state = random.getstate()
+        results = [solve_component(problems[k], solver, parameters, seeds[k], observed, budget, credits[k] / sum(credits[k:]))
+                   for k in range(len(components))]
+        random.setstate(random_state)
+
+    for _, _, metrics in results:
+        merge_metrics(observer, metrics)
+    observer.count('components', len(components))
+
+    schedule: Schedule = to_schedule(stitch(problem, components, component_rooms, [genes for genes, _, _ in results]), problem)
+    repairs: int = repair_room_clashes(schedule, problem, budget) if repair else 0
+    observer.count('repair_moves', repairs)
+
+    return schedule, {'component_sizes': [len(component) for component in components], 'component_rooms': [len(rooms) for rooms in component_rooms],
+                      'component_objectives': [objective_value for _, objective_value, _ in results], 'repair_moves': repairs}
@@ -0,0 +1,212 @@
+from models import *
+from problem import ProblemIndex
+from moves import Move, SwapMove
+from objective_cache import ObjectiveCache
+from typing import List, Iterable, Tuple
+
+class DeltaEvaluator:
+    # keeps the objective of one live schedule up to date and answers
+    # "how much would this move change it" without rebuilding anything.
+    # every penalty term is a multiple of 0.25, so the running float sum is
+    # exact and stays bit-identical to scheduler.objective
+    schedule: Schedule
+    problem: ProblemIndex
+    penalty: float
+    course_attendees: List[List[List[int]]]  # course -> hour occupancy of its students and lecturers
+    assignment_courses: List[int]
+    assignment_hours: List[int]
+    assignment_rooms: List[int]
+    room_count: List[int]  # room * HOURS_PER_WEEK + hour -> number of assignments
+    room_weight: List[float]  # room * HOURS_PER_WEEK + hour -> summed clash weight
+    capacity_cost: List[List[float]] | None  # the problem's capacity penalty, see ProblemIndex
+
+    def __init__(self, schedule: Schedule, problem: ProblemIndex) -> None:
+        self.schedule = schedule
+        self.problem = problem
+
+        # students and lecturers are penalized the same way, so both are kept as
+        # an hour -> number of classes occupancy list, shared by all their courses
+        self.course_attendees = [[] for _ in problem.courses]
+        for attendee_courses in (problem.student_courses, problem.lecturer_courses):
+            for course_list in attendee_courses:
+                occupancy: List[int] = [0] * HOURS_PER_WEEK
+                for course_idx in course_list:
+                    self.course_attendees[course_idx].append(occupancy)
+
+        self.room_count = [0] * (len(problem.rooms) * HOURS_PER_WEEK)
+        self.room_weight = [0.0] * (len(problem.rooms) * HOURS_PER_WEEK)
+        self.capacity_cost = problem.capacity_cost
+
+        self.assignment_courses = []
+        self.assignment_hours = []
+        self.assignment_rooms = []
+        self.penalty = 0.0
+        for assignment in schedule.assignments:
+            course_idx: int = problem.course_ids[assignment.course.course_id]
+            hour_idx: int = assignment.time_slot.hour_index()
+            room_idx: int = problem.room_ids[assignment.room.room_id]
+            self.assignment_courses.append(course_idx)
+            self.assignment_hours.append(hour_idx)
+            self.assignment_rooms.append(room_idx)
+            self.penalty += self._add(course_idx, hour_idx, room_idx)
+
+    def value(self) -> float:
+        return -self.penalty
+
+    def _add(self, course_idx: int, hour_idx: int, room_idx: int) -> float:
+        penalty: float = 0.0
+
+        for occupancy in self.course_attendees[course_idx]:
+            count: int = occupancy[hour_idx]
+            if count >= 1:
+                penalty += 1
+            occupancy[hour_idx] = count + 1
+
+        room_time: int = room_idx * HOURS_PER_WEEK + hour_idx
+        weight: float = self.problem.course_clash_weight[course_idx]
+        room_count: int = self.room_count[room_time]
+        if room_count >= 2:
+            penalty += weight
+        elif room_count == 1:
+            # the room becomes clashing, so the course already there is penalized too
+            penalty += self.room_weight[room_time] + weight
+        self.room_count[room_time] = room_count + 1
+        self.room_weight[room_time] += weight
+
+        if self.capacity_cost is not None:
+            penalty += self.capacity_cost[course_idx][room_idx]
+        return penalty
+
+    def _remove(self, course_idx: int, hour_idx: int, room_idx: int) -> float:
+        penalty: float = 0.0
+
+        for occupancy in self.course_attendees[course_idx]:
+            count: int = occupancy[hour_idx]
+            if count >= 2:
+                penalty -= 1
+            occupancy[hour_idx] = count - 1
+
+        room_time: int = room_idx * HOURS_PER_WEEK + hour_idx
+        weight: float = self.problem.course_clash_weight[course_idx]
+        room_count: int = self.room_count[room_time]
+        if room_count >= 3:
+            penalty -= weight
+        elif room_count == 2:
+            penalty -= self.room_weight[room_time]
+        self.room_count[room_time] = room_count - 1
+        self.room_weight[room_time] -= weight
+
+        if self.capacity_cost is not None:
+            penalty -= self.capacity_cost[course_idx][room_idx]
+        return penalty
+
+    def assignment_penalty(self, index: int) -> float:
+        # the part of the penalty that would go away with the assignment at index
+        course_idx: int = self.assignment_courses[index]
+        hour_idx: int = self.assignment_hours[index]
+        room_idx: int = self.assignment_rooms[index]
+        penalty: float = -self._remove(course_idx, hour_idx, room_idx)
+        self._add(course_idx, hour_idx, room_idx)
+        return penalty
+
+    def relocate_delta(self, index: int, time_slot: TimeSlot, room: Room) -> float:
+        course_idx: int = self.assignment_courses[index]
+        old_hour: int = self.assignment_hours[index]
+        old_room: int = self.assignment_rooms[index]
+        new_hour: int = time_slot.hour_index()
+        new_room: int = self.problem.room_ids[room.room_id]
+
+        penalty: float = self._remove(course_idx, old_hour, old_room)
+        penalty += self._add(course_idx, new_hour, new_room)
+
+        self._remove(course_idx, new_hour, new_room)
+        self._add(course_idx, old_hour, old_room)
+
+        return -penalty
+
+    def swap_delta(self, index1: int, index2: int) -> float:
+        course1: int = self.assignment_courses[index1]
+        course2: int = self.assignment_courses[index2]
+        hour1: int = self.assignment_hours[index1]
+        hour2: int = self.assignment_hours[index2]
+        room1: int = self.assignment_rooms[index1]
+        room2: int = self.assignment_rooms[index2]
+
+        penalty: float = self._remove(course1, hour1, room1)
+        penalty += self._remove(course2, hour2, room2)
+        penalty += self._add(course1, hour2, room2)
+        penalty += self._add(course2, hour1, room1)
+
+        self._remove(course1, hour2, room2)
+        self._remove(course2, hour1, room1)
+        self._add(course1, hour1, room1)
+        self._add(course2, hour2, room2)
+
+        return -penalty
+
+    def move_delta(self, move: Move) -> float:
+        if isinstance(move, SwapMove):
+            return self.swap_delta(move.index1, move.index2)
+        return self.relocate_delta(move.index, move.time_slot, move.room)
+
+    def cached_move_delta(self, move: Move, cache: ObjectiveCache) -> float:
+        # move_delta through the objective cache, keyed on the fingerprint after the move.
+        # objectives are exact multiples of 0.25, so the difference is the exact delta
+        fingerprint: int = move.fingerprint_after(self.schedule)
+        objective: float | None = cache.get(fingerprint)
+        if objective is not None:
+            return objective + self.penalty
+
+        delta: float = self.move_delta(move)
+        cache.put(fingerprint, delta - self.penalty)
+        return delta
+
+    def best_move(self, moves: Iterable[Move], cache: ObjectiveCache | None = None) -> Tuple[Move | None, float]:
+        # the first move with the largest delta, like a scan over neighbor copies would pick
+        best: Move | None = None
+        best_delta: float = -float('inf')
+
+        for move in moves:
+            delta: float = self.move_delta(move) if cache is None else self.cached_move_delta(move, cache)
+            if delta > best_delta:
+                best = move
+                best_delta = delta
+
+        return best, best_delta
+
+    def _relocate(self, index: int, hour_idx: int, room_idx: int) -> None:
+        course_idx: int = self.assignment_courses[index]
+        self.penalty += self._remove(course_idx, self.assignment_hours[index], self.assignment_rooms[index])
+        self.penalty += self._add(course_idx, hour_idx, room_idx)
+        self.assignment_hours[index] = hour_idx
+        self.assignment_rooms[index] = room_idx
+
+    def _swap(self, index1: int, index2: int) -> None:
+        course1: int = self.assignment_courses[index1]
+        course2: int = self.assignment_courses[index2]
+        hour1: int = self.assignment_hours[index1]
+        hour2: int = self.assignment_hours[index2]
+        room1: int = self.assignment_rooms[index1]
+        room2: int = self.assignment_rooms[index2]
+
+        self.penalty += self._remove(course1, hour1, room1)
+        self.penalty += self._remove(course2, hour2, room2)
+        self.penalty += self._add(course1, hour2, room2)
+        self.penalty += self._add(course2, hour1, room1)
+        self.assignment_hours[index1], self.assignment_hours[index2] = hour2, hour1
+        self.assignment_rooms[index1], self.assignment_rooms[index2] = room2, room1
+
+    def apply_move(self, move: Move) -> None:
+        if isinstance(move, SwapMove):
+            self._swap(move.index1, move.index2)
+        else:
+            self._relocate(move.index, move.time_slot.hour_index(), self.problem.room_ids[move.room.room_id])
+        move.apply(self.schedule)
+
+    def undo_move(self, move: Move) -> None:
+        if isinstance(move, SwapMove):
+            self._swap(move.index1, move.index2)
+        else:
+            assert move.old_time_slot is not None and move.old_room is not None
+            self._relocate(move.index, move.old_time_slot.hour_index(), self.problem.room_ids[move.old_room.room_id])
+        move.undo(self.schedule)
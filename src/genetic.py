@@ -1,90 +1,376 @@
-import copy
 import random
+from array import array
+from bisect import bisect_left
+from heapq import nlargest
+from concurrent.futures import Future, ProcessPoolExecutor
 from typing import Tuple, List, Dict
 from models import *
 from scheduler import *
+from compact import CompactSchedule, to_schedule
+from batch import BatchEvaluator
+from neighbors import directed_mutation
+from constructive import starting_compact_schedule
+from parallel import PopulationEvaluator, create_problem_pool, derive_seed, worker_problem
+from metrics import Observer, NULL_OBSERVER, WorkerMetrics, export_metrics, merge_metrics, worker_recorder
+from budget import SearchBudget, UNLIMITED
+from objective_cache import ObjectiveCache, CompactFingerprints, evaluate_population_cached
 
-def selection(population_objective: List[Tuple[Schedule, float]]) -> Schedule:
-    # using roulette wheel selection
+class RouletteSelection:
+    # fitness proportional selection. the objectives are shifted to positive scores and
+    # summed up once per generation, so every pick is a binary search
+    cumulative: List[float]
+    total: float
 
-    max_absolute_objective: float = 0.0
-    objective_scores: List[float] = []
-    for _, objective_value in population_objective:
-        max_absolute_objective = max(max_absolute_objective, abs(objective_value))
-        objective_scores.append(objective_value)
-    
-    total_objective: float = 0.0
-    for i in range(len(objective_scores)):
-        objective_scores[i] += max_absolute_objective + 1
-        total_objective += objective_scores[i]
+    def __init__(self, objectives: List[float]) -> None:
+        max_absolute_objective: float = 0.0
+        for objective_value in objectives:
+            max_absolute_objective = max(max_absolute_objective, abs(objective_value))
 
-    pick: float = random.random()
+        self.cumulative = []
+        self.total = 0.0
+        for objective_value in objectives:
+            self.total += objective_value + max_absolute_objective + 1
+            self.cumulative.append(self.total)
 
-    sum: float = 0.0
-    for i in range(len(objective_scores)):
-        sum += objective_scores[i]
-        if sum >= pick * total_objective:
-            return population_objective[i][0]
+    def pick(self) -> int:
+        return min(bisect_left(self.cumulative, random.random() * self.total), len(self.cumulative) - 1)
 
-    assert False
+class TournamentSelection:
+    # the best of size individuals drawn uniformly, with replacement
+    objectives: List[float]
+    size: int
 
-def crossover(parent1: Schedule, parent2: Schedule) -> Tuple[Schedule, Schedule]:
-    child1: Schedule = copy.deepcopy(parent1)
-    child2: Schedule = copy.deepcopy(parent2)
+    def __init__(self, objectives: List[float], size: int) -> None:
+        self.objectives = objectives
+        self.size = size
 
-    crossover_point: int = random.randint(0, len(parent1.assignments) - 1)
+    def pick(self) -> int:
+        best: int = random.randrange(len(self.objectives))
+        for _ in range(self.size - 1):
+            challenger: int = random.randrange(len(self.objectives))
+            if self.objectives[challenger] > self.objectives[best]:
+                best = challenger
+        return best
 
-    for i in range(crossover_point):
-        child1.assignments[i].room, child2.assignments[i].room = child2.assignments[i].room, child1.assignments[i].room
-        child1.assignments[i].time_slot, child2.assignments[i].time_slot = child2.assignments[i].time_slot, child1.assignments[i].time_slot
-    
-    return child1, child2
+def create_selection(objectives: List[float], selection_method: str = 'roulette', tournament_size: int = 3) -> RouletteSelection | TournamentSelection:
+    if selection_method == 'roulette':
+        return RouletteSelection(objectives)
+    if selection_method == 'tournament':
+        return TournamentSelection(objectives, tournament_size)
+    raise ValueError(f"unknown selection method {selection_method!r}, expected 'roulette' or 'tournament'")
 
-def mutation(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot]) -> Schedule:
-    return generate_neighbor(schedule, rooms, time_slots)
+def allocate_population(problem: ProblemIndex, count: int) -> List[CompactSchedule]:
+    # genomes for the GA to write children into, reused from generation to generation
+    size: int = len(problem.assignment_courses)
+    return [CompactSchedule(problem.assignment_courses, array('i', [0]) * (2 * size)) for _ in range(count)]
 
-def genetic_algorithm(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], population_size: int, generations: int) -> Tuple[Schedule, Dict[str, List[float]]]:
-    population: List[Schedule] = initialize_population(courses, rooms, time_slots, population_size)
-    population_objective: List[Tuple[Schedule, float]] = evaluate_population(population, students, lecturers)
+def _combine(child: CompactSchedule, head: CompactSchedule, tail: CompactSchedule, point: int) -> None:
+    # child gets the time slots and rooms of head's first point assignments and tail's
+    # others, copied through memoryviews so no temporary array is made
+    size: int = child.size
+    genes: memoryview = memoryview(child.genes)
+    head_genes: memoryview = memoryview(head.genes)
+    tail_genes: memoryview = memoryview(tail.genes)
+    genes[:point] = head_genes[:point]
+    genes[point:size] = tail_genes[point:size]
+    genes[size:size + point] = head_genes[size:size + point]
+    genes[size + point:] = tail_genes[size + point:]
 
-    max_objective_history: List[float] = []
-    avg_objective_history: List[float] = []
+def crossover(parent1: CompactSchedule, parent2: CompactSchedule, child1: CompactSchedule, child2: CompactSchedule | None = None) -> None:
+    # one point crossover written into the child genomes: the time slots and the rooms of
+    # the first crossover_point assignments are exchanged
+    crossover_point: int = random.randint(0, parent1.size - 1)
+    _combine(child1, parent2, parent1, crossover_point)
+    if child2 is not None:
+        _combine(child2, parent1, parent2, crossover_point)
+
+def mutation(schedule: CompactSchedule, problem: ProblemIndex, conflict_bias: float = 0.0) -> CompactSchedule:
+    # same move distribution as generate_move, applied in place on the child and inside the
+    # room domains. with probability conflict_bias a clashing assignment is relocated
+    # instead, see directed_mutation
+    if conflict_bias > 0 and random.random() < conflict_bias and directed_mutation(schedule, problem):
+        return schedule
+
+    size: int = schedule.size
+    genes = schedule.genes
+    courses = schedule.courses
+
+    index: int
+    mutation_type: float = random.random()
+    if mutation_type < 0.5:
+        index1: int
+        index2: int
+        index1, index2 = random.sample(range(size), 2)
+        room1: int = genes[size + index1]
+        room2: int = genes[size + index2]
+        if problem.room_admissible[courses[index1]][room2] and problem.room_admissible[courses[index2]][room1]:
+            genes[index1], genes[index2] = genes[index2], genes[index1]
+            genes[size + index1], genes[size + index2] = room2, room1
+            return schedule
+        # like generate_move, the first assignment is relocated when the rooms do not fit
+        index = index1
+    else:
+        index = random.randint(0, size - 1)
+
+    genes[size + index] = random.choice(problem.room_domains[courses[index]])
+    genes[index] = random.randrange(len(problem.time_slots))
+    return schedule
+
+def next_generation(population_objective: List[Tuple[CompactSchedule, float]], problem: ProblemIndex, children: List[CompactSchedule],
+                    observer: Observer = NULL_OBSERVER, conflict_bias: float = 0.0, selection_method: str = 'roulette',
+                    tournament_size: int = 3) -> List[CompactSchedule]:
+    # fills the children genomes, which must not hold any of the parents, with mutated
+    # crossovers of parents picked from population_objective. the pairs draw their random
+    # numbers like the old copying version; with an odd number of children the last one
+    # gets a pair of parents of its own, its crossover and its mutation drawn after them
+    with observer.timer('selection'):
+        selection: RouletteSelection | TournamentSelection = create_selection([obj for _, obj in population_objective], selection_method, tournament_size)
+
+    for first in range(0, len(children), 2):
+        with observer.timer('selection'):
+            parent1: CompactSchedule = population_objective[selection.pick()][0]
+            parent2: CompactSchedule = population_objective[selection.pick()][0]
+
+        child1: CompactSchedule = children[first]
+        child2: CompactSchedule | None = children[first + 1] if first + 1 < len(children) else None
+        with observer.timer('copy'):
+            crossover(parent1, parent2, child1, child2)
+        observer.count('copies', 1 if child2 is None else 2)
+
+        with observer.timer('neighbor_generation'):
+            mutation(child1, problem, conflict_bias)
+            if child2 is not None:
+                mutation(child2, problem, conflict_bias)
+
+    return children
+
+def breed(population_objective: List[Tuple[CompactSchedule, float]], problem: ProblemIndex, spare: List[CompactSchedule],
+          observer: Observer = NULL_OBSERVER, conflict_bias: float = 0.0, elitism: int = 0, selection_method: str = 'roulette',
+          tournament_size: int = 3) -> Tuple[List[CompactSchedule], List[Tuple[CompactSchedule, float]]]:
+    # the next generation, written into the spare genomes (one per individual, none of them
+    # in population_objective): the children still to be evaluated, and copies of the
+    # elitism best individuals with their objectives. the caller hands the genomes of
+    # population_objective back as the spare ones of the following generation
+    elitism = min(elitism, len(spare))
+    children_count: int = len(spare) - elitism
+    elites: List[Tuple[CompactSchedule, float]] = []
+    with observer.timer('copy'):
+        for (elite, objective_value), genome in zip(nlargest(elitism, population_objective, key=lambda item: item[1]), spare[children_count:]):
+            genome.genes[:] = elite.genes
+            elites.append((genome, objective_value))
+    observer.count('copies', elitism)
+
+    children: List[CompactSchedule] = next_generation(population_objective, problem, spare[:children_count], observer, conflict_bias,
+                                                      selection_method, tournament_size)
+    return children, elites
+
+def _evaluate_generation(population: List[CompactSchedule], evaluator: PopulationEvaluator, observer: Observer,
+                         objective_cache: ObjectiveCache | None, fingerprints: CompactFingerprints | None) -> List[Tuple[CompactSchedule, float]]:
+    population_objective: List[Tuple[CompactSchedule, float]]
+    evaluated: int = len(population)
+    with observer.timer('evaluation'):
+        if objective_cache is None or fingerprints is None:
+            population_objective = evaluator.evaluate_population(population)
+        else:
+            population_objective, evaluated = evaluate_population_cached(evaluator, population, objective_cache, fingerprints)
+    observer.count('evaluations', evaluated)
+    return population_objective
+
+def genetic_algorithm(problem: ProblemIndex, population_size: int, generations: int, workers: int = 1,
+                      observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                      objective_cache: ObjectiveCache | None = None, conflict_bias: float = 0.0,
+                      warm_start: bool = False, elitism: int = 0, selection_method: str = 'roulette',
+                      tournament_size: int = 3) -> Tuple[Schedule, Dict[str, List[float]]]:
+    # with workers > 1 every generation is scored on a process pool; the random
+    # choices all stay in this process, so a seeded run gives the same result.
+    # with an objective cache only the children not seen before are scored. two sets of
+    # genomes take turns holding the population, so a generation allocates nothing; the
+    # best individual is copied out only when it improves
+    evaluator: PopulationEvaluator = PopulationEvaluator(problem, workers)
+    fingerprints: CompactFingerprints | None = CompactFingerprints(problem) if objective_cache is not None else None
+
+    try:
+        population: List[CompactSchedule] = [starting_compact_schedule(problem, warm_start) for _ in range(population_size)]
+        population_objective: List[Tuple[CompactSchedule, float]] = _evaluate_generation(population, evaluator, observer, objective_cache, fingerprints)
+        spare: List[CompactSchedule] = allocate_population(problem, population_size)
+
+        max_objective_history: List[float] = []
+        avg_objective_history: List[float] = []
+
+        # the best of the initial population, so it is returned even when no generation runs
+        initial_best: Tuple[CompactSchedule, float] = max(population_objective, key=lambda item: item[1])
+        best_schedule: Tuple[CompactSchedule, float] = (initial_best[0].copy(), initial_best[1])
+
+        for generation in range(generations):
+            if budget.expired():
+                break
+
+            # Track statistics
+            objective_values: List[float] = [obj for _, obj in population_objective]
+            max_objective_history.append(max(objective_values))
+            avg_objective_history.append(sum(objective_values) / len(objective_values))
+
+            children: List[CompactSchedule]
+            elites: List[Tuple[CompactSchedule, float]]
+            children, elites = breed(population_objective, problem, spare, observer, conflict_bias, elitism, selection_method, tournament_size)
+            spare = [compact for compact, _ in population_objective]
+            population_objective = _evaluate_generation(children, evaluator, observer, objective_cache, fingerprints) + elites
 
-    best_schedule: Tuple[Schedule, float] = population_objective[0]
+            generation_best: Tuple[CompactSchedule, float] = max(population_objective, key=lambda item: item[1])
+            if best_schedule[1] < generation_best[1]:
+                best_schedule = (generation_best[0].copy(), generation_best[1])
+            observer.progress(generation + 1, best_schedule[1])
+    finally:
+        evaluator.close()
 
+    statistics: Dict[str, List[float]] = {
+        'max_objective': max_objective_history,
+        'avg_objective': avg_objective_history
+    }
+
+    return to_schedule(best_schedule[0], problem), statistics
+
+# an island population shipped between processes: gene buffers and their objectives
+IslandState = Tuple[List[bytes], List[float]]
+
+# new island state, per-generation max and average objective, best individual seen in the epoch, metrics of the epoch
+IslandResult = Tuple[IslandState, List[float], List[float], bytes, float, WorkerMetrics]
+
+def evolve_island(problem: ProblemIndex, state: IslandState | None, population_size: int, generations: int, observed: bool,
+                  budget: SearchBudget = UNLIMITED, warm_start: bool = False) -> IslandResult:
+    # runs a few generations of one island with the plain GA operators; the population
+    # is created here on the first epoch. an island stops early when the budget runs out
+    batch_evaluator: BatchEvaluator = BatchEvaluator(problem)
+    recorder: Observer = worker_recorder(observed)
+
+    population_objective: List[Tuple[CompactSchedule, float]]
+    if state is None:
+        population: List[CompactSchedule] = [starting_compact_schedule(problem, warm_start) for _ in range(population_size)]
+        with recorder.timer('evaluation'):
+            population_objective = batch_evaluator.evaluate_population(population)
+        recorder.count('evaluations', len(population))
+    else:
+        population_objective = []
+        for genes_bytes, objective_value in zip(*state):
+            genes: array = array('i')
+            genes.frombytes(genes_bytes)
+            population_objective.append((CompactSchedule(problem.assignment_courses, genes), objective_value))
+
+    best_schedule: Tuple[CompactSchedule, float] = max(population_objective, key=lambda item: item[1])
+    best_schedule = (best_schedule[0].copy(), best_schedule[1])
+    spare: List[CompactSchedule] = allocate_population(problem, len(population_objective))
+    max_objective_history: List[float] = []
+    avg_objective_history: List[float] = []
     for _ in range(generations):
-        # Track statistics
+        if budget.expired():
+            break
         objective_values: List[float] = [obj for _, obj in population_objective]
         max_objective_history.append(max(objective_values))
         avg_objective_history.append(sum(objective_values) / len(objective_values))
 
-        new_population: List[Schedule] = []
+        children: List[CompactSchedule] = next_generation(population_objective, problem, spare, recorder)
+        spare = [compact for compact, _ in population_objective]
+        with recorder.timer('evaluation'):
+            population_objective = batch_evaluator.evaluate_population(children)
+        recorder.count('evaluations', len(children))
+
+        generation_best: Tuple[CompactSchedule, float] = max(population_objective, key=lambda item: item[1])
+        if best_schedule[1] < generation_best[1]:
+            best_schedule = (generation_best[0].copy(), generation_best[1])
+
+    new_state: IslandState = ([c.genes.tobytes() for c, _ in population_objective], [obj for _, obj in population_objective])
+    return new_state, max_objective_history, avg_objective_history, best_schedule[0].genes.tobytes(), best_schedule[1], export_metrics(recorder)
+
+def _evolve_island_worker(island_seed: int, state: IslandState | None, population_size: int, generations: int, observed: bool,
+                          budget: SearchBudget, warm_start: bool) -> IslandResult:
+    random.seed(island_seed)
+    return evolve_island(worker_problem(), state, population_size, generations, observed, budget, warm_start)
 
-        for _ in range(population_size // 2):
-            parent1: Schedule = selection(population_objective)
-            parent2: Schedule = selection(population_objective)
+def migrate(states: List[IslandState], migrants: int) -> None:
+    # ring migration: the best of island k replace the worst of island k + 1
+    outgoing: List[List[Tuple[bytes, float]]] = []
+    for genes_list, objectives in states:
+        ranked: List[int] = sorted(range(len(objectives)), key=lambda i: objectives[i], reverse=True)
+        outgoing.append([(genes_list[i], objectives[i]) for i in ranked[:migrants]])
 
-            child1: Schedule
-            child2: Schedule
-            child1, child2 = crossover(parent1, parent2)
+    for k, (genes_list, objectives) in enumerate(states):
+        incoming: List[Tuple[bytes, float]] = outgoing[(k - 1) % len(states)]
+        worst: List[int] = sorted(range(len(objectives)), key=lambda i: objectives[i])[:len(incoming)]
+        for i, (genes_bytes, objective_value) in zip(worst, incoming):
+            genes_list[i] = genes_bytes
+            objectives[i] = objective_value
 
-            child1 = mutation(child1, rooms, time_slots)
-            child2 = mutation(child2, rooms, time_slots)
+def island_genetic_algorithm(problem: ProblemIndex, population_size: int, generations: int, islands: int = 4, migration_interval: int = 10,
+                             migrants: int = 2, workers: int | None = None, seed: int | None = None,
+                             observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                             warm_start: bool = False) -> Tuple[Schedule, Dict[str, List[float]]]:
+    # islands of population_size individuals evolve in separate processes. every
+    # migration_interval generations each island sends copies of its best migrants
+    # individuals to the next island in a ring, where they replace the worst ones.
+    # every island epoch has its own derived seed, so a seeded run does not depend on workers.
+    # the first epoch always runs, so there is a best individual even on an expired budget
+    master_seed: int = seed if seed is not None else random.getrandbits(64)
+    workers = islands if workers is None else workers
 
-            new_population.append(child1)
-            if len(new_population) < population_size:
-                new_population.append(child2)
+    states: List[IslandState | None] = [None] * islands
+    island_max: List[List[float]] = [[] for _ in range(islands)]
+    island_avg: List[List[float]] = [[] for _ in range(islands)]
+    best_genes: bytes | None = None
+    best_objective: float = -float('inf')
+    observed: bool = observer is not NULL_OBSERVER
+    worker_budget: SearchBudget = budget.for_worker()
 
-        population = new_population
-        population_objective = evaluate_population(population, students, lecturers)
+    pool: ProcessPoolExecutor | None = create_problem_pool(problem, workers) if workers > 1 else None
+    try:
+        epoch: int = 0
+        done: int = 0
+        while done < generations:
+            if epoch > 0 and budget.expired():
+                break
+            epoch_generations: int = min(migration_interval, generations - done)
+            island_seeds: List[int] = [derive_seed(master_seed, epoch * islands + k) for k in range(islands)]
 
-        for i in range(len(population_objective)):
-            if best_schedule[1] < population_objective[i][1]:
-                best_schedule = population_objective[i]
+            results: List[IslandResult]
+            if pool is not None:
+                futures: List[Future] = [pool.submit(_evolve_island_worker, island_seeds[k], states[k], population_size, epoch_generations, observed, worker_budget, warm_start) for k in range(islands)]
+                results = [future.result() for future in futures]
+            else:
+                random_state = random.getstate()
+                results = []
+                for k in range(islands):
+                    random.seed(island_seeds[k])
+                    results.append(evolve_island(problem, states[k], population_size, epoch_generations, observed, budget, warm_start))
+                random.setstate(random_state)
+
+            for k, (state, max_history, avg_history, island_best_genes, island_best_objective, metrics) in enumerate(results):
+                states[k] = state
+                merge_metrics(observer, metrics)
+                island_max[k].extend(max_history)
+                island_avg[k].extend(avg_history)
+                if island_best_objective > best_objective:
+                    best_genes = island_best_genes
+                    best_objective = island_best_objective
+
+            done += epoch_generations
+            epoch += 1
+            observer.progress(done, best_objective)
+            if islands > 1 and done < generations:
+                migrate(states, migrants)  # type: ignore
+                observer.count('migrations')
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    assert best_genes is not None
+    genes: array = array('i')
+    genes.frombytes(best_genes)
 
     statistics: Dict[str, List[float]] = {
-        'max_objective': max_objective_history,
-        'avg_objective': avg_objective_history
+        'max_objective': [max(values) for values in zip(*island_max)],
+        'avg_objective': [sum(values) / islands for values in zip(*island_avg)]
     }
+    for k in range(islands):
+        statistics[f'island_{k}_max_objective'] = island_max[k]
+        statistics[f'island_{k}_avg_objective'] = island_avg[k]
 
-    return best_schedule[0], statistics
\ No newline at end of file
+    return to_schedule(CompactSchedule(problem.assignment_courses, genes), problem), statistics
@@ -1,118 +1,207 @@
 import time
+import random
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from models import *
-from scheduler import objective, generate_initial_schedule, generate_neighbor
-from typing import List, Tuple
-import copy
+from problem import ProblemIndex
+from moves import Move
+from scheduler import indexed_objective
+from evaluator import DeltaEvaluator
+from neighbors import ConflictTrackingEvaluator, DontLookScanner, NeighborGenerator, create_search_evaluator
+from constructive import starting_schedule
+from compact import CompactSchedule, to_compact_schedule, to_schedule
+from parallel import NeighborhoodScanner, create_problem_pool, derive_seed, worker_problem
+from metrics import Observer, NULL_OBSERVER, WorkerMetrics, export_metrics, merge_metrics, worker_recorder
+from budget import SearchBudget, UNLIMITED
+from objective_cache import ObjectiveCache
+from typing import List, Tuple, Dict
 
-def steepest_ascent_hill_climbing_sampling(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], max_iterations: int, neighbors_to_check: int) -> Tuple[Schedule, List[float], int, float]:
+def steepest_ascent_hill_climbing_sampling(problem: ProblemIndex, max_iterations: int, neighbors_to_check: int,
+                                           observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                           objective_cache: ObjectiveCache | None = None, conflict_bias: float = 0.0,
+                                           warm_start: bool = False) -> Tuple[Schedule, List[float], int, float]:
+    # conflict_bias is the share of moves directed at clashing assignments, see NeighborGenerator.
+    # with warm_start the search starts from the greedy construction instead of a random schedule
     start_time: float = time.time()
-    
-    current_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    current_objective: float = objective(current_schedule, students, lecturers)
+
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = create_search_evaluator(current_schedule, problem, conflict_bias)
+    neighbors: NeighborGenerator = NeighborGenerator(evaluator, conflict_bias)
+    current_objective: float = evaluator.value()
     objective_history: List[float] = [current_objective]
-    
+
     iterations: int = 0
     for i in range(max_iterations):
+        if budget.expired():
+            print(f"-> Steepest-Ascent: Search budget exhausted after {iterations} iterations.")
+            break
         iterations = i + 1
-        best_neighbor: Schedule | None = None
-        best_neighbor_objective: float = -float('inf')
-
-        for _ in range(neighbors_to_check):
-            neighbor: Schedule = generate_neighbor(current_schedule, rooms, time_slots)
-            neighbor_objective: float = objective(neighbor, students, lecturers)
-            if neighbor_objective > best_neighbor_objective:
-                best_neighbor = neighbor
-                best_neighbor_objective = neighbor_objective
-        
-        if best_neighbor_objective > current_objective:
-            current_schedule = best_neighbor  # type: ignore
-            current_objective = best_neighbor_objective
+        best_move: Move | None
+        best_delta: float
+        with observer.timer('neighbor_generation'):
+            moves: List[Move] = neighbors.moves(neighbors_to_check)
+        with observer.timer('evaluation'):
+            best_move, best_delta = evaluator.best_move(moves, objective_cache)
+        observer.count('evaluations', len(moves))
+
+        if best_delta > 0:
+            evaluator.apply_move(best_move)  # type: ignore
+            current_objective += best_delta
             objective_history.append(current_objective)
+            observer.count('moves_accepted')
+            observer.count('moves_rejected', len(moves) - 1)
+            observer.progress(iterations, current_objective)
         else:
+            observer.count('moves_rejected', len(moves))
             print(f"-> Steepest-Ascent: Local optimum reached at iteration {iterations}.")
             break
 
     duration: float = time.time() - start_time
     return current_schedule, objective_history, iterations, duration
 
-def steepest_ascent_hill_climbing_full(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], max_iterations: int) -> Tuple[Schedule, List[float], int, float]:
+def first_improvement_hill_climbing(problem: ProblemIndex, max_iterations: int, max_sideways_moves: int, name: str, stop_message: str,
+                                    scan_order: str = 'conflicts', observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                    warm_start: bool = False) -> Tuple[Schedule, List[float], int, float]:
+    # the first-improvement mode of the full climbers: every iteration takes the first
+    # improving move DontLookScanner finds. at a local optimum up to max_sideways_moves
+    # consecutive moves that keep the objective are taken. stops only at a true local
+    # optimum of the full neighborhood, like the best-improvement scan
     start_time: float = time.time()
-    
-    current_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    current_objective: float = objective(current_schedule, students, lecturers)
+
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: ConflictTrackingEvaluator = ConflictTrackingEvaluator(current_schedule, problem)
+    scanner: DontLookScanner = DontLookScanner(evaluator, scan_order)
+    current_objective: float = evaluator.value()
     objective_history: List[float] = [current_objective]
-    
+
+    sideways_moves_count: int = 0
     iterations: int = 0
     for i in range(max_iterations):
+        if budget.expired():
+            print(f"-> {name}: Search budget exhausted after {iterations} iterations.")
+            break
         iterations = i + 1
-        best_neighbor: Schedule | None = None
-        best_neighbor_objective: float = -float('inf')
-        
-        num_assignments = len(current_schedule.assignments)
-
-        for ass_i in range(num_assignments):
-            for ass_j in range(ass_i + 1, num_assignments):
-                neighbor = copy.deepcopy(current_schedule)
-                
-                neighbor.assignments[ass_i].room, neighbor.assignments[ass_j].room = neighbor.assignments[ass_j].room, neighbor.assignments[ass_i].room
-                neighbor.assignments[ass_i].time_slot, neighbor.assignments[ass_j].time_slot = neighbor.assignments[ass_j].time_slot, neighbor.assignments[ass_i].time_slot
-                
-                neighbor_objective: float = objective(neighbor, students, lecturers)
-                if neighbor_objective > best_neighbor_objective:
-                    best_neighbor = neighbor
-                    best_neighbor_objective = neighbor_objective
-
-        for ass_i in range(num_assignments):
-            original_room_id = current_schedule.assignments[ass_i].room.room_id
-            original_time_slot_idx = current_schedule.assignments[ass_i].time_slot.hour_index()
-            for room in rooms:
-                for time_slot in time_slots:
-                    if room.room_id == original_room_id and time_slot.hour_index() == original_time_slot_idx:
-                        continue
-                    
-                    neighbor = copy.deepcopy(current_schedule)
-                    neighbor.assignments[ass_i].room = room
-                    neighbor.assignments[ass_i].time_slot = time_slot
-                    
-                    neighbor_objective: float = objective(neighbor, students, lecturers)
-                    if neighbor_objective > best_neighbor_objective:
-                        best_neighbor = neighbor
-                        best_neighbor_objective = neighbor_objective
-
-        if best_neighbor_objective > current_objective:
-            current_schedule = best_neighbor  # type: ignore
-            current_objective = best_neighbor_objective
+        move: Move | None
+        delta: float
+        evaluated: int
+        with observer.timer('evaluation'):
+            move, delta, evaluated = scanner.next_move()
+        observer.count('evaluations', evaluated)
+
+        if move is not None:
+            scanner.apply_move(move)
+            current_objective += delta
             objective_history.append(current_objective)
-        else:
-            print(f"-> Steepest-Ascent (Full): Local optimum reached at iteration {iterations}.")
-            break
+            sideways_moves_count = 0
+            observer.count('moves_accepted')
+            observer.count('moves_rejected', evaluated - 1)
+            observer.progress(iterations, current_objective)
+            continue
+        observer.count('moves_rejected', evaluated)
+
+        if sideways_moves_count < max_sideways_moves:
+            with observer.timer('evaluation'):
+                move, evaluated = scanner.sideways_move()
+            observer.count('evaluations', evaluated)
+            if move is not None:
+                scanner.apply_move(move)
+                objective_history.append(current_objective)
+                sideways_moves_count += 1
+                observer.count('sideways_moves')
+                observer.count('moves_rejected', evaluated - 1)
+                observer.progress(iterations, current_objective)
+                continue
+            observer.count('moves_rejected', evaluated)
+
+        print(f"-> {name}: {stop_message} at iteration {iterations}.")
+        break
 
     duration: float = time.time() - start_time
     return current_schedule, objective_history, iterations, duration
 
-def stochastic_hill_climbing(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], max_iterations: int, max_stuck_iterations: int) -> Tuple[Schedule, List[float], int, float]:
+def steepest_ascent_hill_climbing_full(problem: ProblemIndex, max_iterations: int, workers: int = 1,
+                                       observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                       warm_start: bool = False, first_improvement: bool = False,
+                                       scan_order: str = 'conflicts') -> Tuple[Schedule, List[float], int, float]:
+    # with first_improvement the neighborhood is scanned with don't-look bits instead, in
+    # this process, see first_improvement_hill_climbing
+    if first_improvement:
+        return first_improvement_hill_climbing(problem, max_iterations, 0, "Steepest-Ascent (Full)", "Local optimum reached",
+                                               scan_order, observer, budget, warm_start)
     start_time: float = time.time()
 
-    current_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    current_objective: float = objective(current_schedule, students, lecturers)
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = DeltaEvaluator(current_schedule, problem)
+    current_objective: float = evaluator.value()
+    objective_history: List[float] = [current_objective]
+
+    iterations: int = 0
+    # with workers > 1 the neighborhood is scanned in shards on a process pool
+    with NeighborhoodScanner(problem, workers) as scanner:
+        for i in range(max_iterations):
+            if budget.expired():
+                print(f"-> Steepest-Ascent (Full): Search budget exhausted after {iterations} iterations.")
+                break
+            iterations = i + 1
+            best_move: Move | None
+            best_delta: float
+            neighborhood_size: int
+            with observer.timer('evaluation'):
+                best_move, best_delta, neighborhood_size = scanner.best_move(evaluator)
+            observer.count('evaluations', neighborhood_size)
+
+            if best_delta > 0:
+                evaluator.apply_move(best_move)  # type: ignore
+                current_objective += best_delta
+                objective_history.append(current_objective)
+                observer.count('moves_accepted')
+                observer.count('moves_rejected', neighborhood_size - 1)
+                observer.progress(iterations, current_objective)
+            else:
+                observer.count('moves_rejected', neighborhood_size)
+                print(f"-> Steepest-Ascent (Full): Local optimum reached at iteration {iterations}.")
+                break
+
+    duration: float = time.time() - start_time
+    return current_schedule, objective_history, iterations, duration
+
+def stochastic_hill_climbing(problem: ProblemIndex, max_iterations: int, max_stuck_iterations: int,
+                             observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                             objective_cache: ObjectiveCache | None = None, conflict_bias: float = 0.0,
+                             warm_start: bool = False) -> Tuple[Schedule, List[float], int, float]:
+    start_time: float = time.time()
+
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = create_search_evaluator(current_schedule, problem, conflict_bias)
+    neighbors: NeighborGenerator = NeighborGenerator(evaluator, conflict_bias)
+    current_objective: float = evaluator.value()
     objective_history: List[float] = [current_objective]
 
     iterations: int = 0
     stuck_count: int = 0
 
     for i in range(max_iterations):
+        if budget.expired():
+            print(f"-> Stochastic: Search budget exhausted after {iterations} iterations.")
+            break
         iterations = i + 1
-        
-        neighbor: Schedule = generate_neighbor(current_schedule, rooms, time_slots)
-        neighbor_objective: float = objective(neighbor, students, lecturers)
 
-        if neighbor_objective > current_objective:
-            current_schedule = neighbor
-            current_objective = neighbor_objective
+        with observer.timer('neighbor_generation'):
+            move: Move = neighbors.move()
+        with observer.timer('evaluation'):
+            delta: float = evaluator.move_delta(move) if objective_cache is None else evaluator.cached_move_delta(move, objective_cache)
+        observer.count('evaluations')
+
+        if delta > 0:
+            evaluator.apply_move(move)
+            current_objective += delta
             objective_history.append(current_objective)
             stuck_count = 0
+            observer.count('moves_accepted')
         else:
             stuck_count += 1
+            observer.count('moves_rejected')
+        observer.progress(iterations, current_objective)
 
         if stuck_count >= max_stuck_iterations:
             print(f"-> Stochastic: Local optimum reached after {stuck_count} iterations without improvement.")
@@ -121,138 +210,218 @@ def stochastic_hill_climbing(courses: List[Course], rooms: List[Room], time_slot
     duration: float = time.time() - start_time
     return current_schedule, objective_history, iterations, duration
 
-def hill_climbing_with_sideways_moves_sampling(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], max_iterations: int, max_sideways_moves: int) -> Tuple[Schedule, List[float], int, float]:
+def hill_climbing_with_sideways_moves_sampling(problem: ProblemIndex, max_iterations: int, max_sideways_moves: int,
+                                               observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                               objective_cache: ObjectiveCache | None = None, conflict_bias: float = 0.0,
+                                               warm_start: bool = False) -> Tuple[Schedule, List[float], int, float]:
     start_time: float = time.time()
 
-    current_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    current_objective: float = objective(current_schedule, students, lecturers)
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = create_search_evaluator(current_schedule, problem, conflict_bias)
+    neighbors: NeighborGenerator = NeighborGenerator(evaluator, conflict_bias)
+    current_objective: float = evaluator.value()
     objective_history: List[float] = [current_objective]
-    
+
     sideways_moves_count: int = 0
     iterations: int = 0
     for i in range(max_iterations):
+        if budget.expired():
+            print(f"-> Sideways-Move: Search budget exhausted after {iterations} iterations.")
+            break
         iterations = i + 1
-        best_neighbor: Schedule | None = None
-        best_neighbor_objective: float = -float('inf')
-
-        for _ in range(50):
-            neighbor: Schedule = generate_neighbor(current_schedule, rooms, time_slots)
-            neighbor_objective: float = objective(neighbor, students, lecturers)
-            if neighbor_objective > best_neighbor_objective:
-                best_neighbor = neighbor
-                best_neighbor_objective = neighbor_objective
-        
-        if best_neighbor_objective > current_objective:
-            assert best_neighbor is not None # make sure best_neighbor is not None before use
-            current_schedule = best_neighbor
-            current_objective = best_neighbor_objective
+        best_move: Move | None
+        best_delta: float
+        with observer.timer('neighbor_generation'):
+            moves: List[Move] = neighbors.moves(50)
+        with observer.timer('evaluation'):
+            best_move, best_delta = evaluator.best_move(moves, objective_cache)
+        observer.count('evaluations', len(moves))
+
+        if best_delta > 0:
+            assert best_move is not None # make sure best_move is not None before use
+            evaluator.apply_move(best_move)
+            current_objective += best_delta
             objective_history.append(current_objective)
             sideways_moves_count = 0
-        elif best_neighbor_objective == current_objective and sideways_moves_count < max_sideways_moves:
-            assert best_neighbor is not None # make sure best_neighbor is not None before use
-            current_objective = best_neighbor_objective
+            observer.count('moves_accepted')
+            observer.count('moves_rejected', len(moves) - 1)
+            observer.progress(iterations, current_objective)
+        elif best_delta == 0 and sideways_moves_count < max_sideways_moves:
+            assert best_move is not None # make sure best_move is not None before use
+            evaluator.apply_move(best_move)
             objective_history.append(current_objective)
             sideways_moves_count += 1
+            observer.count('sideways_moves')
+            observer.count('moves_rejected', len(moves) - 1)
+            observer.progress(iterations, current_objective)
         else:
+            observer.count('moves_rejected', len(moves))
             print(f"-> Sideways-Move: Optimum reached or sideways limit exceeded at iteration {iterations}.")
             break
 
     duration: float = time.time() - start_time
     return current_schedule, objective_history, iterations, duration
 
-def hill_climbing_with_sideways_moves_full(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], max_iterations: int, max_sideways_moves: int) -> Tuple[Schedule, List[float], int, float]:
+def hill_climbing_with_sideways_moves_full(problem: ProblemIndex, max_iterations: int, max_sideways_moves: int, workers: int = 1,
+                                           observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                           warm_start: bool = False, first_improvement: bool = False,
+                                           scan_order: str = 'conflicts') -> Tuple[Schedule, List[float], int, float]:
+    if first_improvement:
+        return first_improvement_hill_climbing(problem, max_iterations, max_sideways_moves, "Sideways-Move (Full)",
+                                               "Optimum reached or sideways limit exceeded", scan_order, observer, budget, warm_start)
     start_time: float = time.time()
 
-    current_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    current_objective: float = objective(current_schedule, students, lecturers)
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = DeltaEvaluator(current_schedule, problem)
+    current_objective: float = evaluator.value()
     objective_history: List[float] = [current_objective]
-    
+
     sideways_moves_count: int = 0
     iterations: int = 0
-    for i in range(max_iterations):
-        iterations = i + 1
-        best_neighbor: Schedule | None = None
-        best_neighbor_objective: float = -float('inf')
-
-        num_assignments = len(current_schedule.assignments)
-
-        for ass_i in range(num_assignments):
-            for ass_j in range(ass_i + 1, num_assignments):
-                neighbor = copy.deepcopy(current_schedule)
-                neighbor.assignments[ass_i].room, neighbor.assignments[ass_j].room = neighbor.assignments[ass_j].room, neighbor.assignments[ass_i].room
-                neighbor.assignments[ass_i].time_slot, neighbor.assignments[ass_j].time_slot = neighbor.assignments[ass_j].time_slot, neighbor.assignments[ass_i].time_slot
-                
-                neighbor_objective: float = objective(neighbor, students, lecturers)
-                if neighbor_objective > best_neighbor_objective:
-                    best_neighbor = neighbor
-                    best_neighbor_objective = neighbor_objective
-
-        for ass_i in range(num_assignments):
-            original_room_id = current_schedule.assignments[ass_i].room.room_id
-            original_time_slot_idx = current_schedule.assignments[ass_i].time_slot.hour_index()
-            for room in rooms:
-                for time_slot in time_slots:
-                    if room.room_id == original_room_id and time_slot.hour_index() == original_time_slot_idx:
-                        continue
-                    
-                    neighbor = copy.deepcopy(current_schedule)
-                    neighbor.assignments[ass_i].room = room
-                    neighbor.assignments[ass_i].time_slot = time_slot
-                    
-                    neighbor_objective: float = objective(neighbor, students, lecturers)
-                    if neighbor_objective > best_neighbor_objective:
-                        best_neighbor = neighbor
-                        best_neighbor_objective = neighbor_objective
-        
-        if best_neighbor_objective > current_objective:
-            assert best_neighbor is not None
-            current_schedule = best_neighbor
-            current_objective = best_neighbor_objective
-            objective_history.append(current_objective)
-            sideways_moves_count = 0
-        elif best_neighbor_objective == current_objective and sideways_moves_count < max_sideways_moves:
-            assert best_neighbor is not None
-            current_schedule = best_neighbor
-            current_objective = best_neighbor_objective
-            objective_history.append(current_objective)
-            sideways_moves_count += 1
-        else:
-            print(f"-> Sideways-Move (Full): Optimum reached or sideways limit exceeded at iteration {iterations}.")
-            break
+    # with workers > 1 the neighborhood is scanned in shards on a process pool
+    with NeighborhoodScanner(problem, workers) as scanner:
+        for i in range(max_iterations):
+            if budget.expired():
+                print(f"-> Sideways-Move (Full): Search budget exhausted after {iterations} iterations.")
+                break
+            iterations = i + 1
+            best_move: Move | None
+            best_delta: float
+            neighborhood_size: int
+            with observer.timer('evaluation'):
+                best_move, best_delta, neighborhood_size = scanner.best_move(evaluator)
+            observer.count('evaluations', neighborhood_size)
+
+            if best_delta > 0:
+                assert best_move is not None
+                evaluator.apply_move(best_move)
+                current_objective += best_delta
+                objective_history.append(current_objective)
+                sideways_moves_count = 0
+                observer.count('moves_accepted')
+                observer.count('moves_rejected', neighborhood_size - 1)
+                observer.progress(iterations, current_objective)
+            elif best_delta == 0 and sideways_moves_count < max_sideways_moves:
+                assert best_move is not None
+                evaluator.apply_move(best_move)
+                objective_history.append(current_objective)
+                sideways_moves_count += 1
+                observer.count('sideways_moves')
+                observer.count('moves_rejected', neighborhood_size - 1)
+                observer.progress(iterations, current_objective)
+            else:
+                observer.count('moves_rejected', neighborhood_size)
+                print(f"-> Sideways-Move (Full): Optimum reached or sideways limit exceeded at iteration {iterations}.")
+                break
 
     duration: float = time.time() - start_time
     return current_schedule, objective_history, iterations, duration
 
-def random_restart_hill_climbing(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer], num_restarts: int, max_iter_per_restart: int) -> Tuple[Schedule, List[float], int, float, int]:
+def _run_restart(restart_seed: int, max_iter_per_restart: int, observed: bool, budget: SearchBudget,
+                 conflict_bias: float, warm_start: bool) -> Tuple[bytes, float, int, WorkerMetrics]:
+    # one restart inside a pool worker; the schedule travels back as its compact genes
+    problem: ProblemIndex = worker_problem()
+    random.seed(restart_seed)
+    recorder: Observer = worker_recorder(observed)
+    schedule, _, iterations, _ = steepest_ascent_hill_climbing_sampling(problem, max_iterations=max_iter_per_restart, neighbors_to_check=50, observer=recorder, budget=budget,
+                                                                    conflict_bias=conflict_bias, warm_start=warm_start)
+    return to_compact_schedule(schedule, problem).genes.tobytes(), indexed_objective(schedule, problem), iterations, export_metrics(recorder)
+
+def random_restart_hill_climbing(problem: ProblemIndex, num_restarts: int, max_iter_per_restart: int, workers: int = 1, seed: int | None = None,
+                                 observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                 objective_cache: ObjectiveCache | None = None, conflict_bias: float = 0.0,
+                                 warm_start: bool = False) -> Tuple[Schedule, List[float], int, float, int]:
+    # every restart runs on its own seed derived from the master seed, so a seeded
+    # run gives the same restarts whatever the number of workers. when the budget runs
+    # out the restarts that did not finish are dropped. the objective cache is only used
+    # by the restarts that run in this process
     start_time: float = time.time()
-    
+
+    master_seed: int = seed if seed is not None else random.getrandbits(64)
+    restart_schedules: List[Schedule | None] = [None] * num_restarts
+    restart_objectives: List[float] = [-float('inf')] * num_restarts
+    total_iterations: int = 0
+    completed_best_objective: float = -float('inf')
+
+    print(f"Starting Random-Restart Hill-Climbing with {num_restarts} restarts.")
+    if workers <= 1:
+        state = random.getstate()
+        for i in range(num_restarts):
+            if i > 0 and budget.expired():
+                print(f"  -> Search budget exhausted after {i} restarts.")
+                break
+            print(f"  -> Restart #{i + 1}/{num_restarts}...")
+            random.seed(derive_seed(master_seed, i))
+
+            schedule: Schedule
+            iterations: int
+            schedule, _, iterations, _ = steepest_ascent_hill_climbing_sampling(
+                problem,
+                max_iterations=max_iter_per_restart,
+                neighbors_to_check=50,
+                observer=observer,
+                budget=budget,
+                objective_cache=objective_cache,
+                conflict_bias=conflict_bias,
+                warm_start=warm_start
+            )
+
+            restart_schedules[i] = schedule
+            restart_objectives[i] = indexed_objective(schedule, problem)
+            total_iterations += iterations
+            observer.count('restarts')
+
+            if restart_objectives[i] > completed_best_objective:
+                completed_best_objective = restart_objectives[i]
+                print(f"  -> New global best found with objective: {completed_best_objective:.2f}")
+        random.setstate(state)
+    else:
+        with create_problem_pool(problem, workers) as pool:
+            observed: bool = observer is not NULL_OBSERVER
+            worker_budget: SearchBudget = budget.for_worker()
+            futures: Dict[Future, int] = {}
+            next_restart: int = 0
+
+            # at most two restarts per worker are queued at a time, so once the budget
+            # runs out no new restart is started; the running ones see the deadline
+            # themselves. progress is reported in completion order
+            while futures or next_restart < num_restarts:
+                while next_restart < num_restarts and len(futures) < 2 * workers and not budget.expired():
+                    futures[pool.submit(_run_restart, derive_seed(master_seed, next_restart), max_iter_per_restart, observed, worker_budget, conflict_bias, warm_start)] = next_restart
+                    next_restart += 1
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = futures.pop(future)
+                    genes: bytes
+                    metrics: WorkerMetrics
+                    genes, restart_objectives[i], iterations, metrics = future.result()
+                    merge_metrics(observer, metrics)
+                    observer.count('restarts')
+                    compact_genes: array = array('i')
+                    compact_genes.frombytes(genes)
+                    restart_schedules[i] = to_schedule(CompactSchedule(problem.assignment_courses, compact_genes), problem)
+                    total_iterations += iterations
+
+                    print(f"  -> Restart #{i + 1}/{num_restarts} finished.")
+                    if restart_objectives[i] > completed_best_objective:
+                        completed_best_objective = restart_objectives[i]
+                        print(f"  -> New global best found with objective: {completed_best_objective:.2f}")
+                    observer.progress(i + 1, completed_best_objective)
+
+    # the best objective after each finished restart, in restart order
     global_best_schedule: Schedule | None = None
     global_best_objective: float = -float('inf')
-    total_iterations: int = 0
     objective_history_per_restart: List[float] = []
-    
-    print(f"Starting Random-Restart Hill-Climbing with {num_restarts} restarts.")
     for i in range(num_restarts):
-        print(f"  -> Restart #{i + 1}/{num_restarts}...")
-        
-        schedule: Schedule
-        _: List[float]
-        iterations: int
-        schedule, _, iterations, _ = steepest_ascent_hill_climbing_sampling(
-            courses, rooms, time_slots, students, lecturers,
-            max_iterations=max_iter_per_restart, 
-            neighbors_to_check=50
-        )
-        
-        current_objective: float = objective(schedule, students, lecturers)
-        total_iterations += iterations
-        
-        if current_objective > global_best_objective:
-            global_best_objective = current_objective
-            global_best_schedule = schedule
-            print(f"  -> New global best found with objective: {global_best_objective:.2f}")
-            
+        if restart_schedules[i] is None:
+            continue
+        if restart_objectives[i] > global_best_objective:
+            global_best_objective = restart_objectives[i]
+            global_best_schedule = restart_schedules[i]
         objective_history_per_restart.append(global_best_objective)
-    
+
     duration: float = time.time() - start_time
-    return global_best_schedule, objective_history_per_restart, total_iterations, duration, num_restarts  # type: ignore
\ No newline at end of file
+    return global_best_schedule, objective_history_per_restart, total_iterations, duration, len(objective_history_per_restart)  # type: ignore
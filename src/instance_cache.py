@@ -0,0 +1,244 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, overload
+from models import *
+from problem import AttendanceIndex, ProblemIndex, index_attendance
+from utils import instance_from_data
+
+# a compiled instance lives next to its JSON file as <file>.cache. the header holds the
+# sha256 of the JSON it was compiled from, so a changed JSON is simply recompiled.
+# after the header come the course clash weights as float64, then int32 sections,
+# all in native byte order (the cache is machine-local), then every id string as utf-8:
+#   course students, course credits, room capacities,
+#   student course offsets, student courses, student priority offsets, student priorities,
+#   course student offsets, course students,
+#   lecturer course offsets, lecturer courses,
+#   course lecturer offsets, course lecturers,
+#   id lengths (courses, rooms, students, lecturers)
+# a list of lists is stored as offsets plus the concatenated items (CSR). the ids are
+# stored by byte length, not with a separator, so any id reads back as it was
+CACHE_SUFFIX: str = '.cache'
+CACHE_MAGIC: bytes = b'TTBC'
+CACHE_VERSION: int = 2
+CACHE_HEADER: struct.Struct = struct.Struct('<4sI32s8I')
+
+def flatten(lists: Sequence[Sequence[int]]) -> Tuple[array, array]:
+    offsets: array = array('i', [0])
+    items: array = array('i')
+    for values in lists:
+        items.extend(values)
+        offsets.append(len(items))
+    return offsets, items
+
+def unflatten(offsets: List[int], items: List[int]) -> List[List[int]]:
+    return [items[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+class CompiledStudents(Sequence[Student]):
+    # the students of a cached instance. the search only needs the attendance index,
+    # so a Student object is built the first time it is actually looked at
+    names: List[str]
+    course_names: List[str]
+    course_offsets: List[int]
+    courses: List[int]
+    priority_offsets: List[int]
+    priorities: List[int]
+    built: List[Student | None]
+
+    def __init__(self, names: List[str], course_names: List[str], course_offsets: List[int], courses: List[int],
+                 priority_offsets: List[int], priorities: List[int]) -> None:
+        self.names = names
+        self.course_names = course_names
+        self.course_offsets = course_offsets
+        self.courses = courses
+        self.priority_offsets = priority_offsets
+        self.priorities = priorities
+        self.built = [None] * len(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, i: int) -> Student: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[Student]: ...
+
+    def __getitem__(self, i: int | slice) -> Student | List[Student]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        student: Student | None = self.built[i]
+        if student is None:
+            i = range(len(self))[i]
+            course_list: List[str] = [self.course_names[c] for c in self.courses[self.course_offsets[i]:self.course_offsets[i + 1]]]
+            student = Student(self.names[i], course_list, self.priorities[self.priority_offsets[i]:self.priority_offsets[i + 1]])
+            self.built[i] = student
+        return student
+
+    def __iter__(self) -> Iterator[Student]:
+        for i in range(len(self)):
+            yield self[i]
+
+class CompiledInstance:
+    # a loaded instance together with its attendance index, ready to build a ProblemIndex
+    courses: List[Course]
+    rooms: List[Room]
+    students: Sequence[Student]
+    lecturers: List[Lecturer]
+    attendance: AttendanceIndex
+
+    def __init__(self, courses: List[Course], rooms: List[Room], students: Sequence[Student], lecturers: List[Lecturer], attendance: AttendanceIndex) -> None:
+        self.courses = courses
+        self.rooms = rooms
+        self.students = students
+        self.lecturers = lecturers
+        self.attendance = attendance
+
+    def problem(self, time_slots: List[TimeSlot], capacity_domains: bool = False, capacity_penalty: float = 0.0) -> ProblemIndex:
+        return ProblemIndex(self.courses, self.rooms, time_slots, self.students, self.lecturers, self.attendance,
+                            capacity_domains, capacity_penalty)
+
+def compile_instance(instance: CompiledInstance, digest: bytes) -> bytes:
+    courses, rooms, students, lecturers = instance.courses, instance.rooms, instance.students, instance.lecturers
+    attendance: AttendanceIndex = instance.attendance
+
+    names: List[bytes] = [name.encode('utf-8') for name in
+                          [course.course_id for course in courses] + [room.room_id for room in rooms] +
+                          [student.student_id for student in students] + [lecturer.lecturer_id for lecturer in lecturers]]
+    sections: List[array] = [
+        array('i', [course.num_students for course in courses]),
+        array('i', [course.credits for course in courses]),
+        array('i', [room.capacity for room in rooms]),
+        *flatten(attendance.student_courses),
+        *flatten([student.priority for student in students]),
+        *flatten(attendance.course_students),
+        *flatten(attendance.lecturer_courses),
+        *flatten(attendance.course_lecturers),
+        array('i', [len(name) for name in names])
+    ]
+    strings: bytes = b''.join(names)
+
+    header: bytes = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, digest,
+                                      len(courses), len(rooms), len(students), len(lecturers),
+                                      len(sections[4]), len(sections[6]), len(sections[10]), len(strings))
+    return header + array('d', attendance.course_clash_weight).tobytes() + b''.join(section.tobytes() for section in sections) + strings
+
+def read_instance_cache(cache_path: str, digest: bytes) -> CompiledInstance | None:
+    try:
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < CACHE_HEADER.size:
+                return None
+            magic, version, cached_digest, num_courses, num_rooms, num_students, num_lecturers, \
+                num_student_courses, num_student_priorities, num_lecturer_courses, strings_length = CACHE_HEADER.unpack_from(mapped, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION or cached_digest != digest:
+                return None
+
+            num_names: int = num_courses + num_rooms + num_students + num_lecturers
+            section_lengths: List[int] = [num_courses, num_courses, num_rooms,
+                                          num_students + 1, num_student_courses, num_students + 1, num_student_priorities,
+                                          num_courses + 1, num_student_courses,
+                                          num_lecturers + 1, num_lecturer_courses,
+                                          num_courses + 1, num_lecturer_courses,
+                                          num_names]
+            ints_start: int = CACHE_HEADER.size + 8 * num_courses
+            ints_end: int = ints_start + 4 * sum(section_lengths)
+            if len(mapped) != ints_end + strings_length:
+                return None
+
+            with memoryview(mapped) as view:
+                with view[CACHE_HEADER.size:ints_start] as weight_bytes, weight_bytes.cast('d') as weights:
+                    course_clash_weight: List[float] = weights.tolist()
+                with view[ints_start:ints_end] as int_bytes, int_bytes.cast('i') as ints:
+                    values: List[int] = ints.tolist()
+                with view[ints_end:] as string_bytes:
+                    strings: bytes = string_bytes.tobytes()
+
+            names: List[str] = []
+            start: int = 0
+            for length in values[len(values) - num_names:]:
+                names.append(str(strings[start:start + length], 'utf-8'))
+                start += length
+            if start != strings_length:
+                return None
+    except (OSError, ValueError):
+        return None
+
+    sections: List[List[int]] = []
+    start = 0
+    for length in section_lengths:
+        sections.append(values[start:start + length])
+        start += length
+    course_students, course_credits, room_capacities, \
+        student_course_offsets, student_courses, student_priority_offsets, student_priorities, \
+        course_student_offsets, course_student_items, \
+        lecturer_course_offsets, lecturer_course_items, \
+        course_lecturer_offsets, course_lecturer_items, _ = sections
+
+    course_names: List[str] = names[:num_courses]
+    room_names: List[str] = names[num_courses:num_courses + num_rooms]
+    student_names: List[str] = names[num_courses + num_rooms:num_courses + num_rooms + num_students]
+    lecturer_names: List[str] = names[num_courses + num_rooms + num_students:num_courses + num_rooms + num_students + num_lecturers]
+
+    courses: List[Course] = [Course(course_names[i], course_students[i], course_credits[i]) for i in range(num_courses)]
+    rooms: List[Room] = [Room(room_names[i], room_capacities[i]) for i in range(num_rooms)]
+    students: CompiledStudents = CompiledStudents(student_names, course_names, student_course_offsets, student_courses,
+                                                  student_priority_offsets, student_priorities)
+    lecturer_courses: List[List[int]] = unflatten(lecturer_course_offsets, lecturer_course_items)
+    lecturers: List[Lecturer] = [Lecturer(lecturer_names[i], [course_names[c] for c in lecturer_courses[i]]) for i in range(num_lecturers)]
+
+    attendance: AttendanceIndex = AttendanceIndex(
+        unflatten(course_student_offsets, course_student_items),
+        unflatten(course_lecturer_offsets, course_lecturer_items),
+        course_clash_weight,
+        unflatten(student_course_offsets, student_courses),
+        lecturer_courses
+    )
+    return CompiledInstance(courses, rooms, students, lecturers, attendance)
+
+def write_instance_cache(cache_path: str, instance: CompiledInstance, digest: bytes) -> None:
+    # written to a temporary file first so a concurrent reader never sees half a cache
+    try:
+        data: bytes = compile_instance(instance, digest)
+    except (TypeError, OverflowError, AttributeError, UnicodeEncodeError):
+        # ids or numbers of an unusual type, such an instance is just not cached
+        return
+
+    temp_path: str = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_instance(file_path: str, use_cache: bool = True) -> CompiledInstance | None:
+    # loads like utils.load_data_from_json, but from the compiled cache when it is up to date
+    try:
+        with open(file_path, 'rb') as f:
+            raw: bytes = f.read()
+    except FileNotFoundError:
+        print(f"Error: The file {file_path} was not found.")
+        return None
+
+    digest: bytes = hashlib.sha256(raw).digest()
+    cache_path: str = file_path + CACHE_SUFFIX
+    if use_cache:
+        cached: CompiledInstance | None = read_instance_cache(cache_path, digest)
+        if cached is not None:
+            return cached
+
+    try:
+        data: Dict[str, Any] = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Error: The file {file_path} is not a valid JSON file.")
+        return None
+
+    courses, rooms, students, lecturers = instance_from_data(data)
+    instance: CompiledInstance = CompiledInstance(courses, rooms, students, lecturers, index_attendance(courses, students, lecturers))
+    if use_cache:
+        write_instance_cache(cache_path, instance, digest)
+    return instance
@@ -1,7 +1,16 @@
-from typing import List
-from utils import load_data_from_json, visualize_schedule
+import argparse
+import inspect
+import json
+import random
+import signal
+from typing import Any, Callable, Dict, List, Tuple
+from utils import save_schedule_to_json, save_timetable, visualize_schedule
+from instance_cache import CompiledInstance, load_instance
+from metrics import Observer, NULL_OBSERVER, JsonLinesSink
+from budget import CancellationToken, SearchBudget
 from models import *
-from scheduler import objective, generate_initial_schedule
+from problem import ProblemIndex
+from scheduler import indexed_objective, generate_initial_schedule
 from runners import (
     run_steepest_ascent,
     run_steepest_ascent_full,
@@ -9,15 +18,101 @@ from runners import (
     run_sideways_moves,
     run_sideways_moves_full,
     run_random_restart,
+    run_tabu_search,
     run_genetic_algorithm,
-    run_simulated_annealing
+    run_island_genetic_algorithm,
+    run_simulated_annealing,
+    run_adaptive_simulated_annealing,
+    run_parallel_tempering,
+    run_decomposed,
+    RunnerResult
 )
 
-def main() -> None:
-    courses: List[Course]
-    rooms: List[Room]
-    students: List[Student]
-    lecturers: List[Lecturer]
+ALGORITHMS: Dict[str, Callable[..., RunnerResult]] = {
+    'steepest_ascent': run_steepest_ascent,
+    'steepest_ascent_full': run_steepest_ascent_full,
+    'stochastic': run_stochastic,
+    'sideways_moves': run_sideways_moves,
+    'sideways_moves_full': run_sideways_moves_full,
+    'random_restart': run_random_restart,
+    'tabu_search': run_tabu_search,
+    'genetic_algorithm': run_genetic_algorithm,
+    'island_genetic_algorithm': run_island_genetic_algorithm,
+    'simulated_annealing': run_simulated_annealing,
+    'adaptive_simulated_annealing': run_adaptive_simulated_annealing,
+    'parallel_tempering': run_parallel_tempering,
+    'decomposed': run_decomposed
+}
+
+def create_problem(instance: CompiledInstance, capacity_domains: bool = False, capacity_penalty: float = 0.0) -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] 
+                                   for hour in range(8, 17)]
+    return instance.problem(time_slots, capacity_domains, capacity_penalty)
+
+def parse_parameter(text: str) -> Tuple[str, Any]:
+    # "name=value", the value is read as JSON when possible (numbers, true/false, null)
+    name, _, value = text.partition('=')
+    try:
+        return name, json.loads(value)
+    except json.JSONDecodeError:
+        return name, value
+
+def headless_main(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    runner: Callable[..., RunnerResult] = ALGORITHMS[args.algorithm]
+    parameters: Dict[str, Any] = dict(parse_parameter(text) for text in args.param)
+
+    accepted: List[str] = [name for name in inspect.signature(runner).parameters if name not in ('problem', 'visualize', 'show_plots', 'observer', 'budget')]
+    for name in parameters:
+        if name not in accepted:
+            parser.error(f"unknown parameter '{name}' for {args.algorithm}, expected one of: {', '.join(accepted)}")
+
+    instance: CompiledInstance | None = load_instance(args.instance, use_cache=not args.no_cache)
+    if instance is None:
+        raise SystemExit(1)
+    problem: ProblemIndex = create_problem(instance, args.capacity_domains, args.capacity_penalty)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # ctrl-c or a SIGTERM stops the search, which still returns and saves its best schedule;
+    # a second ctrl-c interrupts as usual
+    token: CancellationToken = CancellationToken()
+    def cancel(signum: int, _: Any) -> None:
+        print(f"\n-> {signal.Signals(signum).name} received, stopping the search with the best schedule so far.")
+        token.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    previous_handlers: Dict[int, Any] = {signum: signal.signal(signum, cancel) for signum in (signal.SIGINT, signal.SIGTERM)}
+    budget: SearchBudget = SearchBudget(time_budget=args.time_budget, token=token)
+
+    observer: Observer = JsonLinesSink(args.metrics, label=args.algorithm, interval=args.metrics_interval) if args.metrics else NULL_OBSERVER
+    final_schedule: Schedule
+    statistics: Dict[str, Any]
+    try:
+        final_schedule, statistics = runner(problem, visualize=args.visualize, show_plots=args.plot, observer=observer, budget=budget, **parameters)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        if isinstance(observer, JsonLinesSink):
+            observer.close()
+
+    statistics['instance'] = args.instance
+    statistics['algorithm'] = args.algorithm
+    statistics['seed'] = args.seed
+    statistics['parameters'] = parameters
+    statistics['time_budget'] = args.time_budget
+    statistics['capacity_domains'] = args.capacity_domains
+    statistics['capacity_penalty'] = args.capacity_penalty
+    if isinstance(observer, JsonLinesSink):
+        statistics['metrics'] = observer.snapshot()
+    save_schedule_to_json(final_schedule, statistics, args.output)
+    print(f"-> Result written to {args.output}")
+
+    if args.timetable:
+        save_timetable(final_schedule, problem.rooms, args.timetable)
+        print(f"-> Timetable written to {args.timetable}")
+
+def interactive_main() -> None:
+    instance: CompiledInstance | None
     
     while True:
         file_options = {
@@ -51,18 +146,21 @@ def main() -> None:
             print("Invalid choice. Please try again.")
             continue
 
-        courses, rooms, students, lecturers = load_data_from_json(file_to_load)
+        instance = load_instance(file_to_load)
 
-        if courses:
+        if instance is not None:
             print(f"-> File '{file_to_load}' loaded successfully.\n")
             break
         else:
             print("Please check the path and try again.")
 
-    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] 
-                                   for hour in range(8, 17)]
-    initial_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
-    
+    problem: ProblemIndex = create_problem(instance)
+    initial_schedule: Schedule = generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots, problem.domains)
+
+    print("Initial State:")
+    print(f"Initial Objective: {indexed_objective(initial_schedule, problem):.2f}")
+    visualize_schedule(initial_schedule, problem.rooms)
+
     while True:
         print("\n" + "~"*75)
         print(" Solving the Weekly Class Scheduling Problem with Local Search Algorithms")
@@ -74,50 +172,84 @@ def main() -> None:
         print("  4. Hill-Climbing with Sideways Moves (Sampling)")
         print("  5. Hill-Climbing with Sideways Moves (Full)")
         print("  6. Random-Restart Hill-Climbing")
-        print("  7. Genetic Algorithm")
-        print("  8. Simulated Annealing")
-        print("  9. Run All Algorithms Sequentially")
-        print(" 10. Exit")
+        print("  7. Tabu Search")
+        print("  8. Genetic Algorithm")
+        print("  9. Genetic Algorithm (Island Model)")
+        print(" 10. Simulated Annealing")
+        print(" 11. Simulated Annealing (Adaptive)")
+        print(" 12. Parallel Tempering")
+        print(" 13. Run All Algorithms Sequentially")
+        print(" 14. Exit")
         print("~"*75)
-        
-        print()
-        print("Initial State:")
-        print(f"Initial Objective: {objective(initial_schedule, students, lecturers):.2f}")
-        visualize_schedule(initial_schedule, rooms)
         print()
 
-        algo_choice: str = input("Enter your choice (1-10): ")
+        algo_choice: str = input("Enter your choice (1-14): ")
 
         if algo_choice == '1':
-            run_steepest_ascent(courses, rooms, time_slots, students, lecturers)
+            run_steepest_ascent(problem)
         elif algo_choice == '2':
-            run_steepest_ascent_full(courses, rooms, time_slots, students, lecturers)
+            run_steepest_ascent_full(problem)
         elif algo_choice == '3':
-            run_stochastic(courses, rooms, time_slots, students, lecturers)
+            run_stochastic(problem)
         elif algo_choice == '4':
-            run_sideways_moves(courses, rooms, time_slots, students, lecturers)
+            run_sideways_moves(problem)
         elif algo_choice == '5':
-            run_sideways_moves_full(courses, rooms, time_slots, students, lecturers)
+            run_sideways_moves_full(problem)
         elif algo_choice == '6':
-            run_random_restart(courses, rooms, time_slots, students, lecturers)
+            run_random_restart(problem)
         elif algo_choice == '7':
-            run_genetic_algorithm(courses, rooms, time_slots, students, lecturers)
+            run_tabu_search(problem)
         elif algo_choice == '8':
-            run_simulated_annealing(courses, rooms, time_slots, students, lecturers)
+            run_genetic_algorithm(problem)
         elif algo_choice == '9':
-            run_steepest_ascent(courses, rooms, time_slots, students, lecturers)
-            run_steepest_ascent_full(courses, rooms, time_slots, students, lecturers)
-            run_stochastic(courses, rooms, time_slots, students, lecturers)
-            run_sideways_moves(courses, rooms, time_slots, students, lecturers)
-            run_sideways_moves_full(courses, rooms, time_slots, students, lecturers)
-            run_random_restart(courses, rooms, time_slots, students, lecturers)
-            run_genetic_algorithm(courses, rooms, time_slots, students, lecturers)
-            run_simulated_annealing(courses, rooms, time_slots, students, lecturers)
+            run_island_genetic_algorithm(problem)
         elif algo_choice == '10':
+            run_simulated_annealing(problem)
+        elif algo_choice == '11':
+            run_adaptive_simulated_annealing(problem)
+        elif algo_choice == '12':
+            run_parallel_tempering(problem)
+        elif algo_choice == '13':
+            run_steepest_ascent(problem)
+            run_steepest_ascent_full(problem)
+            run_stochastic(problem)
+            run_sideways_moves(problem)
+            run_sideways_moves_full(problem)
+            run_random_restart(problem)
+            run_tabu_search(problem)
+            run_genetic_algorithm(problem)
+            run_island_genetic_algorithm(problem)
+            run_simulated_annealing(problem)
+            run_adaptive_simulated_annealing(problem)
+            run_parallel_tempering(problem)
+        elif algo_choice == '14':
             print("Thank you for using this program. See you next time!" + "\n")
             break
         else:
-            print("Invalid choice. Please enter a number between 1 and 10.")
+            print("Invalid choice. Please enter a number between 1 and 14.")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Weekly class scheduling with local search. Without --instance the interactive menu is shown.")
+    parser.add_argument('--instance', default=None, help="path to the instance JSON file")
+    parser.add_argument('--algorithm', choices=list(ALGORITHMS), default='steepest_ascent')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE', help="algorithm parameter, e.g. --param max_iterations=500 (repeatable)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='result.json', help="where the final schedule and statistics are written")
+    parser.add_argument('--visualize', action='store_true', help="print the final timetable")
+    parser.add_argument('--timetable', default=None, help="also write the final timetable to this file (.txt, .csv or .html)")
+    parser.add_argument('--plot', action='store_true', help="show the objective plots")
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS', help="stop the search after this many seconds and keep the best schedule found")
+    parser.add_argument('--metrics', default=None, help="append JSON-lines metrics of the run to this file")
+    parser.add_argument('--metrics-interval', type=float, default=1.0, help="seconds between two metrics lines")
+    parser.add_argument('--capacity-domains', action='store_true', help="only place a course in rooms that seat all of its students")
+    parser.add_argument('--capacity-penalty', type=float, default=0.0, metavar='WEIGHT', help="penalty of every credit hour taught in a room too small for its course")
+    parser.add_argument('--no-cache', action='store_true', help="always parse the JSON instead of using the compiled instance cache")
+    args = parser.parse_args()
+
+    if args.instance is None:
+        interactive_main()
+    else:
+        headless_main(args, parser)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
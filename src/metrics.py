@@ -0,0 +1,150 @@
+import json
+import time
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, IO, Tuple
+
+class Observer:
+    # what the search algorithms report while they run. this base class ignores
+    # everything, so the default costs one method call per hook; subclasses decide
+    # what to keep. counters are named after what happened ('evaluations',
+    # 'moves_accepted', ...), timers after where the time went ('evaluation',
+    # 'neighbor_generation', 'copy', 'selection', ...)
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def timer(self, name: str) -> ContextManager[Any]:
+        return _NULL_TIMER
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def progress(self, iteration: int, objective: float) -> None:
+        # called once per iteration, sweep or generation with the current best objective
+        pass
+
+_NULL_TIMER: ContextManager[Any] = nullcontext()
+NULL_OBSERVER: Observer = Observer()
+
+class _Timer:
+    recorder: 'MetricsRecorder'
+    name: str
+    start: float
+
+    def __init__(self, recorder: 'MetricsRecorder', name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *_: object) -> None:
+        self.recorder.add_time(self.name, time.perf_counter() - self.start)
+
+class MetricsRecorder(Observer):
+    # keeps every counter and the total time and call count of every timer
+    counters: Dict[str, int]
+    timers: Dict[str, float]
+    timer_calls: Dict[str, int]
+    iteration: int
+    objective: float | None
+    start_time: float
+
+    def __init__(self) -> None:
+        self.counters = {}
+        self.timers = {}
+        self.timer_calls = {}
+        self.iteration = 0
+        self.objective = None
+        self.start_time = time.perf_counter()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name: str) -> ContextManager[Any]:
+        return _Timer(self, name)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.timer_calls[name] = self.timer_calls.get(name, 0) + calls
+
+    def export(self) -> 'WorkerMetrics':
+        return self.counters, self.timers, self.timer_calls
+
+    def progress(self, iteration: int, objective: float) -> None:
+        self.iteration = iteration
+        self.objective = objective
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed: float = time.perf_counter() - self.start_time
+        return {
+            'elapsed': elapsed,
+            'iteration': self.iteration,
+            'objective': self.objective,
+            'counters': dict(self.counters),
+            'timers': {name: {'seconds': seconds, 'calls': self.timer_calls[name]} for name, seconds in self.timers.items()},
+            'evaluations_per_second': self.counters.get('evaluations', 0) / elapsed if elapsed > 0 else 0.0
+        }
+
+class JsonLinesSink(MetricsRecorder):
+    # writes a snapshot as one JSON line at most every interval seconds, checked on
+    # progress, and a final one on close
+    stream: IO[str]
+    owns_stream: bool
+    label: str
+    interval: float
+    last_write: float
+
+    def __init__(self, file_path: str | IO[str], label: str = "", interval: float = 1.0) -> None:
+        super().__init__()
+        if isinstance(file_path, str):
+            self.stream = open(file_path, 'a')
+            self.owns_stream = True
+        else:
+            self.stream = file_path
+            self.owns_stream = False
+        self.label = label
+        self.interval = interval
+        self.last_write = self.start_time
+
+    def progress(self, iteration: int, objective: float) -> None:
+        super().progress(iteration, objective)
+        now: float = time.perf_counter()
+        if now - self.last_write >= self.interval:
+            self.last_write = now
+            self.write(False)
+
+    def write(self, final: bool) -> None:
+        record: Dict[str, Any] = {'label': self.label, 'final': final, **self.snapshot()}
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.write(True)
+        if self.owns_stream:
+            self.stream.close()
+
+    def __enter__(self) -> 'JsonLinesSink':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+# counters, timer seconds and timer calls recorded in a worker process
+WorkerMetrics = Tuple[Dict[str, int], Dict[str, float], Dict[str, int]]
+
+def worker_recorder(observed: bool) -> Observer:
+    # workers only pay for recording when the caller actually observes the run
+    return MetricsRecorder() if observed else NULL_OBSERVER
+
+def export_metrics(observer: Observer) -> WorkerMetrics:
+    if isinstance(observer, MetricsRecorder):
+        return observer.export()
+    return {}, {}, {}
+
+def merge_metrics(observer: Observer, metrics: WorkerMetrics) -> None:
+    counters, timers, timer_calls = metrics
+    for name, amount in counters.items():
+        observer.count(name, amount)
+    for name, seconds in timers.items():
+        observer.add_time(name, seconds, timer_calls[name])
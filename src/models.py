@@ -1,5 +1,24 @@
 from typing import Tuple, List, Dict
 
+DAY_TO_INDEX: Dict[str, int] = {'Senin': 0, 'Selasa': 1, 'Rabu': 2, 'Kamis': 3, 'Jumat': 4}
+HOURS_PER_WEEK: int = len(DAY_TO_INDEX) * 24
+
+# a schedule fingerprint is the sum, modulo 2 ** 64, of one key per assignment. the key of a
+# course placed in a room at an hour is the product of a course key (odd) and a place key,
+# so a move changes the fingerprint by a few keys and a compact schedule can be fingerprinted
+# from two small tables. the keys come from hash(), so fingerprints are only comparable
+# inside one process
+FINGERPRINT_MASK: int = (1 << 64) - 1
+
+def course_key(course_id: str) -> int:
+    return (hash(course_id) << 1 | 1) & FINGERPRINT_MASK
+
+def place_key(hour_idx: int, room_id: str) -> int:
+    return hash((hour_idx, room_id)) & FINGERPRINT_MASK
+
+def placement_key(course_id: str, hour_idx: int, room_id: str) -> int:
+    return course_key(course_id) * place_key(hour_idx, room_id) & FINGERPRINT_MASK
+
 class Course:
     course_id: str
     num_students: int
@@ -21,9 +40,7 @@ class TimeSlot:
         self.hour = hour
 
     def hour_index(self) -> int:
-        day_to_index: Dict[str, int] = {'Senin': 0, 'Selasa': 1, 'Rabu': 2, 'Kamis': 3, 'Jumat': 4}
-        hour_index = day_to_index[self.day] * 24 + self.hour
-        return hour_index
+        return DAY_TO_INDEX[self.day] * 24 + self.hour
 
 class Room:
     room_id: str
@@ -61,9 +78,13 @@ class Assignment:
 class Schedule:
     assignments: List[Assignment]
     course_assignments: Dict[str, List[Assignment]]
+    # equal for schedules with the same placements. built on the first current_fingerprint()
+    # call, which only the objective cache makes, and kept up to date by the moves from then on
+    fingerprint: int | None
     
-    def __init__(self, assignments: List[Assignment]) -> None:
+    def __init__(self, assignments: List[Assignment], fingerprint: int | None = None) -> None:
         self.assignments = assignments
+        self.fingerprint = fingerprint
 
         self.course_assignments = {}  # course_id -> list of assignments
         for assignment in assignments:
@@ -72,6 +93,18 @@ class Schedule:
                 self.course_assignments[course_id] = []
             self.course_assignments[course_id].append(assignment)
 
+    def current_fingerprint(self) -> int:
+        if self.fingerprint is None:
+            fingerprint: int = 0
+            for assignment in self.assignments:
+                fingerprint += placement_key(assignment.course.course_id, assignment.time_slot.hour_index(), assignment.room.room_id)
+            self.fingerprint = fingerprint & FINGERPRINT_MASK
+        return self.fingerprint
+
+    def copy(self) -> 'Schedule':
+        # courses, rooms and time slots are never mutated, so only the assignments are duplicated
+        return Schedule([Assignment(a.course, a.time_slot, a.room) for a in self.assignments], self.fingerprint)
+
 class Lecturer:
     lecturer_id: str
     course_list: List[str]
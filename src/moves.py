@@ -0,0 +1,80 @@
+from models import *
+
+class RelocateMove:
+    # assign different room and time slot for an assignment
+    index: int
+    time_slot: TimeSlot
+    room: Room
+    old_time_slot: TimeSlot | None
+    old_room: Room | None
+
+    def __init__(self, index: int, time_slot: TimeSlot, room: Room) -> None:
+        self.index = index
+        self.time_slot = time_slot
+        self.room = room
+        self.old_time_slot = None
+        self.old_room = None
+
+    def fingerprint_after(self, schedule: Schedule) -> int:
+        assignment: Assignment = schedule.assignments[self.index]
+        course_id: str = assignment.course.course_id
+        fingerprint: int = schedule.current_fingerprint() - placement_key(course_id, assignment.time_slot.hour_index(), assignment.room.room_id)
+        return (fingerprint + placement_key(course_id, self.time_slot.hour_index(), self.room.room_id)) & FINGERPRINT_MASK
+
+    def apply(self, schedule: Schedule) -> None:
+        if schedule.fingerprint is not None:
+            schedule.fingerprint = self.fingerprint_after(schedule)
+        assignment: Assignment = schedule.assignments[self.index]
+        self.old_time_slot = assignment.time_slot
+        self.old_room = assignment.room
+        assignment.time_slot = self.time_slot
+        assignment.room = self.room
+
+    def undo(self, schedule: Schedule) -> None:
+        assert self.old_time_slot is not None and self.old_room is not None
+        assignment: Assignment = schedule.assignments[self.index]
+        if schedule.fingerprint is not None:
+            course_id: str = assignment.course.course_id
+            fingerprint: int = schedule.fingerprint - placement_key(course_id, assignment.time_slot.hour_index(), assignment.room.room_id)
+            schedule.fingerprint = (fingerprint + placement_key(course_id, self.old_time_slot.hour_index(), self.old_room.room_id)) & FINGERPRINT_MASK
+        assignment.time_slot = self.old_time_slot
+        assignment.room = self.old_room
+
+class SwapMove:
+    # swap the room and time slot of two assignments
+    index1: int
+    index2: int
+
+    def __init__(self, index1: int, index2: int) -> None:
+        self.index1 = index1
+        self.index2 = index2
+
+    def fingerprint_after(self, schedule: Schedule) -> int:
+        assignment1: Assignment = schedule.assignments[self.index1]
+        assignment2: Assignment = schedule.assignments[self.index2]
+        course1: str = assignment1.course.course_id
+        course2: str = assignment2.course.course_id
+        if course1 == course2:
+            # same course, same placements
+            return schedule.current_fingerprint()
+
+        hour1: int = assignment1.time_slot.hour_index()
+        hour2: int = assignment2.time_slot.hour_index()
+        room1: str = assignment1.room.room_id
+        room2: str = assignment2.room.room_id
+        fingerprint: int = schedule.current_fingerprint() - placement_key(course1, hour1, room1) - placement_key(course2, hour2, room2)
+        return (fingerprint + placement_key(course1, hour2, room2) + placement_key(course2, hour1, room1)) & FINGERPRINT_MASK
+
+    def apply(self, schedule: Schedule) -> None:
+        if schedule.fingerprint is not None:
+            schedule.fingerprint = self.fingerprint_after(schedule)
+        assignment1: Assignment = schedule.assignments[self.index1]
+        assignment2: Assignment = schedule.assignments[self.index2]
+        assignment1.room, assignment2.room = assignment2.room, assignment1.room
+        assignment1.time_slot, assignment2.time_slot = assignment2.time_slot, assignment1.time_slot
+
+    def undo(self, schedule: Schedule) -> None:
+        # a swap is its own inverse
+        self.apply(schedule)
+
+Move = RelocateMove | SwapMove
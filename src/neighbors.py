@@ -0,0 +1,285 @@
+import random
+from collections import deque
+from models import *
+from problem import ProblemIndex
+from moves import Move, RelocateMove, SwapMove
+from scheduler import generate_move, assignment_moves
+from evaluator import DeltaEvaluator
+from compact import CompactSchedule
+from typing import Collection, Deque, Dict, List, Sequence, Set, Tuple
+
+def placement_clashes(index: int, room_idx: int, hour_assignments: Collection[int], courses: Sequence[int], rooms: Sequence[int],
+                      course_conflicts: List[Set[int]], clash_weight: Sequence[float]) -> bool:
+    # whether the assignment at index, placed in room_idx, clashes with one of the other
+    # assignments of that hour: a course sharing a student or lecturer, or the same room
+    # when either course carries a clash weight
+    course_idx: int = courses[index]
+    conflicts: Set[int] = course_conflicts[course_idx]
+    weighted: bool = clash_weight[course_idx] > 0
+    for other in hour_assignments:
+        if other == index:
+            continue
+        other_course: int = courses[other]
+        if other_course in conflicts:
+            return True
+        if rooms[other] == room_idx and (weighted or clash_weight[other_course] > 0):
+            return True
+    return False
+
+def too_small(course_idx: int, room_idx: int, problem: ProblemIndex) -> bool:
+    # whether the room costs the course a capacity penalty
+    return problem.capacity_cost is not None and problem.capacity_cost[course_idx][room_idx] > 0
+
+def free_placement(index: int, courses: Sequence[int], rooms: Sequence[int], hour_assignments: Sequence[Collection[int]],
+                   problem: ProblemIndex, tries: int) -> Tuple[int, int] | None:
+    # the first of tries random (time slot position, room of the course's domain) pairs
+    # where the assignment would clash with nothing and fit its room, None if there is none
+    course_conflicts: List[Set[int]] = problem.conflicting_courses()
+    domain: List[int] = problem.room_domains[courses[index]]
+    for _ in range(tries):
+        slot_idx: int = random.randrange(len(problem.time_slots))
+        room_idx: int = random.choice(domain)
+        if too_small(courses[index], room_idx, problem):
+            continue
+        if not placement_clashes(index, room_idx, hour_assignments[problem.slot_hours[slot_idx]], courses, rooms,
+                                 course_conflicts, problem.course_clash_weight):
+            return slot_idx, room_idx
+    return None
+
+def random_placement(index: int, courses: Sequence[int], problem: ProblemIndex) -> Tuple[int, int]:
+    return random.randrange(len(problem.time_slots)), random.choice(problem.room_domains[courses[index]])
+
+class ConflictTrackingEvaluator(DeltaEvaluator):
+    # a DeltaEvaluator that also keeps the assignments involved in a student, lecturer or
+    # room clash, or placed in a room too small for them. an applied move can only change
+    # the clashes of the hours it leaves and enters, so only the assignments of those hours
+    # are checked again
+    course_conflicts: List[Set[int]]
+    hour_assignments: List[Set[int]]  # hour -> assignments placed in it
+    conflicted: List[int]
+    conflicted_positions: Dict[int, int]  # assignment -> its position in conflicted
+
+    def __init__(self, schedule: Schedule, problem: ProblemIndex) -> None:
+        super().__init__(schedule, problem)
+        self.course_conflicts = problem.conflicting_courses()
+        self.hour_assignments = [set() for _ in range(HOURS_PER_WEEK)]
+        for index, hour_idx in enumerate(self.assignment_hours):
+            self.hour_assignments[hour_idx].add(index)
+
+        self.conflicted = []
+        self.conflicted_positions = {}
+        for index in range(len(self.assignment_hours)):
+            self._refresh(index)
+
+    def is_conflicted(self, index: int) -> bool:
+        if too_small(self.assignment_courses[index], self.assignment_rooms[index], self.problem):
+            return True
+        return placement_clashes(index, self.assignment_rooms[index], self.hour_assignments[self.assignment_hours[index]],
+                                 self.assignment_courses, self.assignment_rooms, self.course_conflicts, self.problem.course_clash_weight)
+
+    def _refresh(self, index: int) -> None:
+        conflicted: bool = self.is_conflicted(index)
+        position: int | None = self.conflicted_positions.get(index)
+        if conflicted and position is None:
+            self.conflicted_positions[index] = len(self.conflicted)
+            self.conflicted.append(index)
+        elif not conflicted and position is not None:
+            # the last entry takes the place of the removed one
+            last: int = self.conflicted.pop()
+            if last != index:
+                self.conflicted[position] = last
+                self.conflicted_positions[last] = position
+            del self.conflicted_positions[index]
+
+    def _refresh_hours(self, hour1: int, hour2: int) -> None:
+        for index in self.hour_assignments[hour1]:
+            self._refresh(index)
+        if hour2 != hour1:
+            for index in self.hour_assignments[hour2]:
+                self._refresh(index)
+
+    def _relocate(self, index: int, hour_idx: int, room_idx: int) -> None:
+        old_hour: int = self.assignment_hours[index]
+        super()._relocate(index, hour_idx, room_idx)
+        self.hour_assignments[old_hour].discard(index)
+        self.hour_assignments[hour_idx].add(index)
+        self._refresh_hours(old_hour, hour_idx)
+
+    def _swap(self, index1: int, index2: int) -> None:
+        hour1: int = self.assignment_hours[index1]
+        hour2: int = self.assignment_hours[index2]
+        super()._swap(index1, index2)
+        if hour1 != hour2:
+            self.hour_assignments[hour1].discard(index1)
+            self.hour_assignments[hour2].discard(index2)
+            self.hour_assignments[hour2].add(index1)
+            self.hour_assignments[hour1].add(index2)
+        self._refresh_hours(hour1, hour2)
+
+def create_search_evaluator(schedule: Schedule, problem: ProblemIndex, conflict_bias: float) -> DeltaEvaluator:
+    # tracking the clashes costs a little on every applied move, only biased searches need it
+    if conflict_bias > 0:
+        return ConflictTrackingEvaluator(schedule, problem)
+    return DeltaEvaluator(schedule, problem)
+
+class NeighborGenerator:
+    # draws the moves of a local search. with probability bias a move is directed: a
+    # clashing assignment is relocated to a placement where it clashes with nothing,
+    # looked for among tries random ones, or to a random placement when none is free.
+    # the other moves, and all of them with bias 0, are generate_move's uniform ones,
+    # drawn from the same random numbers as before
+    evaluator: DeltaEvaluator
+    bias: float
+    tries: int
+
+    def __init__(self, evaluator: DeltaEvaluator, bias: float = 0.0, tries: int = 10) -> None:
+        assert bias <= 0 or isinstance(evaluator, ConflictTrackingEvaluator), "a conflict bias needs a ConflictTrackingEvaluator"
+        self.evaluator = evaluator
+        self.bias = bias
+        self.tries = tries
+
+    def move(self) -> Move:
+        problem: ProblemIndex = self.evaluator.problem
+        if self.bias > 0 and random.random() < self.bias:
+            directed: Move | None = self._directed_move()
+            if directed is not None:
+                return directed
+        return generate_move(self.evaluator.schedule, problem.rooms, problem.time_slots, problem.domains)
+
+    def moves(self, count: int) -> List[Move]:
+        return [self.move() for _ in range(count)]
+
+    def _directed_move(self) -> Move | None:
+        evaluator: ConflictTrackingEvaluator = self.evaluator  # type: ignore
+        if not evaluator.conflicted:
+            return None
+        problem: ProblemIndex = evaluator.problem
+        index: int = random.choice(evaluator.conflicted)
+        target: Tuple[int, int] | None = free_placement(index, evaluator.assignment_courses, evaluator.assignment_rooms,
+                                                         evaluator.hour_assignments, problem, self.tries)
+        slot_idx: int
+        room_idx: int
+        slot_idx, room_idx = target if target is not None else random_placement(index, evaluator.assignment_courses, problem)
+        return RelocateMove(index, problem.time_slots[slot_idx], problem.rooms[room_idx])
+
+class DontLookScanner:
+    # first-improvement scan of the full swap + relocation neighborhood with don't-look
+    # bits. a move can only improve if it takes a clashing assignment out of its clash,
+    # so only those are scanned, each over all of its moves. an assignment is switched off
+    # once its scan finds nothing and back on when a move touches its hour. scan_order is
+    # 'random', or 'conflicts' for the assignments losing the most penalty first. a pass
+    # starts with every clashing assignment switched on; one that ends without a move
+    # proves the schedule is a true local optimum of the full neighborhood
+    evaluator: ConflictTrackingEvaluator
+    scan_order: str
+    queue: Deque[int]
+    looking: List[bool]  # the inverted don't-look bit of every assignment
+    clean_pass: bool  # no move applied since the current pass started
+
+    def __init__(self, evaluator: ConflictTrackingEvaluator, scan_order: str = 'conflicts') -> None:
+        if scan_order not in ('random', 'conflicts'):
+            raise ValueError(f"unknown scan order {scan_order!r}, expected 'random' or 'conflicts'")
+        self.evaluator = evaluator
+        self.scan_order = scan_order
+        self.queue = deque()
+        self.looking = [False] * len(evaluator.assignment_hours)
+        self.clean_pass = False
+
+    def _ordered(self, indices: List[int]) -> List[int]:
+        random.shuffle(indices)
+        if self.scan_order == 'conflicts':
+            penalties: Dict[int, float] = {index: self.evaluator.assignment_penalty(index) for index in indices}
+            indices.sort(key=lambda index: -penalties[index])
+        return indices
+
+    def _start_pass(self) -> None:
+        for index in self._ordered(list(self.evaluator.conflicted)):
+            if not self.looking[index]:
+                self.looking[index] = True
+                self.queue.append(index)
+        self.clean_pass = True
+
+    def next_move(self) -> Tuple[Move | None, float, int]:
+        # the first improving move and the number of moves evaluated to find it; no move
+        # when the schedule is a local optimum
+        evaluator: ConflictTrackingEvaluator = self.evaluator
+        problem: ProblemIndex = evaluator.problem
+        evaluations: int = 0
+        while True:
+            if not self.queue:
+                if self.clean_pass:
+                    return None, 0.0, evaluations
+                self._start_pass()
+                continue
+
+            index: int = self.queue.popleft()
+            self.looking[index] = False
+            if index not in evaluator.conflicted_positions:
+                continue
+            for move in assignment_moves(evaluator.schedule, problem.rooms, problem.time_slots, index, problem.domains):
+                delta: float = evaluator.move_delta(move)
+                evaluations += 1
+                if delta > 0:
+                    return move, delta, evaluations
+
+    def sideways_move(self) -> Tuple[Move | None, int]:
+        # a move of a clashing assignment that leaves the objective unchanged, to leave a
+        # plateau once next_move found no improvement, and the number of moves evaluated
+        evaluator: ConflictTrackingEvaluator = self.evaluator
+        problem: ProblemIndex = evaluator.problem
+        evaluations: int = 0
+        for index in self._ordered(list(evaluator.conflicted)):
+            for move in assignment_moves(evaluator.schedule, problem.rooms, problem.time_slots, index, problem.domains):
+                evaluations += 1
+                if evaluator.move_delta(move) == 0:
+                    return move, evaluations
+        return None, evaluations
+
+    def apply_move(self, move: Move) -> None:
+        # applies the move and switches on the assignments of every hour it touched
+        evaluator: ConflictTrackingEvaluator = self.evaluator
+        touched: Set[int]
+        if isinstance(move, SwapMove):
+            touched = {evaluator.assignment_hours[move.index1], evaluator.assignment_hours[move.index2]}
+        else:
+            touched = {evaluator.assignment_hours[move.index], move.time_slot.hour_index()}
+        evaluator.apply_move(move)
+
+        woken: List[int] = self._ordered([index for hour_idx in touched for index in evaluator.hour_assignments[hour_idx]
+                                          if not self.looking[index] and index in evaluator.conflicted_positions])
+        for index in woken:
+            self.looking[index] = True
+        if self.scan_order == 'conflicts':
+            # the assignments around the last move are scanned next, worst first
+            self.queue.extendleft(reversed(woken))
+        else:
+            self.queue.extend(woken)
+        self.clean_pass = False
+
+def directed_mutation(schedule: CompactSchedule, problem: ProblemIndex, tries: int = 10) -> bool:
+    # NeighborGenerator's directed move on a compact schedule, in place. the clashes are
+    # found from scratch; returns False, leaving the schedule alone, when there are none
+    size: int = schedule.size
+    genes = schedule.genes
+    rooms: Sequence[int] = genes[size:]
+    hours: List[int] = [problem.slot_hours[slot_idx] for slot_idx in genes[:size]]
+    hour_assignments: List[List[int]] = [[] for _ in range(HOURS_PER_WEEK)]
+    for index, hour_idx in enumerate(hours):
+        hour_assignments[hour_idx].append(index)
+
+    course_conflicts: List[Set[int]] = problem.conflicting_courses()
+    conflicted: List[int] = [index for index in range(size)
+                             if too_small(schedule.courses[index], rooms[index], problem)
+                             or placement_clashes(index, rooms[index], hour_assignments[hours[index]], schedule.courses, rooms,
+                                                  course_conflicts, problem.course_clash_weight)]
+    if not conflicted:
+        return False
+
+    index: int = random.choice(conflicted)
+    target: Tuple[int, int] | None = free_placement(index, schedule.courses, rooms, hour_assignments, problem, tries)
+    slot_idx: int
+    room_idx: int
+    slot_idx, room_idx = target if target is not None else random_placement(index, schedule.courses, problem)
+    genes[index] = slot_idx
+    genes[size + index] = room_idx
+    return True
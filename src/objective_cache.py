@@ -0,0 +1,93 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+from models import *
+from problem import ProblemIndex
+from compact import CompactSchedule
+
+class ObjectiveCache:
+    # bounded LRU map from a schedule fingerprint to its objective. the searches look a
+    # schedule up before evaluating it and store what they evaluate, so a schedule seen
+    # again (a reverted move, a swap of two identical placements, a duplicated child)
+    # costs one dictionary lookup
+    capacity: int
+    entries: 'OrderedDict[int, float]'
+    hits: int
+    misses: int
+
+    def __init__(self, capacity: int = 100000) -> None:
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: int) -> float | None:
+        objective: float | None = self.entries.get(fingerprint)
+        if objective is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(fingerprint)
+        return objective
+
+    def put(self, fingerprint: int, objective: float) -> None:
+        self.entries[fingerprint] = objective
+        self.entries.move_to_end(fingerprint)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def statistics(self) -> Dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate(), 'size': len(self.entries), 'capacity': self.capacity}
+
+class CompactFingerprints:
+    # fingerprints of compact schedules, equal to Schedule.current_fingerprint() of the same
+    # placements. a whole population is done at once with uint64 arithmetic, which
+    # wraps modulo 2 ** 64 like the fingerprint itself
+    num_rooms: int
+    assignment_keys: np.ndarray  # course key of every assignment position
+    place_keys: np.ndarray  # slot * rooms + room -> place key
+
+    def __init__(self, problem: ProblemIndex) -> None:
+        self.num_rooms = len(problem.rooms)
+        course_keys: List[int] = [course_key(course.course_id) for course in problem.courses]
+        self.assignment_keys = np.array([course_keys[course_idx] for course_idx in problem.assignment_courses], dtype=np.uint64)
+        self.place_keys = np.array([place_key(hour_idx, room.room_id) for hour_idx in problem.slot_hours for room in problem.rooms], dtype=np.uint64)
+
+    def fingerprints(self, population: List[CompactSchedule]) -> List[int]:
+        if not population:
+            return []
+        genes: np.ndarray = np.array([np.frombuffer(compact.genes, dtype=np.intc) for compact in population], dtype=np.int64)
+        size: int = population[0].size
+        places: np.ndarray = genes[:, :size] * self.num_rooms + genes[:, size:]
+        keys: np.ndarray = self.assignment_keys[None, :] * self.place_keys[places]
+        return keys.sum(axis=1, dtype=np.uint64).tolist()
+
+def evaluate_population_cached(evaluator: Any, population: List[CompactSchedule], cache: ObjectiveCache,
+                               fingerprints: CompactFingerprints) -> Tuple[List[Tuple[CompactSchedule, float]], int]:
+    # evaluator is a BatchEvaluator or PopulationEvaluator. only the schedules missing from
+    # the cache are evaluated, each distinct one once; also returns how many that were
+    population_fingerprints: List[int] = fingerprints.fingerprints(population)
+    objectives: Dict[int, float] = {}
+    missing: List[CompactSchedule] = []
+    missing_fingerprints: List[int] = []
+
+    for compact, fingerprint in zip(population, population_fingerprints):
+        if fingerprint in objectives:
+            continue
+        cached: float | None = cache.get(fingerprint)
+        if cached is None:
+            objectives[fingerprint] = 0.0
+            missing.append(compact)
+            missing_fingerprints.append(fingerprint)
+        else:
+            objectives[fingerprint] = cached
+
+    for fingerprint, (_, objective_value) in zip(missing_fingerprints, evaluator.evaluate_population(missing)):
+        objectives[fingerprint] = objective_value
+        cache.put(fingerprint, objective_value)
+
+    return [(compact, objectives[fingerprint]) for compact, fingerprint in zip(population, population_fingerprints)], len(missing)
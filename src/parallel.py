@@ -0,0 +1,199 @@
+import math
+import random
+import signal
+import numpy as np
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from models import *
+from problem import ProblemIndex
+from moves import Move, RelocateMove, SwapMove
+from scheduler import full_neighborhood_moves
+from evaluator import DeltaEvaluator
+from compact import CompactSchedule, to_compact_schedule, to_schedule
+from batch import BatchEvaluator
+from typing import Iterable, Iterator, List, Tuple
+
+# set once in every worker process by the pool initializers
+_worker_evaluator: BatchEvaluator | None = None
+_worker_problem: ProblemIndex | None = None
+
+def derive_seed(master_seed: int, stream: int) -> int:
+    # independent seed for one stream (a restart, an island, ...) of a seeded run.
+    # string seeds are hashed with sha512, so this is stable across processes and runs
+    return random.Random(f"{master_seed}:{stream}").getrandbits(64)
+
+def _ignore_interrupts() -> None:
+    # a ctrl-c goes to the whole process group; only the main process handles it, by
+    # cancelling the search, so the pool stays usable until the search returns
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _init_problem_worker(problem: ProblemIndex) -> None:
+    global _worker_problem
+    _ignore_interrupts()
+    _worker_problem = problem
+
+def create_problem_pool(problem: ProblemIndex, workers: int) -> ProcessPoolExecutor:
+    # the problem is sent once per worker, tasks then only carry compact data
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_problem_worker, initargs=(problem,))
+
+def create_worker_pool(workers: int) -> ProcessPoolExecutor:
+    # a pool for tasks that carry their own problem, see decomposition
+    return ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupts)
+
+def worker_problem() -> ProblemIndex:
+    assert _worker_problem is not None, "not running inside a pool from create_problem_pool"
+    return _worker_problem
+
+def _init_evaluation_worker(problem: ProblemIndex) -> None:
+    global _worker_evaluator
+    _ignore_interrupts()
+    _worker_evaluator = BatchEvaluator(problem)
+
+def _evaluate_genes(size: int, genes: List[bytes]) -> List[float]:
+    assert _worker_evaluator is not None
+    matrix: np.ndarray = np.array([np.frombuffer(g, dtype=np.intc) for g in genes], dtype=np.int64)
+    return _worker_evaluator.objectives(matrix[:, :size], matrix[:, size:]).tolist()
+
+class PopulationEvaluator:
+    # evaluates populations of compact schedules, spreading them over a persistent
+    # process pool when it is worth it. workers receive the problem once at startup
+    # and afterwards only the raw gene buffers of the schedules
+    problem: ProblemIndex
+    workers: int
+    min_parallel_population: int
+    batch_evaluator: BatchEvaluator
+    pool: ProcessPoolExecutor | None
+
+    def __init__(self, problem: ProblemIndex, workers: int = 1, min_parallel_population: int = 64) -> None:
+        self.problem = problem
+        self.workers = max(1, workers)
+        self.min_parallel_population = min_parallel_population
+        self.batch_evaluator = BatchEvaluator(problem)
+        self.pool = None
+
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_evaluation_worker, initargs=(problem,))
+
+    def evaluate_population(self, population: List[CompactSchedule]) -> List[Tuple[CompactSchedule, float]]:
+        if self.pool is None or len(population) < self.min_parallel_population:
+            return self.batch_evaluator.evaluate_population(population)
+
+        # one vectorized chunk per worker keeps the number of round trips minimal
+        chunk_size: int = math.ceil(len(population) / self.workers)
+        size: int = population[0].size
+        chunks: List[List[bytes]] = []
+        for start in range(0, len(population), chunk_size):
+            chunks.append([compact.genes.tobytes() for compact in population[start:start + chunk_size]])
+
+        scores: List[float] = []
+        for chunk_scores in self.pool.map(_evaluate_genes, [size] * len(chunks), chunks):
+            scores.extend(chunk_scores)
+
+        return list(zip(population, scores))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self) -> 'PopulationEvaluator':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+# a move as plain integers, ordered like the serial full-neighborhood scan visits them:
+# (0, index1, index2, 0) for a swap, (1, index, room, time slot) for a relocation
+EncodedMove = Tuple[int, int, int, int]
+
+def encode_move(move: Move, problem: ProblemIndex) -> EncodedMove:
+    if isinstance(move, SwapMove):
+        return (0, move.index1, move.index2, 0)
+    return (1, move.index, problem.room_ids[move.room.room_id], problem.slot_ids[move.time_slot.hour_index()])
+
+def decode_move(encoded: EncodedMove, problem: ProblemIndex) -> Move:
+    kind, index, other, slot = encoded
+    if kind == 0:
+        return SwapMove(index, other)
+    return RelocateMove(index, problem.time_slots[slot], problem.rooms[other])
+
+def counted(moves: Iterable[Move], counter: List[int]) -> Iterator[Move]:
+    # passes the moves through, adding how many there were to counter[0]
+    for move in moves:
+        counter[0] += 1
+        yield move
+
+def _scan_shard(courses: bytes, genes: bytes, shard: int, shards: int) -> Tuple[float, EncodedMove | None, int]:
+    problem: ProblemIndex = worker_problem()
+
+    compact_courses: array = array('i')
+    compact_courses.frombytes(courses)
+    compact_genes: array = array('i')
+    compact_genes.frombytes(genes)
+    schedule: Schedule = to_schedule(CompactSchedule(compact_courses, compact_genes), problem)
+
+    evaluator: DeltaEvaluator = DeltaEvaluator(schedule, problem)
+    indices: range = range(shard, len(schedule.assignments), shards)
+    counter: List[int] = [0]
+    best_move, best_delta = evaluator.best_move(counted(full_neighborhood_moves(schedule, problem.rooms, problem.time_slots, indices, problem.domains), counter))
+    if best_move is None:
+        return best_delta, None, counter[0]
+
+    return best_delta, encode_move(best_move, problem), counter[0]
+
+class NeighborhoodScanner:
+    # finds the best move of the full swap + relocation neighborhood. with workers > 1
+    # the assignments are dealt round-robin into one shard per worker, every worker
+    # returns its best (move, delta) and the reduction keeps the largest delta, breaking
+    # ties by scan order, which is exactly the move the serial scan would pick. also returns
+    # the number of moves evaluated
+    problem: ProblemIndex
+    workers: int
+    min_parallel_assignments: int
+    pool: ProcessPoolExecutor | None
+
+    def __init__(self, problem: ProblemIndex, workers: int = 1, min_parallel_assignments: int = 32) -> None:
+        self.problem = problem
+        self.workers = max(1, workers)
+        self.min_parallel_assignments = min_parallel_assignments
+        self.pool = None
+
+        if self.workers > 1:
+            self.pool = create_problem_pool(problem, self.workers)
+
+    def best_move(self, evaluator: DeltaEvaluator) -> Tuple[Move | None, float, int]:
+        schedule: Schedule = evaluator.schedule
+        if self.pool is None or len(schedule.assignments) < self.min_parallel_assignments:
+            counter: List[int] = [0]
+            move, delta = evaluator.best_move(counted(full_neighborhood_moves(schedule, self.problem.rooms, self.problem.time_slots, domains=self.problem.domains), counter))
+            return move, delta, counter[0]
+
+        compact: CompactSchedule = to_compact_schedule(schedule, self.problem)
+        courses: bytes = compact.courses.tobytes()
+        genes: bytes = compact.genes.tobytes()
+        futures: List[Future] = [self.pool.submit(_scan_shard, courses, genes, shard, self.workers) for shard in range(self.workers)]
+
+        best: Tuple[float, EncodedMove] | None = None
+        evaluated: int = 0
+        for future in futures:
+            shard_delta, shard_move, shard_evaluated = future.result()
+            evaluated += shard_evaluated
+            if shard_move is None:
+                continue
+            if best is None or shard_delta > best[0] or (shard_delta == best[0] and shard_move < best[1]):
+                best = (shard_delta, shard_move)
+
+        if best is None:
+            return None, -float('inf'), evaluated
+        return decode_move(best[1], self.problem), best[0], evaluated
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self) -> 'NeighborhoodScanner':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
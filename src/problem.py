@@ -0,0 +1,163 @@
+from models import *
+from array import array
+from typing import List, Dict, Sequence, Set
+
+def priority_weight(priority: int) -> float:
+    if priority == 1:
+        return 1.75
+    if priority == 2:
+        return 1.5
+    if priority == 3:
+        return 1.25
+    return 1.0
+
+class AttendanceIndex:
+    # who attends which course, by position in the course, student and lecturer lists
+    course_students: List[List[int]]
+    course_lecturers: List[List[int]]
+    course_clash_weight: List[float]  # summed priority weight of the students of each course
+    student_courses: List[List[int]]
+    lecturer_courses: List[List[int]]
+
+    def __init__(self, course_students: List[List[int]], course_lecturers: List[List[int]], course_clash_weight: List[float],
+                 student_courses: List[List[int]], lecturer_courses: List[List[int]]) -> None:
+        self.course_students = course_students
+        self.course_lecturers = course_lecturers
+        self.course_clash_weight = course_clash_weight
+        self.student_courses = student_courses
+        self.lecturer_courses = lecturer_courses
+
+def index_attendance(courses: List[Course], students: Sequence[Student], lecturers: Sequence[Lecturer]) -> AttendanceIndex:
+    course_ids: Dict[str, int] = {course.course_id: i for i, course in enumerate(courses)}
+    attendance: AttendanceIndex = AttendanceIndex([[] for _ in courses], [[] for _ in courses], [0.0 for _ in courses], [], [])
+
+    for student_idx, student in enumerate(students):
+        course_list: List[int] = [course_ids[course_id] for course_id in student.course_list]
+        attendance.student_courses.append(course_list)
+        for course_id in student.course_list:
+            course_idx: int = course_ids[course_id]
+            attendance.course_students[course_idx].append(student_idx)
+            attendance.course_clash_weight[course_idx] += priority_weight(student.priority_map[course_id])
+
+    for lecturer_idx, lecturer in enumerate(lecturers):
+        course_list = [course_ids[course_id] for course_id in lecturer.course_list]
+        attendance.lecturer_courses.append(course_list)
+        for course_idx in course_list:
+            attendance.course_lecturers[course_idx].append(lecturer_idx)
+
+    return attendance
+
+def capacity_domain(course: Course, rooms: List[Room]) -> List[int]:
+    # positions of the rooms large enough for the course, or of the largest rooms when none is
+    fitting: List[int] = [i for i, room in enumerate(rooms) if room.capacity >= course.num_students]
+    if fitting:
+        return fitting
+    largest: int = max(room.capacity for room in rooms)
+    return [i for i, room in enumerate(rooms) if room.capacity == largest]
+
+class RoomDomains:
+    # the rooms every course may be placed in, by course id, for the searches working on
+    # Schedule objects. the lists hold the problem's own Room objects
+    course_rooms: Dict[str, List[Room]]
+    course_room_ids: Dict[str, Set[str]]
+
+    def __init__(self, course_rooms: Dict[str, List[Room]]) -> None:
+        self.course_rooms = course_rooms
+        self.course_room_ids = {course_id: {room.room_id for room in rooms} for course_id, rooms in course_rooms.items()}
+
+    def admits(self, course: Course, room: Room) -> bool:
+        return room.room_id in self.course_room_ids[course.course_id]
+
+    def admits_swap(self, assignment1: Assignment, assignment2: Assignment) -> bool:
+        # whether the two assignments may take each other's room
+        return self.admits(assignment1.course, assignment2.room) and self.admits(assignment2.course, assignment1.room)
+
+class ProblemIndex:
+    # everything the objective needs that only depends on the loaded instance,
+    # built once per session so the search loops never rebuild it.
+    # courses, rooms and time slots are referred to by their position in the lists below
+    courses: List[Course]
+    rooms: List[Room]
+    time_slots: List[TimeSlot]
+    students: Sequence[Student]
+    lecturers: Sequence[Lecturer]
+
+    course_ids: Dict[str, int]
+    room_ids: Dict[str, int]
+    slot_ids: Dict[int, int]  # hour index -> time slot position
+    slot_hours: List[int]  # time slot position -> hour index
+
+    course_students: List[List[int]]
+    course_lecturers: List[List[int]]
+    course_clash_weight: List[float]  # summed priority weight of the students of each course
+    student_courses: List[List[int]]
+    lecturer_courses: List[List[int]]
+    assignment_courses: array  # course of every assignment position, in generate_initial_schedule order
+    course_conflicts: List[Set[int]] | None  # see conflicting_courses
+
+    capacity_domains: bool
+    capacity_penalty: float
+    room_domains: List[List[int]]  # course -> positions of the rooms it may be placed in, every room without capacity domains
+    room_admissible: List[List[bool]]  # course -> room -> whether the room is in the course's domain
+    domains: RoomDomains | None  # the same domains by course id, None without capacity domains
+    capacity_cost: List[List[float]] | None  # course -> room -> penalty of one credit hour there, None without a capacity penalty
+
+    def __init__(self, courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: Sequence[Student], lecturers: Sequence[Lecturer],
+                 attendance: AttendanceIndex | None = None, capacity_domains: bool = False, capacity_penalty: float = 0.0) -> None:
+        # attendance can be passed in precomputed (see instance_cache), otherwise it is built from the students and lecturers.
+        # with capacity_domains a course is only placed in rooms that seat all of its students
+        # (see capacity_domain), and capacity_penalty is added to the penalty for every credit
+        # hour taught in a room smaller than its course
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.students = students
+        self.lecturers = lecturers
+
+        self.course_ids = {course.course_id: i for i, course in enumerate(courses)}
+        self.room_ids = {room.room_id: i for i, room in enumerate(rooms)}
+        self.slot_hours = [time_slot.hour_index() for time_slot in time_slots]
+        self.slot_ids = {hour_idx: i for i, hour_idx in enumerate(self.slot_hours)}
+
+        if attendance is None:
+            attendance = index_attendance(courses, students, lecturers)
+        self.course_students = attendance.course_students
+        self.course_lecturers = attendance.course_lecturers
+        self.course_clash_weight = attendance.course_clash_weight
+        self.student_courses = attendance.student_courses
+        self.lecturer_courses = attendance.lecturer_courses
+        self.assignment_courses = array('i', [i for i, course in enumerate(courses) for _ in range(course.credits)])
+        self.course_conflicts = None
+
+        self.capacity_domains = capacity_domains
+        self.capacity_penalty = capacity_penalty
+        if capacity_domains:
+            self.room_domains = [capacity_domain(course, rooms) for course in courses]
+            self.domains = RoomDomains({course.course_id: [rooms[room_idx] for room_idx in domain]
+                                        for course, domain in zip(courses, self.room_domains)})
+        else:
+            every_room: List[int] = list(range(len(rooms)))
+            self.room_domains = [every_room for _ in courses]
+            self.domains = None
+        self.room_admissible = []
+        for domain in self.room_domains:
+            admissible: List[bool] = [False] * len(rooms)
+            for room_idx in domain:
+                admissible[room_idx] = True
+            self.room_admissible.append(admissible)
+
+        self.capacity_cost = None
+        if capacity_penalty > 0:
+            self.capacity_cost = [[capacity_penalty if room.capacity < course.num_students else 0.0 for room in rooms] for course in courses]
+
+    def conflicting_courses(self) -> List[Set[int]]:
+        # for every course, the courses that share a student or lecturer with it, itself
+        # included when anyone attends it: two assignments of such courses in the same
+        # hour always clash. built on first use
+        if self.course_conflicts is None:
+            self.course_conflicts = [set() for _ in self.courses]
+            for attendee_courses in (self.student_courses, self.lecturer_courses):
+                for course_list in attendee_courses:
+                    for course_idx in course_list:
+                        self.course_conflicts[course_idx].update(course_list)
+        return self.course_conflicts
@@ -1,9 +1,14 @@
 import time
 import matplotlib.pyplot as plt
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Tuple
 from models import *
-from scheduler import objective, generate_initial_schedule
+from problem import ProblemIndex
+from scheduler import indexed_objective
+from constructive import starting_schedule
 from utils import visualize_schedule
+from metrics import Observer, NULL_OBSERVER
+from budget import SearchBudget, UNLIMITED
+from objective_cache import ObjectiveCache
 from hill_climbing import (
     steepest_ascent_hill_climbing_sampling,
     steepest_ascent_hill_climbing_full,
@@ -12,9 +17,15 @@ from hill_climbing import (
     hill_climbing_with_sideways_moves_full,
     random_restart_hill_climbing
 )
-from genetic import genetic_algorithm
-from simulated_annealing import simulated_annealing
+from tabu_search import tabu_search
+from genetic import genetic_algorithm, island_genetic_algorithm
+from simulated_annealing import simulated_annealing, adaptive_simulated_annealing, parallel_tempering
+from decomposition import decomposed_search
 
+# the final schedule and the statistics of one run, as written by save_schedule_to_json.
+# stopped_early is read from the budget as soon as the search returns, before the
+# runner prints, visualizes and plots, which take time of their own
+RunnerResult = Tuple[Schedule, Dict[str, Any]]
 
 def plot_objective_history(objective_history: List[float], title: str, xlabel: str = "Iteration", ylabel: str = "Objective Value") -> None:
     plt.figure(figsize=(10, 6))
@@ -26,6 +37,18 @@ def plot_objective_history(objective_history: List[float], title: str, xlabel: s
     plt.tight_layout()
     plt.show()
 
+def plot_island_statistics(island_max: List[List[float]], title: str) -> None:
+    plt.figure(figsize=(10, 6))
+    for k, max_objective in enumerate(island_max):
+        plt.plot(list(range(len(max_objective))), max_objective, label=f'Island {k}', linewidth=2, alpha=0.7)
+    plt.xlabel("Generation")
+    plt.ylabel("Max Objective")
+    plt.title(title)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+
 def plot_acceptance_probability(iterations: List[int], probabilities: List[float], title: str) -> None:
     plt.figure(figsize=(10, 6))
     plt.plot(iterations, probabilities, linewidth=2, alpha=0.7)
@@ -49,127 +72,259 @@ def plot_genetic_statistics(max_objective: List[float], avg_objective: List[floa
     plt.tight_layout()
     plt.show()
 
-def run_steepest_ascent(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+def create_objective_cache(cache_size: int) -> ObjectiveCache | None:
+    return ObjectiveCache(cache_size) if cache_size > 0 else None
+
+def report_objective_cache(objective_cache: ObjectiveCache | None, statistics: Dict[str, Any]) -> Dict[str, Any]:
+    if objective_cache is not None:
+        print(f"  - Objective cache: {objective_cache.hit_rate():.1%} hits ({objective_cache.hits} of {objective_cache.hits + objective_cache.misses} lookups)")
+        statistics['objective_cache'] = objective_cache.statistics()
+    return statistics
+
+def run_steepest_ascent(problem: ProblemIndex, max_iterations: int = 1000, neighbors_to_check: int = 50, cache_size: int = 0, conflict_bias: float = 0.0,
+                        warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                        budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n1. Steepest-Ascent Hill-Climbing (Sampling)")
     final_schedule: Schedule
     obj_history: List[float]
     iters: int
     duration: float
+    objective_cache: ObjectiveCache | None = create_objective_cache(cache_size)
     final_schedule, obj_history, iters, duration = steepest_ascent_hill_climbing_sampling(
-        courses, rooms, time_slots, students, lecturers, max_iterations=1000, neighbors_to_check=50
+        problem, max_iterations=max_iterations, neighbors_to_check=neighbors_to_check, observer=observer, budget=budget, warm_start=warm_start, objective_cache=objective_cache,
+        conflict_bias=conflict_bias
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Iterations until stop: {iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Steepest-Ascent Hill-Climbing (Sampling): Objective vs Iteration")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Steepest-Ascent Hill-Climbing (Sampling): Objective vs Iteration")
+
+    return final_schedule, report_objective_cache(objective_cache, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history})
 
-def run_steepest_ascent_full(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+def run_steepest_ascent_full(problem: ProblemIndex, max_iterations: int = 1000, workers: int = 1, first_improvement: bool = False,
+                             scan_order: str = 'conflicts',
+                             warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                             budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n1b. Steepest-Ascent Hill-Climbing (Full)")
     final_schedule: Schedule
     obj_history: List[float]
     iters: int
     duration: float
     final_schedule, obj_history, iters, duration = steepest_ascent_hill_climbing_full(
-        courses, rooms, time_slots, students, lecturers, max_iterations=1000
+        problem, max_iterations=max_iterations, workers=workers, observer=observer, budget=budget, warm_start=warm_start,
+        first_improvement=first_improvement, scan_order=scan_order
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Iterations until stop: {iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Steepest-Ascent Hill-Climbing (Full): Objective vs Iteration")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Steepest-Ascent Hill-Climbing (Full): Objective vs Iteration")
 
-def run_stochastic(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+    return final_schedule, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history}
+
+def run_stochastic(problem: ProblemIndex, max_iterations: int = 2000, max_stuck_iterations: int = 100, cache_size: int = 0, conflict_bias: float = 0.0,
+                   warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                   budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n2. Stochastic Hill-Climbing")
     final_schedule: Schedule
     obj_history: List[float]
     iters: int
     duration: float
+    objective_cache: ObjectiveCache | None = create_objective_cache(cache_size)
     final_schedule, obj_history, iters, duration = stochastic_hill_climbing(
-        courses, rooms, time_slots, students, lecturers, max_iterations=2000, max_stuck_iterations=100
+        problem, max_iterations=max_iterations, max_stuck_iterations=max_stuck_iterations, observer=observer, budget=budget, warm_start=warm_start, objective_cache=objective_cache,
+        conflict_bias=conflict_bias
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Iterations until stop: {iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Stochastic Hill-Climbing: Objective vs Iteration")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Stochastic Hill-Climbing: Objective vs Iteration")
+
+    return final_schedule, report_objective_cache(objective_cache, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history})
 
-def run_sideways_moves(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+def run_sideways_moves(problem: ProblemIndex, max_iterations: int = 1000, max_sideways_moves: int = 100, cache_size: int = 0, conflict_bias: float = 0.0,
+                       warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                       budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n3. Hill-Climbing with Sideways Moves (Sampling)")
     final_schedule: Schedule
     obj_history: List[float]
     iters: int
     duration: float
+    objective_cache: ObjectiveCache | None = create_objective_cache(cache_size)
     final_schedule, obj_history, iters, duration = hill_climbing_with_sideways_moves_sampling(
-        courses, rooms, time_slots, students, lecturers, max_iterations=1000, max_sideways_moves=100
+        problem, max_iterations=max_iterations, max_sideways_moves=max_sideways_moves, observer=observer, budget=budget, warm_start=warm_start, objective_cache=objective_cache,
+        conflict_bias=conflict_bias
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Iterations until stop: {iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Hill-Climbing with Sideways Moves (Sampling): Objective vs Iteration")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Hill-Climbing with Sideways Moves (Sampling): Objective vs Iteration")
+
+    return final_schedule, report_objective_cache(objective_cache, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history})
 
-def run_sideways_moves_full(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+def run_sideways_moves_full(problem: ProblemIndex, max_iterations: int = 1000, max_sideways_moves: int = 100, workers: int = 1,
+                            first_improvement: bool = False, scan_order: str = 'conflicts',
+                            warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                            budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n3b. Hill-Climbing with Sideways Moves (Full)")
     final_schedule: Schedule
     obj_history: List[float]
     iters: int
     duration: float
     final_schedule, obj_history, iters, duration = hill_climbing_with_sideways_moves_full(
-        courses, rooms, time_slots, students, lecturers, max_iterations=1000, max_sideways_moves=100
+        problem, max_iterations=max_iterations, max_sideways_moves=max_sideways_moves, workers=workers, observer=observer, budget=budget, warm_start=warm_start,
+        first_improvement=first_improvement, scan_order=scan_order
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Iterations until stop: {iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Hill-Climbing with Sideways Moves (Full): Objective vs Iteration")
-    
-def run_random_restart(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Hill-Climbing with Sideways Moves (Full): Objective vs Iteration")
+
+    return final_schedule, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history}
+
+def run_random_restart(problem: ProblemIndex, num_restarts: int = 20, max_iter_per_restart: int = 500, workers: int = 1, cache_size: int = 0,
+                       conflict_bias: float = 0.0,
+                       warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                       budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n4. Random-Restart Hill-Climbing")
     final_schedule: Schedule
     obj_history: List[float]
     total_iters: int
     duration: float
-    num_restarts: int
+    objective_cache: ObjectiveCache | None = create_objective_cache(cache_size)
     final_schedule, obj_history, total_iters, duration, num_restarts = random_restart_hill_climbing(
-        courses, rooms, time_slots, students, lecturers, num_restarts=20, max_iter_per_restart=500
+        problem, num_restarts=num_restarts, max_iter_per_restart=max_iter_per_restart, workers=workers, observer=observer, budget=budget, warm_start=warm_start, objective_cache=objective_cache,
+        conflict_bias=conflict_bias
     )
+    stopped_early: bool = budget.expired()
     print(f"\nFinal Result:")
-    print(f"  - Global Best objective: {objective(final_schedule, students, lecturers):.2f}")
+    print(f"  - Global Best objective: {indexed_objective(final_schedule, problem):.2f}")
     print(f"  - Number of Restarts: {num_restarts}")
     print(f"  - Total Iterations (sum over all restarts): {total_iters}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_objective_history(obj_history, "Random-Restart Hill-Climbing: Best Objective per Restart", 
-                          xlabel="Restart Number")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Random-Restart Hill-Climbing: Best Objective per Restart",
+                               xlabel="Restart Number")
 
-def run_genetic_algorithm(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+    return final_schedule, report_objective_cache(objective_cache, {'objective': indexed_objective(final_schedule, problem), 'restarts': num_restarts,
+                                                                    'iterations': total_iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history})
+
+def run_tabu_search(problem: ProblemIndex, max_iterations: int = 2000, neighbors_to_check: int = 100, tenure: int = 15, max_stuck_iterations: int = 300,
+                    warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                    budget: SearchBudget = UNLIMITED) -> RunnerResult:
+    print("\n4b. Tabu Search")
+    final_schedule: Schedule
+    obj_history: List[float]
+    iters: int
+    duration: float
+    final_schedule, obj_history, iters, duration = tabu_search(
+        problem, max_iterations=max_iterations, neighbors_to_check=neighbors_to_check, tenure=tenure,
+        max_stuck_iterations=max_stuck_iterations, observer=observer, budget=budget, warm_start=warm_start
+    )
+    stopped_early: bool = budget.expired()
+    print(f"\nFinal Result:")
+    print(f"  - Best objective: {indexed_objective(final_schedule, problem):.2f}")
+    print(f"  - Iterations until stop: {iters}")
+    print(f"  - Search Duration: {duration:.4f} seconds")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_objective_history(obj_history, "Tabu Search: Current Objective vs Iteration")
+
+    return final_schedule, {'objective': indexed_objective(final_schedule, problem), 'iterations': iters, 'duration': duration, 'stopped_early': stopped_early, 'objective_history': obj_history}
+
+def run_genetic_algorithm(problem: ProblemIndex, population_size: int = 100, generations: int = 100, workers: int = 1, cache_size: int = 0,
+                          conflict_bias: float = 0.0, elitism: int = 0, selection_method: str = 'roulette', tournament_size: int = 3,
+                          warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                          budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n5. Genetic Algorithm")
 
     start_time: float = time.time()
     final_schedule: Schedule
     statistics: Dict[str, List[float]]
+    objective_cache: ObjectiveCache | None = create_objective_cache(cache_size)
     final_schedule, statistics = genetic_algorithm(
-        courses, rooms, time_slots, students, lecturers, population_size=100, generations=100
+        problem, population_size=population_size, generations=generations, workers=workers, observer=observer, budget=budget, warm_start=warm_start, objective_cache=objective_cache,
+        conflict_bias=conflict_bias, elitism=elitism, selection_method=selection_method, tournament_size=tournament_size
     )
+    stopped_early: bool = budget.expired()
     duration: float = time.time() - start_time
 
     print(f"\nFinal Result:")
-    print(f"  - Final objective: {objective(final_schedule, students, lecturers):.2f}")
-    print(f"  - Population Size: 100, Generations: 100")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
+    print(f"  - Population Size: {population_size}, Generations: {generations}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    plot_genetic_statistics(statistics['max_objective'], statistics['avg_objective'],
-                           "Genetic Algorithm: Max and Average Objective vs Generation")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_genetic_statistics(statistics['max_objective'], statistics['avg_objective'],
+                                "Genetic Algorithm: Max and Average Objective vs Generation")
 
-def run_simulated_annealing(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], students: List[Student], lecturers: List[Lecturer]) -> None:
+    return final_schedule, report_objective_cache(objective_cache, {'objective': indexed_objective(final_schedule, problem), 'duration': duration, 'stopped_early': stopped_early, **statistics})
+
+def run_island_genetic_algorithm(problem: ProblemIndex, population_size: int = 100, generations: int = 100, islands: int = 4, migration_interval: int = 10,
+                                 migrants: int = 2, workers: int | None = None, warm_start: bool = False, visualize: bool = True,
+                                 show_plots: bool = True, observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED) -> RunnerResult:
+    print("\n5b. Genetic Algorithm (Island Model)")
+
+    start_time: float = time.time()
+    final_schedule: Schedule
+    statistics: Dict[str, List[float]]
+    final_schedule, statistics = island_genetic_algorithm(
+        problem, population_size=population_size, generations=generations, islands=islands, migration_interval=migration_interval,
+        migrants=migrants, workers=workers, observer=observer, budget=budget, warm_start=warm_start
+    )
+    stopped_early: bool = budget.expired()
+    duration: float = time.time() - start_time
+    island_max: List[List[float]] = [statistics[f'island_{k}_max_objective'] for k in range(islands)]
+
+    print(f"\nFinal Result:")
+    print(f"  - Final objective: {indexed_objective(final_schedule, problem):.2f}")
+    print(f"  - Islands: {islands}, Population Size per Island: {population_size}, Generations: {len(statistics['max_objective'])}")
+    print(f"  - Best objective over all islands per generation: {', '.join(f'{value:.2f}' for value in statistics['max_objective'])}")
+    for k, max_objective in enumerate(island_max):
+        print(f"  - Best objective of island {k} per generation: {', '.join(f'{value:.2f}' for value in max_objective)}")
+    print(f"  - Search Duration: {duration:.4f} seconds")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+    if show_plots:
+        plot_genetic_statistics(statistics['max_objective'], statistics['avg_objective'],
+                                "Island Genetic Algorithm: Max and Average Objective over All Islands vs Generation")
+        plot_island_statistics(island_max, "Island Genetic Algorithm: Max Objective of Each Island vs Generation")
+
+    return final_schedule, {'objective': indexed_objective(final_schedule, problem), 'duration': duration, 'stopped_early': stopped_early, **statistics}
+
+def run_simulated_annealing(problem: ProblemIndex, initial_temp: float = 1000, cooling_rate: float = 0.95, min_temp: float = 1, conflict_bias: float = 0.0,
+                            warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                            budget: SearchBudget = UNLIMITED) -> RunnerResult:
     print("\n6. Simulated Annealing")
-    initial_schedule: Schedule = generate_initial_schedule(courses, rooms, time_slots)
+    initial_schedule: Schedule = starting_schedule(problem, warm_start)
     
     start_time: float = time.time()
     final_schedule: Schedule
@@ -178,16 +333,139 @@ def run_simulated_annealing(courses: List[Course], rooms: List[Room], time_slots
     iterations: List[int]
     stuck_count: int
     final_schedule, final_objective, accept_probs, iterations, stuck_count = simulated_annealing(
-        initial_schedule, students, lecturers, time_slots, rooms, 
-        initial_temp=1000, cooling_rate=0.95, min_temp=1
+        initial_schedule, problem,
+        initial_temp=initial_temp, cooling_rate=cooling_rate, min_temp=min_temp, observer=observer, budget=budget, conflict_bias=conflict_bias
     )
+    stopped_early: bool = budget.expired()
     duration: float = time.time() - start_time
 
     print(f"\nFinal Result:")
     print(f"  - Final objective: {final_objective:.2f}")
     print(f"  - Frequency of 'stuck' at local optima: {stuck_count}")
     print(f"  - Search Duration: {duration:.4f} seconds")
-    visualize_schedule(final_schedule, rooms)
-    
-    plot_acceptance_probability(iterations, accept_probs, 
-                                "Simulated Annealing: Acceptance Probability (e^(ΔE/T)) vs Iteration")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+
+    if show_plots:
+        plot_acceptance_probability(iterations, accept_probs,
+                                    "Simulated Annealing: Acceptance Probability (e^(ΔE/T)) vs Iteration")
+
+    return final_schedule, {'objective': final_objective, 'stuck_count': stuck_count, 'iterations': len(iterations), 'duration': duration, 'stopped_early': stopped_early}
+
+def run_adaptive_simulated_annealing(problem: ProblemIndex, target_acceptance: float = 0.8, cooling_rate: float = 0.8, chain_factor: float = 8.0,
+                                     min_acceptance: float = 0.005, max_reheats: int = 3, conflict_bias: float = 0.0,
+                                     warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                                     budget: SearchBudget = UNLIMITED) -> RunnerResult:
+    print("\n6b. Simulated Annealing (Adaptive)")
+    initial_schedule: Schedule = starting_schedule(problem, warm_start)
+
+    start_time: float = time.time()
+    final_schedule: Schedule
+    final_objective: float
+    accept_probs: List[float]
+    iterations: List[int]
+    reheats: int
+    final_schedule, final_objective, accept_probs, iterations, reheats = adaptive_simulated_annealing(
+        initial_schedule, problem, target_acceptance=target_acceptance, cooling_rate=cooling_rate, chain_factor=chain_factor,
+        min_acceptance=min_acceptance, max_reheats=max_reheats, observer=observer, budget=budget, conflict_bias=conflict_bias
+    )
+    stopped_early: bool = budget.expired()
+    duration: float = time.time() - start_time
+
+    print(f"\nFinal Result:")
+    print(f"  - Final objective: {final_objective:.2f}")
+    print(f"  - Reheats after getting stuck: {reheats}")
+    print(f"  - Iterations: {len(iterations)}")
+    print(f"  - Search Duration: {duration:.4f} seconds")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+
+    if show_plots:
+        plot_acceptance_probability(iterations, accept_probs,
+                                    "Adaptive Simulated Annealing: Acceptance Probability (e^(ΔE/T)) vs Iteration")
+
+    return final_schedule, {'objective': final_objective, 'reheats': reheats, 'iterations': len(iterations), 'duration': duration, 'stopped_early': stopped_early}
+
+def run_parallel_tempering(problem: ProblemIndex, replicas: int = 4, max_temp: float = 1000, min_temp: float = 1,
+                           sweep_length: int = 100, exchanges: int = 50, workers: int | None = None,
+                           warm_start: bool = False, visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                           budget: SearchBudget = UNLIMITED) -> RunnerResult:
+    print("\n6c. Parallel Tempering (Replica-Exchange Simulated Annealing)")
+    initial_schedule: Schedule = starting_schedule(problem, warm_start)
+
+    start_time: float = time.time()
+    final_schedule: Schedule
+    final_objective: float
+    accept_probs: List[float]
+    iterations: List[int]
+    replica_statistics: Dict[str, List[float]]
+    final_schedule, final_objective, accept_probs, iterations, replica_statistics = parallel_tempering(
+        initial_schedule, problem,
+        replicas=replicas, max_temp=max_temp, min_temp=min_temp,
+        sweep_length=sweep_length, exchanges=exchanges, workers=workers, observer=observer, budget=budget
+    )
+    stopped_early: bool = budget.expired()
+    duration: float = time.time() - start_time
+
+    print(f"\nFinal Result:")
+    print(f"  - Final objective: {final_objective:.2f}")
+    for temp, rate in zip(replica_statistics['temperatures'], replica_statistics['acceptance_rates']):
+        print(f"  - Acceptance rate at T={temp:.2f}: {rate:.2%}")
+    for k, rate in enumerate(replica_statistics['swap_rates']):
+        print(f"  - Swap rate between replicas {k} and {k + 1}: {rate:.2%}")
+    print(f"  - Search Duration: {duration:.4f} seconds")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+
+    if show_plots:
+        plot_acceptance_probability(iterations, accept_probs,
+                                    "Parallel Tempering: Acceptance Probability (e^(ΔE/T)) of the Coldest Replica vs Iteration")
+
+    return final_schedule, {'objective': final_objective, 'iterations': len(iterations), 'duration': duration, 'stopped_early': stopped_early, **replica_statistics}
+
+# the runners a decomposed search can solve its components with
+COMPONENT_RUNNERS: Dict[str, Callable[..., RunnerResult]] = {
+    'steepest_ascent': run_steepest_ascent,
+    'steepest_ascent_full': run_steepest_ascent_full,
+    'stochastic': run_stochastic,
+    'sideways_moves': run_sideways_moves,
+    'sideways_moves_full': run_sideways_moves_full,
+    'random_restart': run_random_restart,
+    'tabu_search': run_tabu_search,
+    'genetic_algorithm': run_genetic_algorithm,
+    'island_genetic_algorithm': run_island_genetic_algorithm,
+    'simulated_annealing': run_simulated_annealing,
+    'adaptive_simulated_annealing': run_adaptive_simulated_annealing,
+    'parallel_tempering': run_parallel_tempering
+}
+
+def run_decomposed(problem: ProblemIndex, algorithm: str = 'stochastic', parameters: Dict[str, Any] | None = None, workers: int = 1,
+                   seed: int | None = None, join_rooms: bool = False, room_split: bool = True, repair: bool = True,
+                   visualize: bool = True, show_plots: bool = True, observer: Observer = NULL_OBSERVER,
+                   budget: SearchBudget = UNLIMITED) -> RunnerResult:
+    # the components are solved by the algorithm runner with parameters, see decomposed_search.
+    # there is no single objective history to plot, so show_plots is ignored
+    print("\n7. Decomposed Search (Independent Components)")
+    if algorithm not in COMPONENT_RUNNERS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, expected one of: {', '.join(COMPONENT_RUNNERS)}")
+
+    start_time: float = time.time()
+    final_schedule: Schedule
+    statistics: Dict[str, Any]
+    final_schedule, statistics = decomposed_search(
+        problem, COMPONENT_RUNNERS[algorithm], parameters, workers=workers, seed=seed, join_rooms=join_rooms,
+        room_split=room_split, repair=repair, observer=observer, budget=budget
+    )
+    stopped_early: bool = budget.expired()
+    duration: float = time.time() - start_time
+    final_objective: float = indexed_objective(final_schedule, problem)
+
+    print(f"\nFinal Result:")
+    print(f"  - Final objective: {final_objective:.2f}")
+    print(f"  - Components: {len(statistics['component_sizes'])} (courses: {statistics['component_sizes']}, rooms: {statistics['component_rooms']})")
+    print(f"  - Room clash repair moves: {statistics['repair_moves']}")
+    print(f"  - Search Duration: {duration:.4f} seconds")
+    if visualize:
+        visualize_schedule(final_schedule, problem.rooms)
+
+    return final_schedule, {'objective': final_objective, 'algorithm': algorithm, 'duration': duration, 'stopped_early': stopped_early, **statistics}
@@ -1,29 +1,23 @@
 from models import *
-from typing import List, Dict, Tuple, Set
+from problem import ProblemIndex, RoomDomains, priority_weight
+from moves import Move, RelocateMove, SwapMove
+from typing import List, Dict, Tuple, Set, Iterator, Sequence
 import random
-import copy
 
-def generate_initial_schedule(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot]) -> Schedule:
+def generate_initial_schedule(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], domains: RoomDomains | None = None) -> Schedule:
+    # with domains every course only gets rooms of its own domain
     assignments: List[Assignment] = []
 
     for course in courses:
+        course_rooms: List[Room] = rooms if domains is None else domains.course_rooms[course.course_id]
         for _ in range(course.credits):
-            random_room: Room = random.choice(rooms)
+            random_room: Room = random.choice(course_rooms)
             random_time_slot: TimeSlot = random.choice(time_slots)
             assignment: Assignment = Assignment(course, random_time_slot, random_room)
             assignments.append(assignment)
 
     return Schedule(assignments)
 
-def priority_weight(priority: int) -> float:
-    if priority == 1:
-        return 1.75
-    if priority == 2:
-        return 1.5
-    if priority == 3:
-        return 1.25
-    return 1.0
-
 def objective(schedule: Schedule, students: List[Student], lecturers: List[Lecturer]) -> float:
     penalty = 0.0
 
@@ -86,40 +80,141 @@ def objective(schedule: Schedule, students: List[Student], lecturers: List[Lectu
 
     return -penalty
 
-def generate_neighbor(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot]) -> Schedule:
-    new_schedule: Schedule = copy.deepcopy(schedule)
+def placement_objective(assignment_courses: Sequence[int], assignment_hours: Sequence[int], assignment_rooms: Sequence[int], problem: ProblemIndex) -> float:
+    # same value as objective(), for assignments given as course, hour index and room index,
+    # plus the problem's capacity penalty when it has one
+    penalty = 0.0
+
+    course_hours: List[List[int]] = [[] for _ in problem.courses]
+    room_time_count: Dict[int, int] = {}
+    room_time_weight: Dict[int, float] = {}
+
+    for course_idx, hour_idx, room_idx in zip(assignment_courses, assignment_hours, assignment_rooms):
+        course_hours[course_idx].append(hour_idx)
+
+        room_time: int = room_idx * HOURS_PER_WEEK + hour_idx
+        room_time_count[room_time] = room_time_count.get(room_time, 0) + 1
+        room_time_weight[room_time] = room_time_weight.get(room_time, 0.0) + problem.course_clash_weight[course_idx]
+
+    for attendee_courses in (problem.student_courses, problem.lecturer_courses):
+        for course_list in attendee_courses:
+            filled: Set[int] = set()
+
+            for course_idx in course_list:
+                for hour_idx in course_hours[course_idx]:
+                    if hour_idx in filled:
+                        penalty += 1
+                    else:
+                        filled.add(hour_idx)
 
+    for room_time, count in room_time_count.items():
+        if count > 1:
+            penalty += room_time_weight[room_time]
+
+    if problem.capacity_cost is not None:
+        for course_idx, room_idx in zip(assignment_courses, assignment_rooms):
+            penalty += problem.capacity_cost[course_idx][room_idx]
+
+    return -penalty
+
+def indexed_objective(schedule: Schedule, problem: ProblemIndex) -> float:
+    assignment_courses: List[int] = [problem.course_ids[a.course.course_id] for a in schedule.assignments]
+    assignment_hours: List[int] = [a.time_slot.hour_index() for a in schedule.assignments]
+    assignment_rooms: List[int] = [problem.room_ids[a.room.room_id] for a in schedule.assignments]
+    return placement_objective(assignment_courses, assignment_hours, assignment_rooms, problem)
+
+def generate_move(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot], domains: RoomDomains | None = None) -> Move:
+    # with domains the moves keep every assignment inside its course's room domain
+    index: int
     mutation_type: float = random.random()
     if mutation_type < 0.5:
         # swap two assignments
         index1: int
         index2: int
-        index1, index2 = random.sample(range(len(new_schedule.assignments)), 2)
-        assignment1: Assignment = new_schedule.assignments[index1]
-        assignment2: Assignment = new_schedule.assignments[index2]
-        assignment1.room, assignment2.room = assignment2.room, assignment1.room
-        assignment1.time_slot, assignment2.time_slot = assignment2.time_slot, assignment1.time_slot
+        index1, index2 = random.sample(range(len(schedule.assignments)), 2)
+        if domains is None or domains.admits_swap(schedule.assignments[index1], schedule.assignments[index2]):
+            return SwapMove(index1, index2)
+        # one of the rooms does not fit the other course, the first assignment is relocated instead
+        index = index1
     else:
         # assign different room and time slot for an assignment
-        index: int = random.randint(0, len(new_schedule.assignments) - 1)
-        new_schedule.assignments[index].room = random.choice(rooms)
-        new_schedule.assignments[index].time_slot = random.choice(time_slots)
-
+        index = random.randint(0, len(schedule.assignments) - 1)
+
+    course_rooms: List[Room] = rooms if domains is None else domains.course_rooms[schedule.assignments[index].course.course_id]
+    room: Room = random.choice(course_rooms)
+    time_slot: TimeSlot = random.choice(time_slots)
+    return RelocateMove(index, time_slot, room)
+
+def generate_moves(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot], count: int, domains: RoomDomains | None = None) -> Iterator[Move]:
+    for _ in range(count):
+        yield generate_move(schedule, rooms, time_slots, domains)
+
+def full_neighborhood_moves(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot], indices: Sequence[int] | None = None,
+                            domains: RoomDomains | None = None) -> Iterator[Move]:
+    # every swap, then every relocation that actually changes the assignment.
+    # indices restricts the scan to the swaps and relocations starting at those assignments,
+    # domains to the moves that keep every assignment inside its room domain
+    num_assignments: int = len(schedule.assignments)
+    if indices is None:
+        indices = range(num_assignments)
+
+    for index1 in indices:
+        for index2 in range(index1 + 1, num_assignments):
+            if domains is None or domains.admits_swap(schedule.assignments[index1], schedule.assignments[index2]):
+                yield SwapMove(index1, index2)
+
+    for index in indices:
+        original_room_id: str = schedule.assignments[index].room.room_id
+        original_hour_idx: int = schedule.assignments[index].time_slot.hour_index()
+        course_rooms: List[Room] = rooms if domains is None else domains.course_rooms[schedule.assignments[index].course.course_id]
+        for room in course_rooms:
+            for time_slot in time_slots:
+                if room.room_id == original_room_id and time_slot.hour_index() == original_hour_idx:
+                    continue
+                yield RelocateMove(index, time_slot, room)
+
+def assignment_moves(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot], index: int,
+                     domains: RoomDomains | None = None) -> Iterator[Move]:
+    # every move of one assignment: the swaps with assignments of other courses (a swap
+    # within a course changes nothing), then every relocation that actually changes it
+    moved: Assignment = schedule.assignments[index]
+    course_id: str = moved.course.course_id
+    for other, assignment in enumerate(schedule.assignments):
+        if assignment.course.course_id != course_id and (domains is None or domains.admits_swap(moved, assignment)):
+            yield SwapMove(index, other)
+
+    original_room_id: str = moved.room.room_id
+    original_hour_idx: int = moved.time_slot.hour_index()
+    course_rooms: List[Room] = rooms if domains is None else domains.course_rooms[course_id]
+    for room in course_rooms:
+        for time_slot in time_slots:
+            if room.room_id == original_room_id and time_slot.hour_index() == original_hour_idx:
+                continue
+            yield RelocateMove(index, time_slot, room)
+
+def full_neighborhood_size(num_assignments: int, num_rooms: int, num_time_slots: int) -> int:
+    # number of moves full_neighborhood_moves yields when the time slots have distinct hours
+    return num_assignments * (num_assignments - 1) // 2 + num_assignments * (num_rooms * num_time_slots - 1)
+
+def generate_neighbor(schedule: Schedule, rooms: List[Room], time_slots: List[TimeSlot], domains: RoomDomains | None = None) -> Schedule:
+    new_schedule: Schedule = schedule.copy()
+    generate_move(new_schedule, rooms, time_slots, domains).apply(new_schedule)
     return new_schedule
 
-def initialize_population(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], population_size: int) -> List[Schedule]:
+def initialize_population(courses: List[Course], rooms: List[Room], time_slots: List[TimeSlot], population_size: int,
+                          domains: RoomDomains | None = None) -> List[Schedule]:
     population: List[Schedule] = []
 
     for _ in range(population_size):
-        population.append(generate_initial_schedule(courses, rooms, time_slots))
+        population.append(generate_initial_schedule(courses, rooms, time_slots, domains))
 
     return population
 
-def evaluate_population(population: List[Schedule], students: List[Student], lecturers: List[Lecturer]) -> List[Tuple[Schedule, float]]:
+def evaluate_population(population: List[Schedule], problem: ProblemIndex) -> List[Tuple[Schedule, float]]:
     population_objective: List[Tuple[Schedule, float]] = []
 
     for schedule in population:
-        objective_score: float = objective(schedule, students, lecturers)
+        objective_score: float = indexed_objective(schedule, problem)
         population_objective.append((schedule, objective_score))
     
     return population_objective
\ No newline at end of file
@@ -1,15 +1,28 @@
 import math
 import random
-from copy import deepcopy
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
 from scheduler import *
-from typing import List, Tuple
-
-def simulated_annealing(initial_schedule: Schedule, students: List[Student], lecturers: List[Lecturer], time_slots: List[TimeSlot],
-                        rooms: List[Room], initial_temp: float = 1000, cooling_rate: float = 0.95,
-                        min_temp: float = 1) -> Tuple[Schedule, float, List[float], List[int], int]:
-    current: Schedule = deepcopy(initial_schedule)
-    current_objective: float = objective(current, students, lecturers)
-    best: Schedule = deepcopy(current)
+from moves import Move
+from evaluator import DeltaEvaluator
+from neighbors import NeighborGenerator, create_search_evaluator
+from compact import CompactSchedule, to_compact_schedule, to_schedule
+from parallel import create_problem_pool, derive_seed, worker_problem
+from metrics import Observer, NULL_OBSERVER, WorkerMetrics, export_metrics, merge_metrics, worker_recorder
+from budget import SearchBudget, UNLIMITED
+from typing import List, Tuple, Dict
+
+def simulated_annealing(initial_schedule: Schedule, problem: ProblemIndex, initial_temp: float = 1000, cooling_rate: float = 0.95,
+                        min_temp: float = 1, observer: Observer = NULL_OBSERVER,
+                        budget: SearchBudget = UNLIMITED, conflict_bias: float = 0.0) -> Tuple[Schedule, float, List[float], List[int], int]:
+    # with a time budget the temperature follows the share of the budget spent instead of
+    # cooling_rate, so the whole cooling schedule from initial_temp to min_temp fits in it.
+    # conflict_bias is the share of moves directed at clashing assignments, see NeighborGenerator
+    current: Schedule = initial_schedule.copy()
+    evaluator: DeltaEvaluator = create_search_evaluator(current, problem, conflict_bias)
+    neighbors: NeighborGenerator = NeighborGenerator(evaluator, conflict_bias)
+    current_objective: float = evaluator.value()
+    best: Schedule = current.copy()
     best_objective: float = current_objective
 
     temp: float = initial_temp
@@ -21,33 +34,274 @@ def simulated_annealing(initial_schedule: Schedule, students: List[Student], lec
     last_improvement_iter: int = 0
 
     while temp > min_temp:
-        neighbor: Schedule = generate_neighbor(current, rooms, time_slots)
-        neighbor_objective: float = objective(neighbor, students, lecturers)
-        delta: float = neighbor_objective - current_objective
-
-        accept_prob: float
-        if delta > 0:
-            accept_prob = 1.0
-            acceptance_probabilities.append(accept_prob)
-        else:
-            accept_prob = math.exp(delta / temp)
-            acceptance_probabilities.append(accept_prob)
-        
+        if budget.expired():
+            break
+        if budget.timed():
+            temp = initial_temp * (min_temp / initial_temp) ** budget.fraction_used()
+
+        with observer.timer('neighbor_generation'):
+            move: Move = neighbors.move()
+        with observer.timer('evaluation'):
+            delta: float = evaluator.move_delta(move)
+        observer.count('evaluations')
+
+        accept_prob: float = 1.0 if delta > 0 else math.exp(delta / temp)
+        acceptance_probabilities.append(accept_prob)
         iterations_list.append(iteration)
 
-        if delta > 0 or random.random() < math.exp(delta / temp):
-            current = neighbor
-            current_objective = neighbor_objective
+        if delta > 0 or random.random() < accept_prob:
+            evaluator.apply_move(move)
+            current_objective += delta
+            observer.count('moves_accepted')
             if current_objective > best_objective:
-                best = deepcopy(current)
+                with observer.timer('copy'):
+                    best = current.copy()
+                observer.count('copies')
                 best_objective = current_objective
                 last_improvement_iter = iteration
+        else:
+            observer.count('moves_rejected')
 
         if iteration - last_improvement_iter >= 100:
             stuck_count += 1
             last_improvement_iter = iteration
 
+        observer.progress(iteration, best_objective)
         temp *= cooling_rate
         iteration += 1
 
-    return best, best_objective, acceptance_probabilities, iterations_list, stuck_count
\ No newline at end of file
+    return best, best_objective, acceptance_probabilities, iterations_list, stuck_count
+
+# accepted moves, acceptance probability of every step, best schedule seen and its objective
+SweepResult = Tuple[int, List[float], Schedule, float]
+
+def metropolis_sweep(evaluator: DeltaEvaluator, problem: ProblemIndex, temp: float, steps: int, observer: Observer = NULL_OBSERVER,
+                     neighbors: NeighborGenerator | None = None) -> SweepResult:
+    # steps Metropolis moves at a fixed temperature on the evaluator's schedule, drawn
+    # from neighbors if given and uniformly otherwise
+    if neighbors is None:
+        neighbors = NeighborGenerator(evaluator)
+    current_objective: float = evaluator.value()
+    best: Schedule = evaluator.schedule.copy()
+    best_objective: float = current_objective
+    accepted: int = 0
+    acceptance_probabilities: List[float] = []
+
+    for _ in range(steps):
+        with observer.timer('neighbor_generation'):
+            move: Move = neighbors.move()
+        with observer.timer('evaluation'):
+            delta: float = evaluator.move_delta(move)
+        observer.count('evaluations')
+        accept_prob: float = 1.0 if delta > 0 else math.exp(delta / temp)
+        acceptance_probabilities.append(accept_prob)
+
+        if delta > 0 or random.random() < accept_prob:
+            evaluator.apply_move(move)
+            current_objective += delta
+            accepted += 1
+            if current_objective > best_objective:
+                with observer.timer('copy'):
+                    best = evaluator.schedule.copy()
+                observer.count('copies')
+                best_objective = current_objective
+
+    observer.count('moves_accepted', accepted)
+    observer.count('moves_rejected', steps - accepted)
+
+    return accepted, acceptance_probabilities, best, best_objective
+
+def calibrate_temperature(evaluator: DeltaEvaluator, problem: ProblemIndex, target_acceptance: float, samples: int,
+                          observer: Observer = NULL_OBSERVER) -> float:
+    # the temperature at which the average worsening move among samples random
+    # neighbors is accepted with probability target_acceptance
+    worsening: List[float] = []
+    for _ in range(samples):
+        move: Move = generate_move(evaluator.schedule, problem.rooms, problem.time_slots, problem.domains)
+        delta: float = evaluator.move_delta(move)
+        if delta < 0:
+            worsening.append(-delta)
+    observer.count('evaluations', samples)
+
+    if not worsening:
+        return 1.0
+    return sum(worsening) / len(worsening) / -math.log(target_acceptance)
+
+def uphill_acceptance(acceptance_probabilities: List[float]) -> float:
+    # expected share of worsening moves accepted, 0 if none was proposed
+    uphill: List[float] = [p for p in acceptance_probabilities if p < 1.0]
+    return sum(uphill) / len(uphill) if uphill else 0.0
+
+def adaptive_simulated_annealing(initial_schedule: Schedule, problem: ProblemIndex, target_acceptance: float = 0.8, cooling_rate: float = 0.8,
+                                 chain_factor: float = 8.0, min_acceptance: float = 0.005, frozen_chains: int = 3, stuck_chains: int = 10,
+                                 max_reheats: int = 3, reheat_factor: float = 4.0, calibration_samples: int = 200,
+                                 observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED,
+                                 conflict_bias: float = 0.0) -> Tuple[Schedule, float, List[float], List[int], int]:
+    # the starting temperature is calibrated so that target_acceptance of the worsening
+    # moves are accepted. every temperature runs a Markov chain of chain_factor moves per
+    # assignment before cooling by cooling_rate. after stuck_chains chains without a new
+    # best the temperature is reheated to reheat_factor times the one the best was found at,
+    # at most max_reheats times. the search is frozen, and stops, once fewer than
+    # min_acceptance of the worsening moves are accepted for frozen_chains chains in a row.
+    # returns like simulated_annealing, stuck_count being the number of reheats. the
+    # chains, not the calibration, direct conflict_bias of their moves at clashes
+    if not 0 < target_acceptance < 1:
+        raise ValueError(f"target_acceptance must be between 0 and 1 (exclusive), got {target_acceptance!r}")
+    if not 0 < min_acceptance < 1:
+        raise ValueError(f"min_acceptance must be between 0 and 1 (exclusive), got {min_acceptance!r}")
+    evaluator: DeltaEvaluator = create_search_evaluator(initial_schedule.copy(), problem, conflict_bias)
+    neighbors: NeighborGenerator = NeighborGenerator(evaluator, conflict_bias)
+    best: Schedule = evaluator.schedule.copy()
+    best_objective: float = evaluator.value()
+
+    initial_temp: float = calibrate_temperature(evaluator, problem, target_acceptance, calibration_samples, observer)
+    chain_length: int = max(1, round(chain_factor * len(initial_schedule.assignments)))
+    temp: float = initial_temp
+    best_temp: float = initial_temp
+
+    acceptance_probabilities: List[float] = []
+    chains: int = 0
+    idle_chains: int = 0
+    frozen: int = 0
+    reheats: int = 0
+
+    while not budget.expired():
+        accepted: int
+        probabilities: List[float]
+        chain_best: Schedule
+        chain_best_objective: float
+        accepted, probabilities, chain_best, chain_best_objective = metropolis_sweep(evaluator, problem, temp, chain_length, observer, neighbors)
+        acceptance_probabilities.extend(probabilities)
+        chains += 1
+
+        if chain_best_objective > best_objective:
+            best = chain_best
+            best_objective = chain_best_objective
+            best_temp = temp
+            idle_chains = 0
+        else:
+            idle_chains += 1
+        observer.progress(chains, best_objective)
+
+        frozen = frozen + 1 if uphill_acceptance(probabilities) < min_acceptance else 0
+        if idle_chains >= stuck_chains and reheats < max_reheats:
+            temp = max(temp, min(initial_temp, best_temp * reheat_factor))
+            reheats += 1
+            idle_chains = 0
+            frozen = 0
+            observer.count('reheats')
+            continue
+        if frozen >= frozen_chains:
+            break
+        temp *= cooling_rate
+
+    iterations_list: List[int] = list(range(len(acceptance_probabilities)))
+    return best, best_objective, acceptance_probabilities, iterations_list, reheats
+
+# a replica shipped between processes: its compact genes and objective
+ReplicaState = Tuple[bytes, float]
+
+# new replica state, accepted moves, acceptance probabilities, best genes and objective of the sweep, and its metrics
+ReplicaResult = Tuple[ReplicaState, int, List[float], bytes, float, WorkerMetrics]
+
+def _replica_sweep(problem: ProblemIndex, state: ReplicaState, temp: float, steps: int, observed: bool) -> ReplicaResult:
+    genes: array = array('i')
+    genes.frombytes(state[0])
+    schedule: Schedule = to_schedule(CompactSchedule(problem.assignment_courses, genes), problem)
+    evaluator: DeltaEvaluator = DeltaEvaluator(schedule, problem)
+
+    recorder: Observer = worker_recorder(observed)
+    accepted, acceptance_probabilities, best, best_objective = metropolis_sweep(evaluator, problem, temp, steps, recorder)
+
+    new_state: ReplicaState = (to_compact_schedule(schedule, problem).genes.tobytes(), evaluator.value())
+    return new_state, accepted, acceptance_probabilities, to_compact_schedule(best, problem).genes.tobytes(), best_objective, export_metrics(recorder)
+
+def _replica_sweep_worker(replica_seed: int, state: ReplicaState, temp: float, steps: int, observed: bool) -> ReplicaResult:
+    random.seed(replica_seed)
+    return _replica_sweep(worker_problem(), state, temp, steps, observed)
+
+def parallel_tempering(initial_schedule: Schedule, problem: ProblemIndex, replicas: int = 4, max_temp: float = 1000, min_temp: float = 1,
+                       sweep_length: int = 100, exchanges: int = 50, workers: int | None = None,
+                       seed: int | None = None, observer: Observer = NULL_OBSERVER,
+                       budget: SearchBudget = UNLIMITED) -> Tuple[Schedule, float, List[float], List[int], Dict[str, List[float]]]:
+    # replica exchange: replicas chains run sweep_length Metropolis steps at fixed temperatures
+    # of a geometric ladder from max_temp down to min_temp, each in its own worker process.
+    # after every sweep, neighbouring temperatures try to swap their states with the
+    # Metropolis criterion exp((f_hot - f_cold) * (1 / T_cold - 1 / T_hot)).
+    # acceptance_probabilities and iterations_list follow the coldest chain. the budget
+    # is checked between exchanges
+    master_seed: int = seed if seed is not None else random.getrandbits(64)
+    workers = replicas if workers is None else workers
+    exchange_rng: random.Random = random.Random(derive_seed(master_seed, -1))
+
+    temperatures: List[float] = [max_temp * (min_temp / max_temp) ** (k / max(1, replicas - 1)) for k in range(replicas)]
+    initial_state: ReplicaState = (to_compact_schedule(initial_schedule, problem).genes.tobytes(), indexed_objective(initial_schedule, problem))
+    states: List[ReplicaState] = [initial_state] * replicas
+
+    best_genes: bytes = initial_state[0]
+    best_objective: float = initial_state[1]
+    accepted_moves: List[int] = [0] * replicas
+    swap_attempts: List[int] = [0] * max(0, replicas - 1)
+    swap_accepts: List[int] = [0] * max(0, replicas - 1)
+    acceptance_probabilities: List[float] = []
+    observed: bool = observer is not NULL_OBSERVER
+
+    completed: int = 0
+    pool: ProcessPoolExecutor | None = create_problem_pool(problem, workers) if workers > 1 else None
+    try:
+        for exchange in range(exchanges):
+            if budget.expired():
+                break
+            replica_seeds: List[int] = [derive_seed(master_seed, exchange * replicas + k) for k in range(replicas)]
+
+            results: List[ReplicaResult]
+            if pool is not None:
+                futures: List[Future] = [pool.submit(_replica_sweep_worker, replica_seeds[k], states[k], temperatures[k], sweep_length, observed) for k in range(replicas)]
+                results = [future.result() for future in futures]
+            else:
+                random_state = random.getstate()
+                results = []
+                for k in range(replicas):
+                    random.seed(replica_seeds[k])
+                    results.append(_replica_sweep(problem, states[k], temperatures[k], sweep_length, observed))
+                random.setstate(random_state)
+
+            for k, (state, accepted, probabilities, replica_best_genes, replica_best_objective, metrics) in enumerate(results):
+                states[k] = state
+                merge_metrics(observer, metrics)
+                accepted_moves[k] += accepted
+                if k == replicas - 1:
+                    acceptance_probabilities.extend(probabilities)
+                if replica_best_objective > best_objective:
+                    best_genes = replica_best_genes
+                    best_objective = replica_best_objective
+
+            # even and odd neighbouring pairs alternate so every pair gets its turn
+            for k in range(exchange % 2, replicas - 1, 2):
+                swap_attempts[k] += 1
+                hot_objective: float = states[k][1]
+                cold_objective: float = states[k + 1][1]
+                log_ratio: float = (hot_objective - cold_objective) * (1 / temperatures[k + 1] - 1 / temperatures[k])
+                if log_ratio >= 0 or exchange_rng.random() < math.exp(log_ratio):
+                    states[k], states[k + 1] = states[k + 1], states[k]
+                    swap_accepts[k] += 1
+                    observer.count('replica_swaps')
+
+            completed = exchange + 1
+            observer.progress(completed, best_objective)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    genes: array = array('i')
+    genes.frombytes(best_genes)
+    best: Schedule = to_schedule(CompactSchedule(problem.assignment_courses, genes), problem)
+
+    replica_statistics: Dict[str, List[float]] = {
+        'temperatures': temperatures,
+        'acceptance_rates': [accepted / (completed * sweep_length) if completed * sweep_length > 0 else 0.0 for accepted in accepted_moves],
+        'swap_rates': [accepts / attempts if attempts > 0 else 0.0 for accepts, attempts in zip(swap_accepts, swap_attempts)]
+    }
+    iterations_list: List[int] = list(range(len(acceptance_probabilities)))
+
+    return best, best_objective, acceptance_probabilities, iterations_list, replica_statistics
@@ -0,0 +1,108 @@
+import time
+from models import *
+from problem import ProblemIndex
+from moves import Move, SwapMove
+from scheduler import generate_moves
+from evaluator import DeltaEvaluator
+from metrics import Observer, NULL_OBSERVER
+from budget import SearchBudget, UNLIMITED
+from constructive import starting_schedule
+from typing import List, Tuple, Dict
+
+# a tabu attribute is an (assignment, hour index, room index) placement; while it is tabu
+# the assignment may not be moved back to that placement
+TabuAttribute = Tuple[int, int, int]
+
+def move_targets(evaluator: DeltaEvaluator, move: Move) -> List[TabuAttribute]:
+    # the placements the moved assignments would end up in
+    if isinstance(move, SwapMove):
+        return [(move.index1, evaluator.assignment_hours[move.index2], evaluator.assignment_rooms[move.index2]),
+                (move.index2, evaluator.assignment_hours[move.index1], evaluator.assignment_rooms[move.index1])]
+    return [(move.index, move.time_slot.hour_index(), evaluator.problem.room_ids[move.room.room_id])]
+
+def move_sources(evaluator: DeltaEvaluator, move: Move) -> List[TabuAttribute]:
+    # the placements the moved assignments leave
+    if isinstance(move, SwapMove):
+        return [(move.index1, evaluator.assignment_hours[move.index1], evaluator.assignment_rooms[move.index1]),
+                (move.index2, evaluator.assignment_hours[move.index2], evaluator.assignment_rooms[move.index2])]
+    return [(move.index, evaluator.assignment_hours[move.index], evaluator.assignment_rooms[move.index])]
+
+def tabu_search(problem: ProblemIndex, max_iterations: int, neighbors_to_check: int, tenure: int, max_stuck_iterations: int,
+                observer: Observer = NULL_OBSERVER, budget: SearchBudget = UNLIMITED, warm_start: bool = False) -> Tuple[Schedule, List[float], int, float]:
+    # every iteration moves to the best sampled neighbor that is not tabu, even when it is
+    # worse, and makes the placements it left tabu for tenure iterations. a tabu move is
+    # still taken when it beats the best objective so far (aspiration). stops after
+    # max_stuck_iterations iterations without a new best and returns the best schedule
+    start_time: float = time.time()
+
+    current_schedule: Schedule = starting_schedule(problem, warm_start)
+    evaluator: DeltaEvaluator = DeltaEvaluator(current_schedule, problem)
+    current_objective: float = evaluator.value()
+    best_schedule: Schedule = current_schedule.copy()
+    best_objective: float = current_objective
+    objective_history: List[float] = [current_objective]
+
+    tabu_until: Dict[TabuAttribute, int] = {}
+    stuck_count: int = 0
+    iterations: int = 0
+    for i in range(max_iterations):
+        if budget.expired():
+            print(f"-> Tabu Search: Search budget exhausted after {iterations} iterations.")
+            break
+        iterations = i + 1
+
+        with observer.timer('neighbor_generation'):
+            moves: List[Move] = list(generate_moves(current_schedule, problem.rooms, problem.time_slots, neighbors_to_check, problem.domains))
+
+        best_move: Move | None = None
+        best_delta: float = -float('inf')
+        with observer.timer('evaluation'):
+            for move in moves:
+                delta: float = evaluator.move_delta(move)
+                if delta <= best_delta:
+                    continue
+                tabu: bool = any(tabu_until.get(target, 0) >= iterations for target in move_targets(evaluator, move))
+                if tabu and current_objective + delta <= best_objective:
+                    observer.count('tabu_rejected')
+                    continue
+                best_move = move
+                best_delta = delta
+        observer.count('evaluations', len(moves))
+
+        if best_move is None:
+            # every sampled neighbor is tabu
+            observer.count('moves_rejected', len(moves))
+            stuck_count += 1
+        else:
+            for source in move_sources(evaluator, best_move):
+                tabu_until[source] = iterations + tenure
+            evaluator.apply_move(best_move)
+            current_objective += best_delta
+            observer.count('moves_accepted')
+            observer.count('moves_rejected', len(moves) - 1)
+
+            if current_objective > best_objective:
+                with observer.timer('copy'):
+                    best_schedule = current_schedule.copy()
+                observer.count('copies')
+                best_objective = current_objective
+                stuck_count = 0
+            else:
+                stuck_count += 1
+        objective_history.append(current_objective)
+        observer.progress(iterations, best_objective)
+
+        if best_objective == 0:
+            # penalties are never negative, nothing beats a conflict-free schedule
+            print(f"-> Tabu Search: Conflict-free schedule found at iteration {iterations}.")
+            break
+        if stuck_count >= max_stuck_iterations:
+            print(f"-> Tabu Search: No new best objective in {stuck_count} iterations, stopped at iteration {iterations}.")
+            break
+
+        # expired attributes are dropped now and then so the tabu list stays small
+        if iterations % (tenure + 1) == 0:
+            tabu_until = {attribute: until for attribute, until in tabu_until.items() if until >= iterations}
+
+    duration: float = time.time() - start_time
+    return best_schedule, objective_history, iterations, duration
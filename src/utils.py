@@ -1,5 +1,10 @@
+import csv
+import html
+import io
 import json
-from typing import List, Tuple, Dict, Any, Set
+import os
+import sys
+from typing import List, Tuple, Dict, Any, Callable
 from models import *
 
 def load_data_from_json(file_path: str) -> Tuple[List[Course], List[Room], List[Student], List[Lecturer]]:
@@ -13,6 +18,9 @@ def load_data_from_json(file_path: str) -> Tuple[List[Course], List[Room], List[
         print(f"Error: The file {file_path} is not a valid JSON file.")
         return [], [], [], []   
 
+    return instance_from_data(data)
+
+def instance_from_data(data: Dict[str, Any]) -> Tuple[List[Course], List[Room], List[Student], List[Lecturer]]:
     courses: List[Course] = [Course(c['kode'], c['jumlah_mahasiswa'], c['sks']) for c in data['kelas_mata_kuliah']]
     rooms: List[Room] = [Room(r['kode'], r['kuota']) for r in data['ruangan']]
     students: List[Student] = [Student(s['nim'], s['daftar_mk'], s['prioritas']) for s in data['mahasiswa']]
@@ -20,68 +28,125 @@ def load_data_from_json(file_path: str) -> Tuple[List[Course], List[Room], List[
 
     return courses, rooms, students, lecturers
 
-def schedule_table_for_room(schedule: Schedule, room_id: str) -> None:
-    day_to_index: Dict[str, int] = {'Senin': 0, 'Selasa': 1, 'Rabu': 2, 'Kamis': 3, 'Jumat': 4}
-
-    time_to_courses: Dict[int, List[str]] = {}
+def save_schedule_to_json(schedule: Schedule, statistics: Dict[str, Any], file_path: str) -> None:
+    data: Dict[str, Any] = {
+        "jadwal": [
+            {
+                "kode": a.course.course_id,
+                "ruangan": a.room.room_id,
+                "hari": a.time_slot.day,
+                "jam": a.time_slot.hour
+            } for a in schedule.assignments
+        ],
+        "statistik": statistics
+    }
+
+    with open(file_path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+TIMETABLE_DAYS: List[str] = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']
+TIMETABLE_HOURS: range = range(8, 17)
+
+def bucket_by_room_hour(schedule: Schedule) -> Dict[str, Dict[int, List[str]]]:
+    # room id -> hour index -> course ids, in assignment order, built in one pass
+    buckets: Dict[str, Dict[int, List[str]]] = {}
     for assignment in schedule.assignments:
-        if assignment.room.room_id != room_id:
+        room_cells: Dict[int, List[str]] = buckets.setdefault(assignment.room.room_id, {})
+        room_cells.setdefault(assignment.time_slot.hour_index(), []).append(assignment.course.course_id)
+    return buckets
+
+def render_room_table(room_cells: Dict[int, List[str]]) -> str:
+    lines: List[str] = ["              |   Senin    |   Selasa   |    Rabu    |   Kamis    |   Jumat    |"]
+
+    for hour in TIMETABLE_HOURS:
+        lines.append(80 * '-')
+
+        # a cell holding several courses spreads them over extra rows of the same hour
+        day_cells: List[List[str]] = [room_cells.get(DAY_TO_INDEX[day] * 24 + hour, []) for day in TIMETABLE_DAYS]
+        rows: int = max(1, max(len(cell) for cell in day_cells))
+        for row in range(rows):
+            prefix: str = f"{hour:02d}:00 - {hour + 1:02d}:00 " if row == 0 else 14 * ' '
+            cells: List[str] = [f" {cell[row]} " if row < len(cell) else "            " for cell in day_cells]
+            lines.append(prefix + "|" + "|".join(cells) + "|")
+
+    return "\n".join(lines) + "\n\n"
+
+def render_timetable_text(schedule: Schedule, rooms: List[Room]) -> str:
+    buckets: Dict[str, Dict[int, List[str]]] = bucket_by_room_hour(schedule)
+    parts: List[str] = []
+
+    for room in rooms:
+        if room.room_id not in buckets:
             continue
 
-        hour_index: int = assignment.time_slot.hour_index()
-        course_id: str = assignment.course.course_id
-        if hour_index not in time_to_courses:
-            time_to_courses[hour_index] = []
-        time_to_courses[hour_index].append(course_id)
-
-    print("              |   Senin    |   Selasa   |    Rabu    |   Kamis    |   Jumat    |")
-
-    for hour in range(8, 17):
-        print(80 * '-')
-        print(f"{hour:02d}:00 - {hour + 1:02d}:00 ", end="")
-
-        max_course_on_hour: int = 1
-        for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']:
-            hour_idx: int = day_to_index[day] * 24 + hour
-            if hour_idx in time_to_courses:
-                max_course_on_hour = max(max_course_on_hour, len(time_to_courses[hour_idx]))
-
-        first: bool = True
-        for _ in range(max_course_on_hour):
-            if not first:
-                print()
-                print(14 * ' ', end="")
-            else:
-                first = False
-
-            for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']:
-                hour_idx_2: int = day_to_index[day] * 24 + hour
-
-                if hour_idx_2 in time_to_courses:
-                    print("|", end="")
-                    print(f" {time_to_courses[hour_idx_2][0]} ", end="")
-                    
-                    time_to_courses[hour_idx_2].pop(0)
-                    if len(time_to_courses[hour_idx_2]) == 0:
-                        time_to_courses.pop(hour_idx_2)
-                else:
-                    print("|            ", end="")
-            print("|", end="")
-        
-        print()
-        
-    print()
+        parts.append(f"Ruangan {room.room_id}:\n")
+        parts.append(render_room_table(buckets[room.room_id]))
+        parts.append("\n")
 
-def visualize_schedule(schedule: Schedule, rooms: List[Room]) -> None:
-    room_used: Set[str] = set()
+    return "".join(parts)
 
-    for assignment in schedule.assignments:
-        room_used.add(assignment.room.room_id)
+def render_timetable_csv(schedule: Schedule, rooms: List[Room]) -> str:
+    # one row per class, ordered by room, day and hour
+    buckets: Dict[str, Dict[int, List[str]]] = bucket_by_room_hour(schedule)
+    buffer: io.StringIO = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["ruangan", "hari", "jam_mulai", "jam_selesai", "kode"])
+
+    for room in rooms:
+        room_cells: Dict[int, List[str]] = buckets.get(room.room_id, {})
+        for day in TIMETABLE_DAYS:
+            for hour in TIMETABLE_HOURS:
+                for course_id in room_cells.get(DAY_TO_INDEX[day] * 24 + hour, []):
+                    writer.writerow([room.room_id, day, f"{hour:02d}:00", f"{hour + 1:02d}:00", course_id])
+
+    return buffer.getvalue()
+
+def render_timetable_html(schedule: Schedule, rooms: List[Room]) -> str:
+    buckets: Dict[str, Dict[int, List[str]]] = bucket_by_room_hour(schedule)
+    parts: List[str] = [
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>Jadwal Kelas</title>\n",
+        "<style>table { border-collapse: collapse; margin-bottom: 24px; } "
+        "th, td { border: 1px solid #999; padding: 4px 8px; text-align: center; } "
+        "td.clash { background: #f8d0d0; }</style>\n</head>\n<body>\n"
+    ]
 
     for room in rooms:
-        if room.room_id not in room_used:
+        if room.room_id not in buckets:
             continue
+        room_cells: Dict[int, List[str]] = buckets[room.room_id]
+
+        parts.append(f"<h2>Ruangan {html.escape(room.room_id)}</h2>\n<table>\n<tr><th></th>")
+        parts.append("".join(f"<th>{day}</th>" for day in TIMETABLE_DAYS))
+        parts.append("</tr>\n")
+        for hour in TIMETABLE_HOURS:
+            parts.append(f"<tr><th>{hour:02d}:00 - {hour + 1:02d}:00</th>")
+            for day in TIMETABLE_DAYS:
+                cell: List[str] = room_cells.get(DAY_TO_INDEX[day] * 24 + hour, [])
+                css: str = ' class="clash"' if len(cell) > 1 else ""
+                parts.append(f"<td{css}>{'<br>'.join(html.escape(course_id) for course_id in cell)}</td>")
+            parts.append("</tr>\n")
+        parts.append("</table>\n")
+
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+TIMETABLE_RENDERERS: Dict[str, Callable[[Schedule, List[Room]], str]] = {
+    'text': render_timetable_text,
+    'csv': render_timetable_csv,
+    'html': render_timetable_html
+}
+
+def save_timetable(schedule: Schedule, rooms: List[Room], file_path: str, file_format: str | None = None) -> None:
+    # the format defaults to the file extension: .csv, .html/.htm, anything else is text
+    if file_format is None:
+        extension: str = os.path.splitext(file_path)[1].lower()
+        file_format = {'.csv': 'csv', '.html': 'html', '.htm': 'html'}.get(extension, 'text')
+
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(TIMETABLE_RENDERERS[file_format](schedule, rooms))
+
+def schedule_table_for_room(schedule: Schedule, room_id: str) -> None:
+    sys.stdout.write(render_room_table(bucket_by_room_hour(schedule).get(room_id, {})))
 
-        print(f"Ruangan {room.room_id}:")
-        schedule_table_for_room(schedule, room.room_id)
-        print()
\ No newline at end of file
+def visualize_schedule(schedule: Schedule, rooms: List[Room]) -> None:
+    sys.stdout.write(render_timetable_text(schedule, rooms))
@@ -0,0 +1,34 @@
+import os
+import random
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from compact import CompactSchedule, generate_initial_compact_schedule, to_schedule
+from batch import BatchEvaluator
+from genetic import mutation
+from scheduler import objective
+from typing import List, Tuple
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def input_problem() -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+
+def test_batch_evaluator_matches_objective() -> None:
+    problem: ProblemIndex = input_problem()
+    random.seed(5)
+    population: List[CompactSchedule] = []
+    for _ in range(10):
+        compact: CompactSchedule = generate_initial_compact_schedule(problem)
+        population.append(compact)
+        for _ in range(20):
+            compact = mutation(compact.copy(), problem)
+            population.append(compact)
+
+    expected: List[float] = [objective(to_schedule(compact, problem), problem.students, problem.lecturers) for compact in population]
+    # a small max_batch_cells splits the population into several chunks
+    for max_batch_cells in (1 << 24, 1000):
+        scored: List[Tuple[CompactSchedule, float]] = BatchEvaluator(problem, max_batch_cells).evaluate_population(population)
+        assert [compact for compact, _ in scored] == population
+        assert [objective_value for _, objective_value in scored] == expected
@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+import pytest
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from decomposition import course_components, merge_small_components
+from runners import run_decomposed
+from scheduler import indexed_objective
+from typing import Any, Dict, List
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+COMPONENT_PARAMETERS: Dict[str, Dict[str, Any]] = {
+    'stochastic': {'max_iterations': 200, 'max_stuck_iterations': 50},
+    'genetic_algorithm': {'population_size': 6, 'generations': 3},
+    'simulated_annealing': {'initial_temp': 100, 'cooling_rate': 0.9},
+    'tabu_search': {'max_iterations': 20},
+}
+
+def isolated_course_problem() -> ProblemIndex:
+    # data/input.json with one more 1-credit course that shares no student or lecturer
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    problem: ProblemIndex = load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+    return ProblemIndex(problem.courses + [Course('ISO', 10, 1)], problem.rooms, time_slots,
+                        list(problem.students) + [Student('S-ISO', ['ISO'], [1])], problem.lecturers)
+
+def test_single_assignment_components_are_merged() -> None:
+    problem: ProblemIndex = isolated_course_problem()
+    components: List[List[int]] = course_components(problem)
+    assert [1] in [[problem.courses[course_idx].credits for course_idx in component] for component in components]
+
+    merged: List[List[int]] = merge_small_components(problem, components)
+    assert sorted(course_idx for component in merged for course_idx in component) == list(range(len(problem.courses)))
+    for component in merged:
+        assert component == sorted(component)
+        assert sum(problem.courses[course_idx].credits for course_idx in component) >= 2
+
+@pytest.mark.parametrize('algorithm', list(COMPONENT_PARAMETERS))
+def test_decomposed_search_with_an_isolated_course(algorithm: str) -> None:
+    problem: ProblemIndex = isolated_course_problem()
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, statistics = run_decomposed(problem, algorithm, COMPONENT_PARAMETERS[algorithm], seed=1, visualize=False, show_plots=False)
+    assert len(schedule.assignments) == len(problem.assignment_courses)
+    assert statistics['objective'] == indexed_objective(schedule, problem)
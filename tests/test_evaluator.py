@@ -0,0 +1,35 @@
+import os
+import random
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from moves import Move
+from evaluator import DeltaEvaluator
+from scheduler import generate_initial_schedule, generate_move, objective
+from typing import List
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def input_problem() -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+
+def test_delta_evaluator_matches_objective_over_random_moves() -> None:
+    problem: ProblemIndex = input_problem()
+    random.seed(3)
+    schedule: Schedule = generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots)
+    evaluator: DeltaEvaluator = DeltaEvaluator(schedule, problem)
+    assert evaluator.value() == objective(schedule, problem.students, problem.lecturers)
+
+    for step in range(300):
+        move: Move = generate_move(schedule, problem.rooms, problem.time_slots)
+        before: float = evaluator.value()
+        delta: float = evaluator.move_delta(move)
+        evaluator.apply_move(move)
+        # exact equality: every penalty term is a multiple of 0.25
+        assert evaluator.value() == objective(schedule, problem.students, problem.lecturers)
+        assert evaluator.value() == before + delta
+        if step % 3 == 0:
+            evaluator.undo_move(move)
+            assert evaluator.value() == before
+            assert objective(schedule, problem.students, problem.lecturers) == before
@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import random
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from compact import CompactSchedule, generate_initial_compact_schedule, compact_objective, to_compact_schedule
+from metrics import MetricsRecorder
+from genetic import allocate_population, create_selection, crossover, mutation, next_generation, genetic_algorithm
+from typing import List, Tuple
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def input_problem() -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+
+def test_odd_children_draw_pairs_first_then_the_last_child() -> None:
+    problem: ProblemIndex = input_problem()
+    random.seed(1)
+    population_objective: List[Tuple[CompactSchedule, float]] = []
+    for _ in range(6):
+        compact: CompactSchedule = generate_initial_compact_schedule(problem)
+        population_objective.append((compact, compact_objective(compact, problem)))
+
+    random.seed(2)
+    even: List[CompactSchedule] = next_generation(population_objective, problem, allocate_population(problem, 4))
+    # the last child of an odd generation: two more parents, a crossover and a mutation
+    selection = create_selection([objective for _, objective in population_objective])
+    parent1: CompactSchedule = population_objective[selection.pick()][0]
+    parent2: CompactSchedule = population_objective[selection.pick()][0]
+    last: CompactSchedule = allocate_population(problem, 1)[0]
+    crossover(parent1, parent2, last)
+    mutation(last, problem)
+
+    random.seed(2)
+    odd: List[CompactSchedule] = next_generation(population_objective, problem, allocate_population(problem, 5))
+    assert [child.genes for child in odd[:4]] == [child.genes for child in even]
+    assert odd[4].genes == last.genes
+
+def test_odd_population_keeps_its_size() -> None:
+    problem: ProblemIndex = input_problem()
+    recorder: MetricsRecorder = MetricsRecorder()
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        genetic_algorithm(problem, population_size=5, generations=3, observer=recorder)
+    # the initial population and three generations of five
+    assert recorder.counters['evaluations'] == 20
+
+def test_no_generations_return_the_best_initial_individual() -> None:
+    problem: ProblemIndex = input_problem()
+    random.seed(4)
+    initial_objectives: List[float] = [compact_objective(generate_initial_compact_schedule(problem), problem) for _ in range(8)]
+    assert max(initial_objectives) > initial_objectives[0]
+
+    random.seed(4)
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, _ = genetic_algorithm(problem, population_size=8, generations=0)
+    assert compact_objective(to_compact_schedule(schedule, problem), problem) == max(initial_objectives)
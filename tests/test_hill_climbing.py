@@ -0,0 +1,31 @@
+import contextlib
+import io
+import os
+import random
+import pytest
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from evaluator import DeltaEvaluator
+from hill_climbing import steepest_ascent_hill_climbing_full
+from scheduler import full_neighborhood_moves
+from typing import List
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def load_problem(name: str) -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, name), use_cache=False).problem(time_slots)
+
+@pytest.mark.parametrize('name', ['input.json', 'semi_large_test.json'])
+@pytest.mark.parametrize('scan_order', ['conflicts', 'random'])
+def test_first_improvement_stops_at_a_local_optimum(name: str, scan_order: str) -> None:
+    problem: ProblemIndex = load_problem(name)
+    random.seed(9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, _, iterations, _ = steepest_ascent_hill_climbing_full(problem, 100000, first_improvement=True, scan_order=scan_order)
+    assert iterations < 100000
+
+    evaluator: DeltaEvaluator = DeltaEvaluator(schedule, problem)
+    _, best_delta = evaluator.best_move(full_neighborhood_moves(schedule, problem.rooms, problem.time_slots))
+    assert best_delta <= 0
@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+from models import *
+from instance_cache import CACHE_SUFFIX, CompiledInstance, CompiledStudents, load_instance
+from typing import Any, Dict
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def test_cache_is_recompiled_when_the_json_changes(tmp_path: Any) -> None:
+    path: str = str(tmp_path / 'input.json')
+    shutil.copyfile(os.path.join(DATA_DIR, 'input.json'), path)
+
+    compiled: CompiledInstance | None = load_instance(path)
+    assert compiled is not None and os.path.exists(path + CACHE_SUFFIX)
+    cached: CompiledInstance | None = load_instance(path)
+    # only a cached instance builds its students lazily
+    assert cached is not None and isinstance(cached.students, CompiledStudents)
+    assert [(course.course_id, course.credits) for course in cached.courses] == [(course.course_id, course.credits) for course in compiled.courses]
+
+    with open(path, encoding='utf-8') as f:
+        data: Dict[str, Any] = json.load(f)
+    data['kelas_mata_kuliah'][0]['sks'] += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    changed: CompiledInstance | None = load_instance(path)
+    assert changed is not None and not isinstance(changed.students, CompiledStudents)
+    assert changed.courses[0].credits == compiled.courses[0].credits + 1
+    recached: CompiledInstance | None = load_instance(path)
+    assert recached is not None and isinstance(recached.students, CompiledStudents)
+    assert recached.courses[0].credits == compiled.courses[0].credits + 1
+
+def test_ids_with_nul_characters_survive_the_cache(tmp_path: Any) -> None:
+    with open(os.path.join(DATA_DIR, 'input.json'), encoding='utf-8') as f:
+        data: Dict[str, Any] = json.load(f)
+    data['ruangan'][0]['kode'] = 'R\0ü'
+    data['mahasiswa'][0]['nim'] = '1\0' + data['mahasiswa'][0]['nim']
+    path: str = str(tmp_path / 'input.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    compiled: CompiledInstance | None = load_instance(path)
+    cached: CompiledInstance | None = load_instance(path)
+    assert compiled is not None and cached is not None and isinstance(cached.students, CompiledStudents)
+    assert [room.room_id for room in cached.rooms] == [room.room_id for room in compiled.rooms]
+    assert [student.student_id for student in cached.students] == [student.student_id for student in compiled.students]
+    assert [lecturer.lecturer_id for lecturer in cached.lecturers] == [lecturer.lecturer_id for lecturer in compiled.lecturers]
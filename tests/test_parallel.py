@@ -0,0 +1,41 @@
+import contextlib
+import io
+import os
+import random
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from evaluator import DeltaEvaluator
+from parallel import NeighborhoodScanner, encode_move
+from scheduler import generate_initial_schedule
+from hill_climbing import random_restart_hill_climbing
+from typing import List, Tuple
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def input_problem() -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+
+def test_sharded_scan_picks_the_serial_move() -> None:
+    problem: ProblemIndex = input_problem()
+    random.seed(11)
+    # min_parallel_assignments=0 shards even the small input instance
+    with NeighborhoodScanner(problem) as serial, NeighborhoodScanner(problem, workers=2, min_parallel_assignments=0) as sharded:
+        for _ in range(5):
+            evaluator: DeltaEvaluator = DeltaEvaluator(generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots), problem)
+            serial_move, serial_delta, serial_evaluated = serial.best_move(evaluator)
+            sharded_move, sharded_delta, sharded_evaluated = sharded.best_move(evaluator)
+            assert serial_move is not None and sharded_move is not None
+            assert encode_move(sharded_move, problem) == encode_move(serial_move, problem)
+            assert (sharded_delta, sharded_evaluated) == (serial_delta, serial_evaluated)
+
+def test_seeded_random_restarts_do_not_depend_on_workers() -> None:
+    problem: ProblemIndex = input_problem()
+    results: List[Tuple[List[Tuple[str, str, int]], List[float], int]] = []
+    for workers in (1, 2):
+        with contextlib.redirect_stdout(io.StringIO()):
+            schedule, history, iterations, _, _ = random_restart_hill_climbing(problem, 4, 50, workers=workers, seed=21)
+        placements: List[Tuple[str, str, int]] = [(a.course.course_id, a.room.room_id, a.time_slot.hour_index()) for a in schedule.assignments]
+        results.append((placements, history, iterations))
+    assert results[0] == results[1]
@@ -0,0 +1,21 @@
+import os
+import pytest
+from models import *
+from problem import ProblemIndex
+from instance_cache import load_instance
+from scheduler import generate_initial_schedule
+from simulated_annealing import adaptive_simulated_annealing
+from typing import Any, Dict, List
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def input_problem() -> ProblemIndex:
+    time_slots: List[TimeSlot] = [TimeSlot(day, hour) for day in ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'] for hour in range(8, 17)]
+    return load_instance(os.path.join(DATA_DIR, 'input.json'), use_cache=False).problem(time_slots)
+
+@pytest.mark.parametrize('parameters', [{'target_acceptance': 1}, {'target_acceptance': 0}, {'target_acceptance': 1.5},
+                                        {'min_acceptance': 0}, {'min_acceptance': 1}])
+def test_adaptive_annealing_rejects_acceptance_outside_zero_one(parameters: Dict[str, Any]) -> None:
+    problem: ProblemIndex = input_problem()
+    with pytest.raises(ValueError):
+        adaptive_simulated_annealing(generate_initial_schedule(problem.courses, problem.rooms, problem.time_slots), problem, **parameters)